@@ -1,20 +1,27 @@
+from money import format_money, from_cents, is_cents
+
+
 class BankAccount:
-    def __init__(self, owner, balance, iban, overdraft_limit=0, db_id: int | None = None, user_name: str | None = None):
+    # No per-instance __dict__: admin sessions hold one object per account.
+    __slots__ = ("owner", "balance", "iban", "transactions", "overdraft_limit", "db_id", "user_name")
+
+    def __init__(self, owner, balance, iban, overdraft_limit=0, db_id: int | None = None, user_name: str | None = None,
+                 columnar: bool = False):
         # Owner validation
         if not isinstance(owner, str) or not owner.strip():
             raise ValueError("Owner must be a non-empty string.")
 
-        # Initial balance must be non-negative number
-        if not isinstance(balance, (int, float)):
-            raise ValueError("Initial balance must be a number.")
+        # Balance and overdraft limit are ints in cents (see money.py)
+        if not is_cents(balance):
+            raise ValueError("Initial balance must be a number of cents.")
 
         # IBAN validation
         if not isinstance(iban, str) or not iban.strip():
             raise ValueError("IBAN must be a non-empty string.")
 
         # Overdraft limit validation
-        if not isinstance(overdraft_limit, (int, float)):
-            raise ValueError("Overdraft limit must be a number.")
+        if not is_cents(overdraft_limit):
+            raise ValueError("Overdraft limit must be a number of cents.")
 
         if balance < overdraft_limit:
             raise ValueError("Balance cannot be less than the overdraft limit.")
@@ -23,31 +30,36 @@ class BankAccount:
             raise ValueError("Overdraft must be <= 0")
 
         self.owner = owner.strip()
-        self.balance = round(float(balance), 2)
+        self.balance = balance
         self.iban = iban.strip()
-        self.transactions = []      # list[Transaction]
+        if columnar:
+            # Array-backed history for accounts with very many movements.
+            from ledger import ColumnarLedger
+            self.transactions = ColumnarLedger()
+        else:
+            self.transactions = []      # list[Transaction]
         self.overdraft_limit = overdraft_limit
         self.db_id = db_id
         self.user_name = user_name
 
     def deposit(self, amount):
-        """Deposit money into the account."""
-        if not isinstance(amount, (int, float)):
-            raise ValueError("Amount must be a number.")
+        """Deposit money (in cents) into the account."""
+        if not is_cents(amount):
+            raise ValueError("Amount must be a number of cents.")
 
         if amount <= 0:
             raise ValueError("Amount must be greater than 0.")
 
 
-        self.balance = round(self.balance + amount, 2)
+        self.balance += amount
         self.transactions.append(
             Transaction("DEPOSIT", amount, self.balance, "cash deposit")
         )
 
     def withdraw(self, amount):
-        """Withdraw money, respecting the overdraft limit."""
-        if not isinstance(amount, (int, float)):
-            raise ValueError("Amount must be a number.")
+        """Withdraw money (in cents), respecting the overdraft limit."""
+        if not is_cents(amount):
+            raise ValueError("Amount must be a number of cents.")
 
         if amount <= 0:
             raise ValueError("Amount must be greater than 0.")
@@ -55,28 +67,28 @@ class BankAccount:
         if self.balance - amount < self.overdraft_limit:
             raise ValueError(
                 f"Insufficient balance. Overdraft limit reached. "
-                f"Current balance: {self.balance:.2f}."
+                f"Current balance: {format_money(self.balance)}."
             )
 
 
         if self.balance - amount < self.overdraft_limit:
             raise ValueError(f"Insufficient funds. You can't go below the overdraft limit. "
-                             f"{self.overdraft_limit:.2f}. Current balance {self.balance:.2f}")
+                             f"{format_money(self.overdraft_limit)}. Current balance {format_money(self.balance)}")
 
 
-        self.balance = round(self.balance - amount, 2)
+        self.balance -= amount
         self.transactions.append(
             Transaction("WITHDRAW", amount, self.balance, "cash withdraw")
         )
 
     def transfer_to(self, other_account, amount):
-        """Transfer money to another BankAccount."""
+        """Transfer money (in cents) to another BankAccount."""
         if not isinstance(other_account, BankAccount):
             print("Target must be a BankAccount.")
             return
 
-        if not isinstance(amount, (int, float)):
-            print("Amount must be a number.")
+        if not is_cents(amount):
+            print("Amount must be a number of cents.")
             return
 
         if amount <= 0:
@@ -86,13 +98,13 @@ class BankAccount:
         if self.balance - amount < self.overdraft_limit:
             print(
                 f"Insufficient balance. Overdraft limit reached. "
-                f"Current balance: {self.balance:.2f}."
+                f"Current balance: {format_money(self.balance)}."
             )
             return
 
         # Perform transfer
-        self.balance = round(self.balance - amount, 2)
-        other_account.balance = round(other_account.balance + amount, 2)
+        self.balance -= amount
+        other_account.balance += amount
 
         # Add history entries on both sides
         self.transactions.append(
@@ -104,7 +116,7 @@ class BankAccount:
                         f"from {self.iban}")
         )
 
-        print(f"Transferred {amount:.2f} from {self.iban} to {other_account.iban}.")
+        print(f"Transferred {format_money(amount)} from {self.iban} to {other_account.iban}.")
 
     def print_history(self):
         """Print transaction history to the console."""
@@ -120,28 +132,30 @@ class BankAccount:
         """Serialize account to a plain dict (for JSON, etc.)."""
         return {
             "owner": self.owner,
-            "balance": float(self.balance),
+            "balance": from_cents(self.balance),
             "iban": self.iban,
-            "overdraft_limit": float(self.overdraft_limit),
+            "overdraft_limit": from_cents(self.overdraft_limit),
             "transactions": [t.to_dict() for t in self.transactions],
         }
 
     def __str__(self):
         return (
             f"Account(owner={self.owner}, "
-            f"IBAN={self.iban}, balance={self.balance:.2f}, "
-            f"overdraft={self.overdraft_limit:.2f})"
+            f"IBAN={self.iban}, balance={format_money(self.balance)}, "
+            f"overdraft={format_money(self.overdraft_limit)})"
         )
 
 
 class Transaction:
+    __slots__ = ("t_type", "amount", "balance_after", "details")
+
     def __init__(self, t_type, amount, balance_after, details=""):
         if not isinstance(t_type, str) or not t_type.strip():
             raise ValueError("Transaction type must be a non-empty string.")
-        if not isinstance(amount, (int, float)) or amount < 0:
-            raise ValueError("Amount must be a positive number.")
-        if not isinstance(balance_after, (int, float)):
-            raise ValueError("Balance must be a number.")
+        if not is_cents(amount) or amount < 0:
+            raise ValueError("Amount must be a positive number of cents.")
+        if not is_cents(balance_after):
+            raise ValueError("Balance must be a number of cents.")
 
         self.t_type = t_type.strip().upper()
         self.amount = amount
@@ -151,13 +165,13 @@ class Transaction:
     def to_dict(self) -> dict:
         return {
             "type": self.t_type,
-            "amount": float(self.amount),
-            "balance_after": float(self.balance_after),
+            "amount": from_cents(self.amount),
+            "balance_after": from_cents(self.balance_after),
             "details": self.details,
         }
 
     def __str__(self):
         return (
-            f"{self.t_type} {self.amount:.2f} -> "
-            f"balance {self.balance_after:.2f} {self.details}"
+            f"{self.t_type} {format_money(self.amount)} -> "
+            f"balance {format_money(self.balance_after)} {self.details}"
         )
@@ -0,0 +1,336 @@
+"""Virtualized account list for very large account counts.
+
+An admin may see a million accounts; inserting one Listbox row per
+account makes startup and every refresh O(N). AccountListView instead
+keeps a Listbox exactly as tall as the visible window and redraws only
+those rows as the user scrolls. AccountWindow fetches the rows from the
+database a page at a time: by keyset (id > / id <) next to a page it
+already has, by offset only for jumps (dragging the scrollbar).
+Creating or deleting an account patches the cached pages and redraws
+only the Listbox lines whose label changed.
+
+AccountSearchBox filters the list as the user types: after a short pause
+it swaps the view's AccountWindow for the SearchResults of
+db.search_accounts (IBAN, owner or username prefix, indexed).
+"""
+import tkinter as tk
+from collections import OrderedDict
+
+import db
+
+PAGE_SIZE = 100
+# Pages kept in memory (about 10k rows).
+MAX_PAGES = 100
+# Search results shown at most, and the pause in typing before searching.
+SEARCH_LIMIT = 200
+SEARCH_DELAY_MS = 150
+
+
+class AccountWindow:
+    """Random access to the account rows of one user (or all users) by position.
+
+    Keeps an LRU of fetched pages. count is read from balance_totals, so
+    it is O(1) as well.
+    """
+
+    def __init__(self, user_id: int | None = None, page_size: int = PAGE_SIZE):
+        self.user_id = user_id
+        self.page_size = page_size
+        self._pages: OrderedDict[int, list] = OrderedDict()
+        self.count = 0
+        self.reload()
+
+    def reload(self):
+        """Forget every cached page and re-read the account count."""
+        self._pages.clear()
+        summary_user = db.ALL_USERS if self.user_id is None else self.user_id
+        self.count = db.get_balance_summary(summary_user)["account_count"]
+
+    def _page(self, number: int) -> list:
+        page = self._pages.get(number)
+        if page is not None:
+            self._pages.move_to_end(number)
+            return page
+        size = self.page_size
+        before, after = self._pages.get(number - 1), self._pages.get(number + 1)
+        if before:
+            page = db.load_accounts_after(before[-1]["account_id"], size, self.user_id)
+        elif after:
+            page = db.load_accounts_before(after[0]["account_id"], size, self.user_id)
+        else:
+            page = db.load_accounts_at(number * size, size, self.user_id)
+        self._pages[number] = page
+        if len(self._pages) > MAX_PAGES:
+            self._pages.popitem(last=False)
+        return page
+
+    def add(self, row):
+        """A new account: it has the highest id, so it goes at the end."""
+        number, offset = divmod(self.count, self.page_size)
+        page = self._pages.get(number)
+        if page is not None:
+            if len(page) == offset:
+                page.append(row)
+            else:
+                del self._pages[number]
+        self.count += 1
+
+    def remove(self, account_id: int):
+        """A deleted account: drop it from its page and the pages after it."""
+        for number, page in self._pages.items():
+            for index, row in enumerate(page):
+                if row["account_id"] == account_id:
+                    del page[index]
+                    # Every later row moved up one position; those pages are
+                    # re-read by keyset from this one when needed.
+                    for later in [n for n in self._pages if n > number]:
+                        del self._pages[later]
+                    self._refill(number)
+                    self.count -= 1
+                    return
+        # Not cached: positions of the cached rows are unknown now
+        self._pages.clear()
+        self.count -= 1
+
+    def _refill(self, number: int):
+        page = self._pages[number]
+        if page:
+            page.extend(db.load_accounts_after(page[-1]["account_id"], self.page_size - len(page), self.user_id))
+        else:
+            del self._pages[number]
+
+    def rows(self, start: int, stop: int) -> list:
+        """Rows at positions start..stop-1 (fewer at the end of the list)."""
+        stop = min(stop, self.count)
+        result = []
+        position = start
+        while position < stop:
+            number, offset = divmod(position, self.page_size)
+            page = self._page(number)
+            if offset >= len(page):
+                break   # the table shrank since count was read
+            chunk = page[offset:offset + stop - position]
+            result.extend(chunk)
+            position += len(chunk)
+        return result
+
+
+class SearchResults:
+    """The accounts matching a search, with the same interface as AccountWindow."""
+
+    def __init__(self, text: str, user_id: int | None = None, limit: int = SEARCH_LIMIT):
+        self.text = text
+        self.user_id = user_id
+        self.limit = limit
+        self._rows: list = []
+        self.count = 0
+        self.reload()
+
+    def reload(self):
+        """Run the search again (after a create/delete)."""
+        self._rows = db.search_accounts(self.text, self.limit, self.user_id)
+        self.count = len(self._rows)
+
+    def matches(self, row) -> bool:
+        text = self.text.strip().casefold()
+        return any(row[field].casefold().startswith(text) for field in ("iban", "owner", "user_name"))
+
+    def add(self, row):
+        if self.count < self.limit and self.matches(row):
+            self._rows.append(row)
+            self.count += 1
+
+    def remove(self, account_id: int):
+        self._rows = [row for row in self._rows if row["account_id"] != account_id]
+        self.count = len(self._rows)
+
+    def rows(self, start: int, stop: int) -> list:
+        return self._rows[start:stop]
+
+
+class AccountListView(tk.Frame):
+    """A Listbox + Scrollbar that only ever holds the visible rows.
+
+    format_row(row) gives the label; on_select(row) is called when the
+    user selects a row.
+    """
+
+    def __init__(self, master, window: AccountWindow, format_row, on_select=None,
+                 height: int = 5, width: int = 35):
+        super().__init__(master)
+        self.window = window
+        self.format_row = format_row
+        self.on_select = on_select
+        self.height = height
+        self.top = 0
+        self.selected_id: int | None = None
+        # What the Listbox shows: rows and labels by line, line by account id
+        self._visible: list = []
+        self._labels: list[str] = []
+        self._line_of: dict[int, int] = {}
+
+        self.listbox = tk.Listbox(self, height=height, width=width, exportselection=False)
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.listbox.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.listbox.bind("<<ListboxSelect>>", self._on_listbox_select)
+        self.listbox.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1))
+        self.listbox.bind("<Button-4>", lambda e: self.scroll(-1))
+        self.listbox.bind("<Button-5>", lambda e: self.scroll(1))
+        self.listbox.bind("<Up>", lambda e: self._move_selection(-1))
+        self.listbox.bind("<Down>", lambda e: self._move_selection(1))
+        self.listbox.bind("<Prior>", lambda e: self.scroll(-self.height))
+        self.listbox.bind("<Next>", lambda e: self.scroll(self.height))
+
+    # ---------- data ----------
+    @property
+    def count(self) -> int:
+        return self.window.count
+
+    def reload(self):
+        """Re-read the accounts (after a create/delete) and redraw."""
+        self.window.reload()
+        self.scroll_to(self.top)
+
+    def account_added(self, row):
+        """Show a new account without re-reading the list."""
+        self.window.add(row)
+        self._render()
+
+    def account_removed(self, account_id: int):
+        """Drop a deleted account without re-reading the list."""
+        self.window.remove(account_id)
+        if self.selected_id == account_id:
+            self.selected_id = None
+        self.scroll_to(self.top)
+
+    def set_window(self, window):
+        """Show another set of rows (e.g. search results) from the top."""
+        self.window = window
+        self.scroll_to(0)
+
+    def first_row(self):
+        rows = self.window.rows(0, 1)
+        return rows[0] if rows else None
+
+    # ---------- scrolling ----------
+    def scroll_to(self, top: int):
+        self.top = max(0, min(top, self.count - self.height))
+        self._render()
+        return "break"
+
+    def scroll(self, rows: int):
+        return self.scroll_to(self.top + rows)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * self.count))
+        elif unit == "pages":
+            self.scroll(int(amount) * self.height)
+        else:
+            self.scroll(int(amount))
+
+    # ---------- drawing ----------
+    def _render(self):
+        """Bring the Listbox up to date, touching only lines that changed."""
+        rows = self.window.rows(self.top, self.top + self.height)
+        labels = [self.format_row(row) for row in rows]
+        for line, label in enumerate(labels):
+            if line >= len(self._labels):
+                self.listbox.insert(tk.END, label)
+            elif label != self._labels[line]:
+                self.listbox.delete(line)
+                self.listbox.insert(line, label)
+        if len(labels) < len(self._labels):
+            self.listbox.delete(len(labels), tk.END)
+        self._visible = rows
+        self._labels = labels
+        self._line_of = {row["account_id"]: line for line, row in enumerate(rows)}
+        self._show_selection()
+        if self.count:
+            self.scrollbar.set(self.top / self.count, (self.top + len(self._visible)) / self.count)
+        else:
+            self.scrollbar.set(0, 1)
+
+    # ---------- selection ----------
+    def select_id(self, account_id: int | None):
+        """Highlight the account (if visible) without calling on_select."""
+        self.selected_id = account_id
+        self._show_selection()
+
+    def _show_selection(self):
+        self.listbox.selection_clear(0, tk.END)
+        line = self._line_of.get(self.selected_id)
+        if line is not None:
+            self.listbox.selection_set(line)
+
+    def _on_listbox_select(self, event):
+        selection = self.listbox.curselection()
+        if not selection or selection[0] >= len(self._visible):
+            return
+        row = self._visible[selection[0]]
+        self.selected_id = row["account_id"]
+        if self.on_select:
+            self.on_select(row)
+
+    def _move_selection(self, step: int):
+        selection = self.listbox.curselection()
+        index = (selection[0] if selection else -1) + step
+        if index < 0:
+            self.scroll(-1)
+            index = 0
+        elif index >= len(self._visible):
+            self.scroll(1)
+            index = len(self._visible) - 1
+        if 0 <= index < len(self._visible):
+            self.listbox.selection_clear(0, tk.END)
+            self.listbox.selection_set(index)
+            self._on_listbox_select(None)
+        return "break"
+
+
+class AccountSearchBox(tk.Frame):
+    """Search entry for an AccountListView, debounced by SEARCH_DELAY_MS.
+
+    An empty box shows every account again. Escape clears it.
+    """
+
+    def __init__(self, master, view: AccountListView, delay_ms: int = SEARCH_DELAY_MS):
+        super().__init__(master)
+        self.view = view
+        self.delay_ms = delay_ms
+        # The unfiltered rows, shown again when the box is cleared
+        self.all_accounts = view.window
+        self._job = None
+
+        self.text = tk.StringVar()
+        self.label = tk.Label(self, text="Search:")
+        self.entry = tk.Entry(self, textvariable=self.text, width=28)
+        self.label.pack(side="left")
+        self.entry.pack(side="left", fill="x", expand=True)
+
+        self.text.trace_add("write", self._on_change)
+        self.entry.bind("<Return>", lambda e: self.search_now())
+        self.entry.bind("<Escape>", lambda e: self.clear())
+
+    def _on_change(self, *args):
+        # Restart the timer on every keystroke; only the last one searches.
+        if self._job is not None:
+            self.after_cancel(self._job)
+        self._job = self.after(self.delay_ms, self.search_now)
+
+    def search_now(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+        text = self.text.get().strip()
+        if text:
+            self.view.set_window(SearchResults(text, self.all_accounts.user_id))
+        else:
+            self.all_accounts.reload()
+            self.view.set_window(self.all_accounts)
+
+    def clear(self):
+        self.text.set("")
+        self.search_now()
@@ -0,0 +1,33 @@
+"""Stand-in for the Tk event loop when there is no display.
+
+AfterLoop offers Tk's after(ms, func, *args) and a run(until) that
+calls the due callbacks in order until until() is true, so code written
+against root.after (e.g. AssistantWorker) runs in tests and benchmarks
+without a window.
+"""
+import heapq
+import time
+
+
+class AfterLoop:
+    def __init__(self, timeout: float | None = None):
+        """With a timeout (seconds), run() raises TimeoutError after that long."""
+        self.timeout = timeout
+        self._queue = []
+        self._seq = 0
+
+    def after(self, ms, func, *args):
+        self._seq += 1
+        heapq.heappush(self._queue, (time.perf_counter() + ms / 1000, self._seq, func, args))
+
+    def run(self, until):
+        deadline = None if self.timeout is None else time.perf_counter() + self.timeout
+        while not until():
+            if deadline is not None and time.perf_counter() > deadline:
+                raise TimeoutError("event loop timed out")
+            if not self._queue:
+                time.sleep(0.001)
+                continue
+            due, _, func, args = heapq.heappop(self._queue)
+            time.sleep(max(0.0, due - time.perf_counter()))
+            func(*args)
@@ -0,0 +1,165 @@
+"""Backends that answer assistant questions.
+
+A backend has ask(prompt) -> str and stream(prompt), which yields the
+answer in chunks; both raise on failure. ai_client picks one (see
+ai_client.get_backend) and adds caching and error messages on top.
+
+OpenAIBackend talks to the OpenAI Responses API. LocalBackend answers
+in-process from a template with configurable latency and error rate, so
+the assistant can be tested and load-tested without network access;
+fake_openai.py serves the same answers over HTTP.
+"""
+import random
+import threading
+import time
+
+MODEL = "gpt-4.1-mini"
+
+# Seconds before an OpenAI request gives up (the SDK default is 600 s, plus
+# retries), so a stalled request cannot hang the assistant for minutes.
+REQUEST_TIMEOUT = 30.0
+MAX_RETRIES = 1
+
+
+class BackendError(Exception):
+    """A (possibly simulated) failure of the assistant backend."""
+
+
+def question_of(prompt: str) -> str:
+    """The "User question:" line of a BankApp prompt, or the whole prompt."""
+    question = prompt
+    for line in prompt.splitlines():
+        if line.startswith("User question:"):
+            question = line.removeprefix("User question:").strip()
+    return question
+
+
+def tokens(text: str) -> list[str]:
+    """Split text into word-sized chunks that join back to text."""
+    words = text.split(" ")
+    return [words[0]] + [" " + w for w in words[1:]]
+
+
+class AssistantBackend:
+    name = "base"
+
+    def ask(self, prompt: str) -> str:
+        raise NotImplementedError
+
+    def stream(self, prompt: str):
+        """Yield the answer in chunks; by default all at once."""
+        yield self.ask(prompt)
+
+
+class OpenAIBackend(AssistantBackend):
+    name = "openai"
+
+    def __init__(self, model: str = MODEL, client=None, max_output_tokens: int = 300,
+                 timeout: float = REQUEST_TIMEOUT, max_retries: int = MAX_RETRIES):
+        self.model = model
+        self.max_output_tokens = max_output_tokens
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._client = client
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """The OpenAI client, created on first use (thread-safe).
+
+        openai and config.py are imported only here, so the app starts
+        without them.
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from openai import OpenAI
+                    from config import OPENAI_API_KEY
+                    self._client = OpenAI(
+                        api_key=OPENAI_API_KEY, timeout=self.timeout, max_retries=self.max_retries
+                    )
+        return self._client
+
+    def ask(self, prompt: str) -> str:
+        response = self.client.responses.create(
+            model=self.model,
+            input=prompt,
+            max_output_tokens=self.max_output_tokens,
+        )
+        return response.output[0].content[0].text
+
+    def stream(self, prompt: str):
+        """Yield output_text deltas from the Responses API event stream."""
+        stream = self.client.responses.create(
+            model=self.model,
+            input=prompt,
+            max_output_tokens=self.max_output_tokens,
+            stream=True,
+        )
+        with stream:
+            for event in stream:
+                if event.type == "response.output_text.delta":
+                    yield event.delta
+                elif event.type == "error":
+                    raise BackendError(event.message)
+                elif event.type == "response.failed":
+                    error = event.response.error
+                    raise BackendError(error.message if error else "the response failed")
+
+
+class LocalBackend(AssistantBackend):
+    """Deterministic offline stand-in for the model.
+
+    Every call waits latency seconds (plus up to jitter more), then fails
+    with BackendError with probability error_rate, else answers from
+    template. Streams send one word every token_delay seconds. The same
+    seed gives the same sequence of delays and failures.
+    """
+    name = "local"
+
+    def __init__(
+            self,
+            latency: float = 0.5,
+            jitter: float = 0.0,
+            error_rate: float = 0.0,
+            token_delay: float = 0.03,
+            seed: int | None = 0,
+            template: str = "This is a test answer to: {question}",
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.token_delay = token_delay
+        self.template = template
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def answer(self, prompt: str) -> str:
+        return self.template.format(question=question_of(prompt))
+
+    def _start(self):
+        """Wait for the simulated latency and maybe fail, like a request would."""
+        with self._lock:
+            delay = self.latency + self._rng.random() * self.jitter
+            failed = self._rng.random() < self.error_rate
+            self.calls += 1
+            self.errors += failed
+        time.sleep(delay)
+        if failed:
+            raise BackendError("simulated backend failure")
+
+    def ask(self, prompt: str) -> str:
+        self._start()
+        return self.answer(prompt)
+
+    def stream(self, prompt: str):
+        self._start()
+        for i, token in enumerate(tokens(self.answer(prompt))):
+            if i and self.token_delay:
+                time.sleep(self.token_delay)
+            yield token
+
+
+BACKENDS = {"openai": OpenAIBackend, "local": LocalBackend}
@@ -0,0 +1,82 @@
+"""Persistent LRU + TTL cache for assistant answers.
+
+Answers are stored in the assistant_cache table, so they survive
+restarts. The key is the user's question, normalized (case, spacing,
+trailing punctuation), together with the account id and the account
+context that went into the prompt (owner, IBAN, balance, ...), if any.
+The model may repeat any of that context in the answer, so such an
+answer is only reused for the same account in the same state. General
+questions are sent without account data (see ai_client.build_prompt)
+and keyed on the question alone, so every account shares them.
+
+Entries older than CACHE_TTL are not used; beyond CACHE_MAX_ENTRIES the
+least recently used ones are evicted. stats() reports the hit rate of
+this process.
+"""
+import hashlib
+import threading
+import time
+
+import db
+
+CACHE_TTL = 7 * 24 * 3600
+CACHE_MAX_ENTRIES = 1000
+
+_lock = threading.Lock()
+_hits = 0
+_misses = 0
+
+
+def normalize_question(question: str) -> str:
+    """Lower-case, collapse whitespace and drop trailing punctuation."""
+    return " ".join(question.lower().split()).rstrip(" ?!.,;:")
+
+
+def cache_key(question: str, context: str = "", account_id: int | None = None) -> str:
+    """Storage key for a question asked about an account.
+
+    context is everything besides the question that the prompt says
+    about the account; it is always part of the key.
+    """
+    account = "" if account_id is None else str(account_id)
+    text = "\x1f".join((normalize_question(question), account, context))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def get(key: str) -> str | None:
+    global _hits, _misses
+    now = time.time()
+    answer = db.get_cached_answer(key, now - CACHE_TTL, now)
+    with _lock:
+        if answer is None:
+            _misses += 1
+        else:
+            _hits += 1
+    return answer
+
+
+def put(key: str, answer: str):
+    db.put_cached_answer(key, answer, time.time(), CACHE_MAX_ENTRIES)
+
+
+def purge_expired() -> int:
+    return db.purge_cached_answers(time.time() - CACHE_TTL)
+
+
+def stats() -> dict:
+    """Hits, misses and hit rate of this process, plus the stored entry count."""
+    with _lock:
+        hits, misses = _hits, _misses
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / lookups if lookups else 0.0,
+        "entries": db.get_cached_answers_count(),
+    }
+
+
+def reset_stats():
+    global _hits, _misses
+    with _lock:
+        _hits = _misses = 0
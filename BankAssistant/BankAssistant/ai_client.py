@@ -1,16 +1,123 @@
-from openai import OpenAI
-from config import OPENAI_API_KEY
+"""Assistant answers for the GPT fallback.
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+The answers come from a backend (see ai_backends.py): "openai" by
+default, or "local", an offline stand-in, when the
+BANK_ASSISTANT_BACKEND environment variable or ASSISTANT_BACKEND in
+config.py says so. ask_gpt/stream_gpt add the answer cache on top.
 
-def ask_gpt(prompt: str) -> str:
+Neither openai nor config.py is imported until the first question that
+needs the model, so the app starts without them (and without paying for
+the openai import); the assistant then answers with an [OpenAI error].
+"""
+import os
+import threading
+
+import ai_cache
+from ai_backends import BACKENDS, AssistantBackend
+from assistant_commands import is_general
+from money import format_money
+
+DEFAULT_BACKEND = "openai"
+
+_backend: AssistantBackend | None = None
+_backend_lock = threading.Lock()
+
+
+def _configured_backend() -> str:
+    """BANK_ASSISTANT_BACKEND env var, then ASSISTANT_BACKEND in config.py, then the default."""
+    name = os.environ.get("BANK_ASSISTANT_BACKEND")
+    if name:
+        return name
     try:
-        response = client.responses.create(
-            model="gpt-4.1-mini",
-            input=prompt,
-            max_output_tokens=300,
+        from config import ASSISTANT_BACKEND
+    except ImportError:
+        return DEFAULT_BACKEND
+    return ASSISTANT_BACKEND
+
+
+def get_backend() -> AssistantBackend:
+    """The backend in use, created on first use (thread-safe)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                name = _configured_backend()
+                if name not in BACKENDS:
+                    raise ValueError(
+                        f"Unknown assistant backend {name!r}. Choose one of: {', '.join(BACKENDS)}"
+                    )
+                _backend = BACKENDS[name]()
+    return _backend
+
+
+def set_backend(backend: AssistantBackend | None) -> AssistantBackend | None:
+    """Use backend from now on (None: the configured one); return the previous one."""
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    return previous
+
+
+def build_prompt(question: str, account) -> tuple[str, str]:
+    """The GPT prompt for a question about account, and its cache key.
+
+    A general question (see assistant_commands.is_general) is sent
+    without the account data and keyed on the question alone, so one
+    answer serves every account; otherwise the key covers the account
+    and everything the prompt says about it.
+    """
+    if is_general(question):
+        context = ""
+        key = ai_cache.cache_key(question)
+    else:
+        context = (
+            "Current account:\n"
+            f"- Owner: {account.owner}\n"
+            f"- IBAN: {account.iban}\n"
+            f"- Balance: {format_money(account.balance)}\n"
+            f"- Overdraft limit: {format_money(account.overdraft_limit)}\n\n"
         )
-        message = response.output[0].content[0].text
-        return message
+        key = ai_cache.cache_key(question, context, account.db_id)
+    prompt = (
+        "You are a banking assistant inside a small desktop demo app.\n"
+        "You can NOT actually move real money, but you can explain things.\n"
+        f"{context}"
+        f"User question: {question}\n\n"
+        "Answer briefly and clearly. If the user asks to deposit or withdraw, "
+        "explain what would happen, but do not say that you executed it yourself."
+    )
+    return prompt, key
+
+
+def ask_gpt(prompt: str, cache_key: str | None = None) -> str:
+    """Ask the backend; with a cache_key (see ai_cache.cache_key) reuse stored answers."""
+    if cache_key is not None:
+        cached = ai_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    try:
+        message = get_backend().ask(prompt)
     except Exception as e:
-        return f"[OpenAI error] {e}"
\ No newline at end of file
+        return f"[OpenAI error] {e}"
+    if cache_key is not None:
+        ai_cache.put(cache_key, message)
+    return message
+
+
+def stream_gpt(prompt: str, cache_key: str | None = None):
+    """Yield the answer as text chunks while the backend produces it.
+
+    A cached answer is yielded in one piece. Errors are raised, not
+    returned as text.
+    """
+    if cache_key is not None:
+        cached = ai_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+    parts = []
+    for chunk in get_backend().stream(prompt):
+        parts.append(chunk)
+        yield chunk
+    if cache_key is not None and parts:
+        ai_cache.put(cache_key, "".join(parts))
@@ -0,0 +1,144 @@
+"""Run assistant questions off the Tk thread.
+
+Tk widgets may only be touched from the thread running mainloop, and a
+GPT round-trip takes seconds. AssistantWorker runs the call on a worker
+thread and polls for the answer with root.after, so the callback always
+runs on the Tk thread and the window keeps handling events meanwhile.
+
+submit_stream() does the same for a streamed answer: chunks are handed
+to the Tk thread as they arrive, so the first words show up long before
+the whole answer is ready.
+
+Only the newest question counts: submitting another one or calling
+cancel() (e.g. when the user switches accounts) drops the pending answer.
+
+Every question runs on its own daemon thread. A request still on the
+wire when the window closes cannot be interrupted, but it does not keep
+the process alive either (ThreadPoolExecutor threads are joined at exit).
+"""
+import queue
+import threading
+from concurrent.futures import Future
+
+# How often the Tk thread checks for a finished answer.
+POLL_MS = 50
+
+
+class AssistantWorker:
+    def __init__(self, after, ask, stream=None):
+        """after is root.after (or anything with its signature); ask(prompt) -> str.
+
+        stream(prompt) yields the answer in chunks (needed for submit_stream).
+        """
+        self._after = after
+        self._ask = ask
+        self._stream = stream
+        self._closed = False
+        # Bumped on every submit/cancel; answers from older generations are dropped.
+        self._generation = 0
+        self._future: Future | None = None
+
+    @property
+    def busy(self) -> bool:
+        return self._future is not None
+
+    def _start(self, fn, *args) -> Future:
+        """Run fn(*args) on a new daemon thread; its outcome ends up in the Future."""
+        if self._closed:
+            raise RuntimeError("The assistant worker has been shut down.")
+        future = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                result = fn(*args)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+        threading.Thread(target=run, name="assistant", daemon=True).start()
+        return future
+
+    def submit(self, prompt: str, on_answer, **kwargs):
+        """Ask in the background; on_answer(text) is called on the Tk thread.
+
+        kwargs are passed on to ask (e.g. cache_key).
+        """
+        self.cancel()
+        future = self._start(lambda: self._ask(prompt, **kwargs))
+        self._future = future
+        self._after(POLL_MS, self._poll, self._generation, future, on_answer)
+
+    def _poll(self, generation: int, future: Future, on_answer):
+        if generation != self._generation:
+            return
+        if not future.done():
+            self._after(POLL_MS, self._poll, generation, future, on_answer)
+            return
+        self._future = None
+        try:
+            answer = future.result()
+        except Exception as e:
+            answer = f"[OpenAI error] {e}"
+        on_answer(answer)
+
+    def submit_stream(self, prompt: str, on_chunk, on_done, **kwargs):
+        """Stream an answer in the background.
+
+        on_chunk(text) is called on the Tk thread for every chunk, then
+        on_done(error) with None or an "[OpenAI error] ..." message.
+        """
+        self.cancel()
+        chunks = queue.SimpleQueue()
+        future = self._start(self._pump, self._generation, chunks, prompt, kwargs)
+        self._future = future
+        self._after(POLL_MS, self._poll_stream, self._generation, future, chunks, on_chunk, on_done)
+
+    def _pump(self, generation: int, chunks: queue.SimpleQueue, prompt: str, kwargs: dict):
+        """Worker thread: move chunks into the queue until done or cancelled."""
+        stream = self._stream(prompt, **kwargs)
+        try:
+            for chunk in stream:
+                if generation != self._generation:
+                    return
+                chunks.put(chunk)
+        finally:
+            stream.close()
+
+    def _poll_stream(self, generation: int, future: Future, chunks: queue.SimpleQueue, on_chunk, on_done):
+        if generation != self._generation:
+            return
+        # Check for completion first: everything queued before it is drained below.
+        done = future.done()
+        while True:
+            try:
+                chunk = chunks.get_nowait()
+            except queue.Empty:
+                break
+            on_chunk(chunk)
+            if generation != self._generation:
+                return
+        if not done:
+            self._after(POLL_MS, self._poll_stream, generation, future, chunks, on_chunk, on_done)
+            return
+        self._future = None
+        error = future.exception()
+        on_done(None if error is None else f"[OpenAI error] {error}")
+
+    def cancel(self):
+        """Forget the pending question; its answer will never be delivered.
+
+        A request already on the wire cannot be interrupted, but its result
+        is discarded when it arrives.
+        """
+        self._generation += 1
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+    def shutdown(self):
+        """Drop the pending question and refuse new ones (when the window closes)."""
+        self.cancel()
+        self._closed = True
@@ -0,0 +1,142 @@
+"""Account analytics computed with NumPy.
+
+For one or many accounts: money in and out per calendar month, daily
+average balance (mean of end-of-day balances), minimum balance, days
+that ended in overdraft and the burn rate (average net outflow per
+month). The ledger rows are loaded into arrays once and every figure is
+computed on the arrays; there is no per-row Python loop.
+
+NumPy is optional for the rest of the app; these functions raise
+RuntimeError when it is not installed. Amounts are in cents.
+"""
+from dataclasses import dataclass, field
+from itertools import chain
+
+import db
+from money import format_money
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SECONDS_PER_DAY = 86_400
+
+
+@dataclass
+class AccountAnalytics:
+    account_id: int
+    movements: int
+    # (month "YYYY-MM", inflow, outflow), oldest first
+    monthly: list[tuple[str, int, int]] = field(default_factory=list)
+    average_daily_balance: int = 0
+    min_balance: int = 0
+    overdraft_days: int = 0
+    # average (outflow - inflow) per month; negative when the account grows
+    burn_rate: int = 0
+
+    def summary(self) -> str:
+        lines = [
+            f"Movements: {self.movements}",
+            f"Average daily balance: {format_money(self.average_daily_balance)}",
+            f"Lowest balance: {format_money(self.min_balance)}",
+            f"Days in overdraft: {self.overdraft_days}",
+            f"Burn rate: {format_money(self.burn_rate)} per month",
+        ]
+        if self.monthly:
+            lines.append("")
+            lines.append("Month      In          Out")
+            for month, inflow, outflow in self.monthly:
+                lines.append(f"{month}  {format_money(inflow):>10}  {format_money(outflow):>10}")
+        return "\n".join(lines)
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("Analytics needs NumPy. Install it with: pip install numpy")
+
+
+def load_arrays(account_ids: list[int] | None = None) -> dict:
+    """Ledger columns as arrays, ordered by account and then by id."""
+    _require_numpy()
+    chunks = [
+        np.fromiter(chain.from_iterable(batch), dtype=np.int64, count=4 * len(batch))
+        for batch in db.iter_ledger_batches(account_ids)
+    ]
+    data = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+    data = data.reshape(-1, 4)
+    return {
+        "account_id": data[:, 0],
+        "delta": data[:, 1],
+        "balance_after": data[:, 2],
+        "timestamp": data[:, 3],
+    }
+
+
+def _analyse_one(account_id: int, delta, balance, timestamp, until_day: int | None) -> AccountAnalytics:
+    result = AccountAnalytics(account_id=account_id, movements=len(delta))
+    if not len(delta):
+        return result
+    # Imported statements may not be in date order; the day lookup needs it.
+    if np.any(np.diff(timestamp) < 0):
+        order = np.argsort(timestamp, kind="stable")
+        delta, balance, timestamp = delta[order], balance[order], timestamp[order]
+
+    # Monthly in/out: group by calendar month with bincount.
+    months = timestamp.astype("datetime64[s]").astype("datetime64[M]")
+    unique_months, month_index = np.unique(months, return_inverse=True)
+    inflow = np.bincount(month_index, weights=np.where(delta > 0, delta, 0), minlength=len(unique_months))
+    outflow = np.bincount(month_index, weights=np.where(delta < 0, -delta, 0), minlength=len(unique_months))
+    result.monthly = [
+        (str(m), int(i), int(o))
+        for m, i, o in zip(unique_months, inflow.round(), outflow.round())
+    ]
+    result.burn_rate = int(round(float((outflow - inflow).mean())))
+
+    # End-of-day balances, carried forward over days without movements.
+    days = timestamp // SECONDS_PER_DAY
+    last_day = days[-1] if until_day is None else max(days[-1], until_day)
+    all_days = np.arange(days[0], last_day + 1)
+    last_row = np.searchsorted(days, all_days, side="right") - 1
+    end_of_day = balance[last_row]
+
+    result.average_daily_balance = int(round(float(end_of_day.mean())))
+    result.min_balance = int(balance.min())
+    result.overdraft_days = int(np.count_nonzero(end_of_day < 0))
+    return result
+
+
+def analyse_accounts(account_ids: list[int] | None = None, until: float | None = None) -> dict[int, AccountAnalytics]:
+    """Analytics for the given accounts (all accounts when None).
+
+    Daily figures run from each account's first movement to its last one,
+    or to the Unix timestamp until if that is later (e.g. today).
+    """
+    arrays = load_arrays(account_ids)
+    ids = arrays["account_id"]
+    until_day = None if until is None else int(until) // SECONDS_PER_DAY
+
+    # Rows are sorted by account: split the arrays at every account change.
+    bounds = np.flatnonzero(np.diff(ids)) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [len(ids)]))
+
+    results = {}
+    for start, end in zip(starts, ends):
+        if start == end:
+            continue
+        account_id = int(ids[start])
+        results[account_id] = _analyse_one(
+            account_id,
+            arrays["delta"][start:end],
+            arrays["balance_after"][start:end],
+            arrays["timestamp"][start:end],
+            until_day,
+        )
+    for account_id in account_ids or ():
+        results.setdefault(account_id, AccountAnalytics(account_id=account_id, movements=0))
+    return results
+
+
+def analyse_account(account_id: int, until: float | None = None) -> AccountAnalytics:
+    return analyse_accounts([account_id], until)[account_id]
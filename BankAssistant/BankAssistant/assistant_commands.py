@@ -0,0 +1,143 @@
+"""Parse assistant questions into commands, independent of the UI.
+
+The rules are a table: each command has aliases (English and Bulgarian)
+and a way they must appear in the lower-cased question:
+
+    word      the question is the alias or starts with it plus a space
+    prefix    the question starts with the alias
+    contains  the alias appears anywhere
+
+The table is compiled into one regular expression whose alternatives are
+tried in table order, so the first matching rule wins, exactly like the
+old if/elif chain. Anything no rule matches is a question for GPT (ASK).
+"""
+import re
+from dataclasses import dataclass
+
+from money import to_cents
+
+BALANCE = "balance"
+DEPOSIT = "deposit"
+WITHDRAW = "withdraw"
+HISTORY = "history"
+ANALYTICS = "analytics"
+OWNER = "owner"
+IBAN = "iban"
+RESET = "reset"
+SET_OVERDRAFT = "set_overdraft"
+OVERDRAFT = "overdraft"
+ASK = "ask"
+
+# (command, how the aliases must appear, aliases), in priority order
+RULES = [
+    (BALANCE, "word", ("balance", "баланс")),
+    (DEPOSIT, "prefix", ("deposit",)),
+    (WITHDRAW, "prefix", ("withdraw",)),
+    (HISTORY, "contains", ("history", "история")),
+    (ANALYTICS, "word", ("analytics", "анализ")),
+    (OWNER, "contains", ("owner", "собственик")),
+    (IBAN, "prefix", ("iban",)),
+    (RESET, "prefix", ("reset",)),
+    (SET_OVERDRAFT, "prefix", ("set overdraft",)),
+    (OVERDRAFT, "word", ("overdraft", "овърдрафт")),
+]
+
+# Commands with an amount: (index of the amount in q.split(), usage, invalid amount message)
+ARGUMENTS = {
+    DEPOSIT: (1, "Use: deposit <amount>", "Invalid amount"),
+    WITHDRAW: (1, "Use: withdraw <amount>", "Invalid amount"),
+    SET_OVERDRAFT: (2, "Use: set overdraft <amount>", "Overdraft must be a number"),
+}
+
+_MATCHERS = {
+    "word": r"(?:{})(?: |\Z)",
+    "prefix": r"(?:{})",
+    "contains": r".*?(?:{})",
+}
+
+
+def compile_rules(rules) -> re.Pattern:
+    """One anchored regex with a named group per command, in rule order."""
+    alternatives = [
+        f"(?P<{name}>{_MATCHERS[how].format('|'.join(map(re.escape, aliases)))})"
+        for name, how, aliases in rules
+    ]
+    return re.compile("|".join(alternatives), re.DOTALL)
+
+
+_RULES_RE = compile_rules(RULES)
+
+
+@dataclass(frozen=True, slots=True)
+class Command:
+    name: str
+    # cents, for DEPOSIT, WITHDRAW and SET_OVERDRAFT
+    amount: int | None = None
+    # the question as typed (what ASK sends to GPT)
+    text: str = ""
+    # why the command cannot run (bad or missing argument)
+    error: str | None = None
+
+
+def parse(text: str) -> Command:
+    """Turn one assistant question into a Command."""
+    text = text.strip()
+    q = text.lower()
+    match = _RULES_RE.match(q)
+    if match is None:
+        return Command(ASK, text=text)
+    name = match.lastgroup
+    if name not in ARGUMENTS:
+        return Command(name, text=text)
+
+    index, usage, invalid = ARGUMENTS[name]
+    parts = q.split()
+    if len(parts) <= index:
+        return Command(name, text=text, error=usage)
+    try:
+        amount = to_cents(parts[index])
+    except ValueError:
+        return Command(name, text=text, error=invalid)
+    if name == SET_OVERDRAFT and amount > 0:
+        return Command(name, text=text, error="Overdraft must be <= 0")
+    return Command(name, amount, text)
+
+
+# Words that tie a question for GPT to the selected account. A question
+# with none of them is general: it is sent without the account data, so
+# its answer can be shared by every account.
+ACCOUNT_WORDS = {
+    "i", "me", "my", "mine", "myself", "we", "us", "our",
+    "account", "accounts", "balance", "money", "limit", "overdrawn",
+    "this", "here", "there",
+    "аз", "мен", "ми", "мой", "моя", "моят", "моята", "моите", "нас", "наш", "наша",
+    "сметка", "сметката", "сметки", "баланс", "баланса", "пари", "наличност", "лимит", "тук",
+}
+
+
+def is_general(text: str) -> bool:
+    """True if a question does not refer to the selected account."""
+    return ACCOUNT_WORDS.isdisjoint(re.findall(r"\w+", text.lower()))
+
+
+# Commands that may appear in a script ("deposit 100; withdraw 20; ...")
+SCRIPT_COMMANDS = {DEPOSIT, WITHDRAW, SET_OVERDRAFT}
+
+
+def is_script(text: str) -> bool:
+    """True for several commands separated by ";" or new lines.
+
+    Every part has to be a command: a question that merely contains ";"
+    ("what is an overdraft; how much does it cost?") stays one question.
+    """
+    parts = split_script(text)
+    return len(parts) > 1 and all(parse(part).name != ASK for part in parts)
+
+
+def split_script(text: str) -> list[str]:
+    return [part.strip() for part in re.split(r"[;\n]", text) if part.strip()]
+
+
+def parse_script(text: str) -> list[Command]:
+    """Parse every command of a script, in order."""
+    return [parse(part) for part in split_script(text)]
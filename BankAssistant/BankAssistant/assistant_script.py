@@ -0,0 +1,92 @@
+"""Run assistant scripts: several commands applied as one unit.
+
+"deposit 100; withdraw 20; set overdraft -300" is checked command by
+command against a scratch copy of the account first. Only if every step
+is valid are they written, in one SQLite transaction (one commit, one
+fsync), and then applied to the BankAccount. Either all of them happen
+or none does.
+"""
+import db
+from assistant_commands import DEPOSIT, SCRIPT_COMMANDS, SET_OVERDRAFT, WITHDRAW, Command
+from BankAccount import BankAccount
+from money import format_money
+
+
+def validate_script(account: BankAccount, commands: list[Command]) -> list[str]:
+    """Problems that stop the script from running; empty when it can run.
+
+    Steps are checked with BankAccount's own rules, each one on the
+    balance and overdraft left by the steps before it.
+    """
+    if not commands:
+        return ["The script has no commands."]
+    problems = []
+    for number, command in enumerate(commands, start=1):
+        if command.error:
+            problems.append(f"{number}. {command.text}: {command.error}")
+        elif command.name not in SCRIPT_COMMANDS:
+            problems.append(f"{number}. {command.text}: only deposit, withdraw and set overdraft can be used in a script")
+    if problems:
+        return problems
+
+    scratch = _scratch(account)
+    for number, command in enumerate(commands, start=1):
+        try:
+            _apply(scratch, command)
+        except ValueError as e:
+            return [f"{number}. {command.text}: {e}"]
+    return []
+
+
+def _scratch(account: BankAccount) -> BankAccount:
+    """A throwaway copy of the account's balance and overdraft limit."""
+    # The limit is set afterwards: an earlier "set overdraft" may have left
+    # the balance below it, which the constructor would refuse.
+    scratch = BankAccount(account.owner, account.balance, account.iban, min(0, account.balance))
+    scratch.overdraft_limit = account.overdraft_limit
+    return scratch
+
+
+def _apply(account: BankAccount, command: Command):
+    if command.name == DEPOSIT:
+        account.deposit(command.amount)
+    elif command.name == WITHDRAW:
+        account.withdraw(command.amount)
+    elif command.name == SET_OVERDRAFT:
+        account.overdraft_limit = command.amount
+
+
+def run_script(account: BankAccount, commands: list[Command]) -> str:
+    """Validate, write in one transaction and apply; return a summary.
+
+    Raises ValueError (nothing changed) if any step is invalid or the
+    database refuses one of them, and sqlite3.Error (nothing changed
+    either) if the database cannot be written, e.g. while it is locked.
+    """
+    problems = validate_script(account, commands)
+    if problems:
+        raise ValueError("\n".join(problems))
+
+    balance = None
+    if account.db_id is not None:
+        # Replay on a scratch copy to get each movement's Transaction, then
+        # write them all in one transaction: nested db.* calls do not commit.
+        scratch = _scratch(account)
+        with db.connection():
+            for command in commands:
+                _apply(scratch, command)
+                if command.name == SET_OVERDRAFT:
+                    db.update_overdraft(account.db_id, command.amount)
+                else:
+                    tx = scratch.transactions[-1]
+                    balance = db.apply_movement(account.db_id, tx.t_type, tx.amount, tx.details)
+
+    for command in commands:
+        _apply(account, command)
+    if balance is not None:
+        # The database is authoritative (another session may have moved money).
+        account.balance = balance
+    return (
+        f"Ran {len(commands)} commands. Balance: {format_money(account.balance)}, "
+        f"overdraft limit: {format_money(account.overdraft_limit)}"
+    )
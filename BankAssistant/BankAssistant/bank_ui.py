@@ -1,9 +1,17 @@
+import sqlite3
+import time
 import tkinter as tk
 from tkinter import messagebox
 from tkinter.messagebox import askyesno
 
-from BankAccount import BankAccount
-from ai_client import ask_gpt
+import assistant_commands
+import assistant_script
+from BankAccount import BankAccount, Transaction
+from account_list import AccountListView, AccountSearchBox, AccountWindow
+from ai_client import ask_gpt, build_prompt, stream_gpt
+from ai_worker import AssistantWorker
+from history_ui import HistoryWindow
+from money import format_money, to_cents
 from theme import DARK_THEME, LIGHT_THEME
 import db
 
@@ -25,8 +33,8 @@ class BankApp:
         else:
             self.theme = LIGHT_THEME
 
-        # All accounts by IBAN
-        self.accounts: dict[str, BankAccount] = {}
+        # Accounts opened in this session, by account id (the list reads from the database)
+        self.accounts: dict[int, BankAccount] = {}
         # Currently selected account (from the list)
         self.account: BankAccount | None = None
 
@@ -57,12 +65,19 @@ class BankApp:
         self.frame_list = tk.LabelFrame(root, text="Account")
         self.frame_list.pack(fill="x", padx=10, pady=5)
 
-        self.list_accounts = tk.Listbox(self.frame_list, height=5, width=35)
+        # Only the visible rows are drawn; they are read from the database page by page
+        self.list_accounts = AccountListView(
+            self.frame_list,
+            AccountWindow(None if self.is_admin else self.current_user_id),
+            format_row=self._account_label,
+            on_select=self.on_select_account,
+            height=5, width=35,
+        )
+        # Type-ahead filter over IBAN, owner and username
+        self.search_accounts = AccountSearchBox(self.frame_list, self.list_accounts)
+        self.search_accounts.pack(side="top", fill="x", padx=5, pady=(5, 0))
         self.list_accounts.pack(side="left", padx=5, pady=5)
 
-        # When selection in the listbox changes
-        self.list_accounts.bind("<<ListboxSelect>>", self.on_select_account)
-
         # ====== Options (deposit / withdraw) ======
         self.frame_ops = tk.LabelFrame(root, text="Options")
         self.frame_ops.pack(fill="x", padx=10, pady=10)
@@ -113,6 +128,13 @@ class BankApp:
         )
         self.btn_delete.grid(row=3, column=2, columnspan=2, pady=5)
 
+        tk.Label(self.frame_cred, text="Analytics").grid(row=4, column=0)
+        self.btn_analytics = tk.Button(
+            self.frame_cred, text="Show analytics",
+            state="disabled", command=self.show_analytics
+        )
+        self.btn_analytics.grid(row=4, column=2, columnspan=2, pady=5)
+
         # ====== Assistant ======
         self.frame_ai = tk.LabelFrame(root, text="Assistant")
         self.frame_ai.pack(fill="x", padx=10, pady=10)
@@ -127,6 +149,33 @@ class BankApp:
         )
         self.btn_ask.grid(row=0, column=2, padx=5, pady=5)
 
+        # Shown while a GPT answer is on its way
+        self.label_thinking = tk.Label(self.frame_ai, text="")
+        self.label_thinking.grid(row=1, column=0, columnspan=3, sticky="w", padx=5)
+
+        # GPT answers are streamed into this transcript as they arrive
+        self.text_transcript = tk.Text(self.frame_ai, height=8, width=60, wrap="word", state="disabled")
+        self.text_transcript.grid(row=2, column=0, columnspan=3, padx=5, pady=5, sticky="we")
+
+        # GPT calls run on a worker thread; answers come back via root.after
+        self.assistant = AssistantWorker(self.root.after, ask_gpt, stream_gpt)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # What ask_assistant does for each assistant_commands command
+        self._assistant_handlers = {
+            assistant_commands.BALANCE: self._say_balance,
+            assistant_commands.DEPOSIT: lambda command: self._deposit(command.amount),
+            assistant_commands.WITHDRAW: lambda command: self._withdraw(command.amount),
+            assistant_commands.HISTORY: lambda command: self.show_history(),
+            assistant_commands.ANALYTICS: lambda command: self.show_analytics(),
+            assistant_commands.OWNER: self._say_owner,
+            assistant_commands.IBAN: self._say_iban,
+            assistant_commands.RESET: self._assistant_reset,
+            assistant_commands.SET_OVERDRAFT: self._assistant_set_overdraft,
+            assistant_commands.OVERDRAFT: self._say_overdraft,
+            assistant_commands.ASK: self._ask_gpt,
+        }
+
         # ====== Status ======
         self.label_status = tk.Label(root, text="No account created yet.")
         self.label_status.pack(fill="x", padx=10, pady=5)
@@ -148,6 +197,7 @@ class BankApp:
             self.btn_deposit, self.btn_withdraw,
             self.btn_details, self.btn_history,
             self.btn_reset, self.btn_delete, self.btn_ask,
+            self.btn_analytics,
         ]:
             btn.config(state=state)
 
@@ -183,6 +233,10 @@ class BankApp:
                 elif isinstance(child, tk.Entry):
                     child.configure(bg=t["entry_bg"],fg=t["entry_fg"],insertbackground=t["entry_fg"], borderwidth=1,highlightbackground=t["frame_bg"],highlightthickness=0)
 
+                #Text
+                elif isinstance(child, tk.Text):
+                    child.configure(bg=t["entry_bg"],fg=t["entry_fg"],insertbackground=t["entry_fg"], borderwidth=1,highlightbackground=t["frame_bg"],highlightthickness=0)
+
                 #Listbox
                 elif isinstance(child, tk.Listbox):
                     child.configure(bg=t["listbox_bg"],fg=t["listbox_fg"],selectbackground=t["frame_bg"],selectforeground=t["accent"],borderwidth=1,highlightbackground=t["frame_bg"],highlightthickness=0)
@@ -206,13 +260,21 @@ class BankApp:
 
     # ---------- accounts summary ----------
     def _update_summary(self):
-        total_accounts = len(self.accounts)
-        total_balance = sum(acc.balance for acc in self.accounts.values())
+        # Totals are kept up to date by the database, so this is one row read.
+        if self.is_admin:
+            summary = db.get_balance_summary()
+        else:
+            summary = db.get_balance_summary(self.current_user_id)
+        total_accounts = summary["account_count"]
+        total_balance = summary["total_balance"]
 
         if self.is_admin:
-            text = f"Total accounts: {total_accounts} | Total balance for all accounts {total_balance:.2f}"
+            text = (
+                f"Total accounts: {total_accounts} | Total balance for all accounts {format_money(total_balance)}"
+                f" | Overdraft exposure {format_money(summary['overdraft_exposure'])}"
+            )
         else:
-            text = f"Your accounts: {total_accounts} | Total balance {total_balance:.2f}"
+            text = f"Your accounts: {total_accounts} | Total balance {format_money(total_balance)}"
 
         self.label_summary.config(text=text)
 
@@ -225,10 +287,10 @@ class BankApp:
 
         # Overdraft validation (can be empty or <= 0)
         if overdraft_text == "":
-            overdraft_limit = 0.0
+            overdraft_limit = 0
         else:
             try:
-                overdraft_limit = float(overdraft_text.replace(",", "."))
+                overdraft_limit = to_cents(overdraft_text)
             except ValueError:
                 messagebox.showerror("Error", "Overdraft must be a number")
                 return
@@ -238,7 +300,7 @@ class BankApp:
 
         # Balance validation
         try:
-            balance = float(bal_text.replace(",", "."))
+            balance = to_cents(bal_text)
         except ValueError:
             messagebox.showerror("Error", "Balance must be a number")
             return
@@ -260,7 +322,6 @@ class BankApp:
             )
             self.account.db_id = acc_id
 
-            from BankAccount import Transaction
             open_tx = Transaction("OPEN",0,self.account.balance,"account balance")
             self.account.transactions.append(open_tx)
             db.add_transaction(acc_id,open_tx.t_type,open_tx.amount,open_tx.balance_after,open_tx.details,)
@@ -271,27 +332,28 @@ class BankApp:
             return
 
 
-        # Store in dictionary by IBAN
-        self.accounts[iban] = self.account
+        # Store in dictionary by account id
+        self.accounts[acc_id] = self.account
 
 
 
         # Update status + enable buttons
         self.label_status.config(
             text=(
-                f"Account created. Balance: {self.account.balance:.2f} "
-                f"with an overdraft of {self.account.overdraft_limit:.2f}"
+                f"Account created. Balance: {format_money(self.account.balance)} "
+                f"with an overdraft of {format_money(self.account.overdraft_limit)}"
             )
         )
         self._set_buttons_enabled(True)
-        self.refresh_account_list()
+        self.list_accounts.account_added(db.get_account(acc_id))
+        self.list_accounts.select_id(acc_id)
         self._update_summary()
         self._clear_create_fields()
 
     # ---------- amount parsing ----------
     def _get_amount(self):
         try:
-            return float(self.entry_amount.get().replace(",", "."))
+            return to_cents(self.entry_amount.get())
         except ValueError:
             messagebox.showerror("Error", "Invalid amount")
             return None
@@ -303,19 +365,10 @@ class BankApp:
         amount = self._get_amount()
         if amount is None:
             return
+        self._deposit(amount)
 
-        try:
-            self.account.deposit(amount)
-            self.label_status.config(text=f"Balance: {self.account.balance:.2f}")
-
-            if self.account.db_id is not None:
-                db.update_account_balance(self.account.db_id, self.account.balance)
-                last_tx = self.account.transactions[-1]
-                db.add_transaction(self.account.db_id,last_tx.t_type,last_tx.amount,last_tx.balance_after,last_tx.details,)
-
-        except ValueError as e:
-            messagebox.showerror("Error", str(e))
-        self._update_summary()
+    def _deposit(self, amount: int):
+        self._movement("DEPOSIT", amount, "cash deposit", self.account.deposit)
 
     def do_withdraw(self):
         if self.account is None:
@@ -323,21 +376,26 @@ class BankApp:
         amount = self._get_amount()
         if amount is None:
             return
+        self._withdraw(amount)
+
+    def _withdraw(self, amount: int):
+        self._movement("WITHDRAW", amount, "cash withdraw", self.account.withdraw)
+
+    def _movement(self, t_type: str, amount: int, details: str, apply_in_memory):
+        """Write a deposit/withdrawal to the database first, then mirror it in memory.
+
+        The database decides (another session may have moved money); the
+        account only changes once the write has succeeded.
+        """
         try:
-            self.account.withdraw(amount)
-            self.label_status.config(text=f"Balance: {self.account.balance:.2f}")
-
-            if self.account.db_id is not None:
-                db.update_account_balance(self.account.db_id, self.account.balance)
-                last_tx = self.account.transactions[-1]
-                db.add_transaction(
-                    self.account.db_id,
-                    last_tx.t_type,
-                    last_tx.amount,
-                    last_tx.balance_after,
-                    last_tx.details,
-                )
-        except Exception as e:
+            if self.account.db_id is None:
+                apply_in_memory(amount)
+            else:
+                balance = db.apply_movement(self.account.db_id, t_type, amount, details)
+                self.account.balance = balance
+                self.account.transactions.append(Transaction(t_type, amount, balance, details))
+            self.label_status.config(text=f"Balance: {format_money(self.account.balance)}")
+        except (ValueError, sqlite3.Error) as e:
             messagebox.showerror("Error", str(e))
         self._update_summary()
 
@@ -357,30 +415,36 @@ class BankApp:
             messagebox.showinfo("History", "No history in database for this account.")
             return
 
-        rows = db.load_transactions_for_account(self.account.db_id)
-        if not rows:
-            messagebox.showinfo("History", "No transactions yet.")
+        HistoryWindow(self.root, self.account, self.theme)
+
+    def show_analytics(self):
+        if self.account is None:
+            messagebox.showerror("Error", "Account not created")
             return
 
-        lines = []
-        for row in rows:
-            created = row["created_at"]
-            t_type = row["t_type"].ljust(12)
-            amount = row["amount"]
-            balance_after = row["balance_after"]
-            details = row["details"] or ""
-            line = (
-                f"{created} | {t_type} {amount:10.2f} -> "
-                f"balance {balance_after:>10.2f} {details}"
-            )
-            lines.append(line)
+        if self.account.db_id is None:
+            messagebox.showinfo("Analytics", "No history in database for this account.")
+            return
+
+        # Imported here: analytics loads NumPy, which the app does not
+        # need to start.
+        import analytics
+
+        try:
+            result = analytics.analyse_account(self.account.db_id, until=time.time())
+        except RuntimeError as e:
+            messagebox.showerror("Analytics", str(e))
+            return
 
-        text = "\n".join(lines)
-        messagebox.showinfo("History", text)
+        if result.movements == 0:
+            messagebox.showinfo("Analytics", "No transactions yet.")
+            return
+        messagebox.showinfo(f"Analytics – {self.account.iban}", result.summary())
 
     # ---------- reset UI ----------
     def reset_account(self):
         """Reset UI fields and selection, but do NOT delete accounts."""
+        self._cancel_assistant()
         self.account = None
 
         for entry in [
@@ -390,40 +454,48 @@ class BankApp:
         ]:
             entry.delete(0, tk.END)
 
-        self.list_accounts.selection_clear(0, tk.END)
+        self.list_accounts.select_id(None)
         self._set_buttons_enabled(False)
         self.label_status.config(text="No account created yet. Balance: 0.00")
 
     # ---------- listbox helpers ----------
     def refresh_account_list(self):
-        """Reload listbox from self.accounts."""
-        self.list_accounts.delete(0, tk.END)
-        for iban, acc in self.accounts.items():
-            if self.is_admin:
-                label = f"{iban} | {acc.owner} | {acc.user_name}"
-            else:
-                label = f"{iban} | {acc.owner}"
-            self.list_accounts.insert(tk.END, label)
+        """Redraw the list from the database (only the visible rows)."""
+        self.list_accounts.reload()
 
-    def on_select_account(self, event):
-        """When a listbox row is selected – switch current account."""
-        if not self.list_accounts.curselection():
-            return
+    def _account_label(self, row) -> str:
+        if self.is_admin:
+            return f"{row['iban']} | {row['owner']} | {row['user_name']}"
+        return f"{row['iban']} | {row['owner']}"
 
-        index = self.list_accounts.curselection()[0]
-        label = self.list_accounts.get(index)   # e.g. "BG11... | Nikola"
-        iban = label.split("|", 1)[0].strip()
+    def _account_for_row(self, row) -> BankAccount:
+        """The BankAccount for a list row, created the first time it is opened."""
+        acc = self.accounts.get(row["account_id"])
+        if acc is None:
+            acc = BankAccount(
+                owner = row["owner"],
+                balance = row["balance"],
+                iban = row["iban"],
+                overdraft_limit = row["overdraft_limit"],
+                db_id=row["account_id"],
+                user_name=row["user_name"],
+            )
+            self.accounts[acc.db_id] = acc
+        return acc
 
-        acc = self.accounts.get(iban)
-        if not acc:
-            return
+    def on_select_account(self, row):
+        """When a list row is selected – switch current account."""
+        acc = self._account_for_row(row)
+        iban = acc.iban
 
+        if acc is not self.account:
+            self._cancel_assistant()
         self.account = acc
         self.label_status.config(
             text=(
                 f"Selected {iban}. "
-                f"Balance: {self.account.balance:.2f} "
-                f"with an overdraft of {self.account.overdraft_limit:.2f}"
+                f"Balance: {format_money(self.account.balance)} "
+                f"with an overdraft of {format_money(self.account.overdraft_limit)}"
             )
         )
         self._set_buttons_enabled(True)
@@ -447,19 +519,22 @@ class BankApp:
         if acc_db_id is not None:
             db.delete_account(acc_db_id)
 
-        if iban in self.accounts:
-            del self.accounts[iban]
+        self._cancel_assistant()
+
+        self.accounts.pop(acc_db_id, None)
 
         self.account = None
-        self.refresh_account_list()
+        if acc_db_id is not None:
+            self.list_accounts.account_removed(acc_db_id)
         self._update_summary()
 
-        if self.accounts:
+        first_row = self.list_accounts.first_row()
+        if first_row is not None:
             # Select the first remaining account
-            next_iban = next(iter(self.accounts))
-            self.account = self.accounts[next_iban]
+            self.account = self._account_for_row(first_row)
+            self.list_accounts.select_id(self.account.db_id)
             self.label_status.config(
-                text=f"Selected {next_iban}. Balance: {self.account.balance:.2f}"
+                text=f"Selected {self.account.iban}. Balance: {format_money(self.account.balance)}"
             )
             self._set_buttons_enabled(True)
         else:
@@ -475,21 +550,7 @@ class BankApp:
         self._update_summary()
 
     def _load_accounts_from_db(self):
-        rows = db.load_accounts_for_user(
-            user_id = self.current_user_id,
-            is_admin = self.is_admin,
-        )
         self.accounts.clear()
-        for row in rows:
-            acc = BankAccount(
-                owner = row["owner"],
-                balance = row["balance"],
-                iban = row["iban"],
-                overdraft_limit = row["overdraft_limit"],
-                db_id=row["account_id"],
-            )
-            acc.user_name = row["user_name"]
-            self.accounts[acc.iban] = acc
         self.refresh_account_list()
         self._update_summary()
 
@@ -505,117 +566,109 @@ class BankApp:
             messagebox.showerror("Error", "Question cannot be empty")
             return
 
-        # lower-case for command detection
-        q = text.lower()
+        if assistant_commands.is_script(text):
+            self._run_script(text)
+            return
 
-        # --- basic command rules (work directly with the model) ---
+        command = assistant_commands.parse(text)
+        if command.error:
+            messagebox.showerror("Assistant", command.error)
+            return
+        self._assistant_handlers[command.name](command)
 
-        # balance
-        if q == "balance" or q.startswith("balance ") \
-                or q == "баланс" or q.startswith("баланс "):
-            msg = (
-                f"Current account {self.account.owner} "
-                f"({self.account.iban}) has a balance of "
-                f"{self.account.balance:.2f}"
+    def _run_script(self, text: str):
+        """Several commands ("deposit 100; withdraw 20"): all or nothing, one commit."""
+        commands = assistant_commands.parse_script(text)
+        try:
+            summary = assistant_script.run_script(self.account, commands)
+        except (ValueError, sqlite3.Error) as e:
+            messagebox.showerror("Assistant", f"Nothing was changed.\n\n{e}")
+            return
+        self.label_status.config(
+            text=(
+                f"Selected {self.account.iban}. "
+                f"Balance: {format_money(self.account.balance)} "
+                f"with an overdraft of {format_money(self.account.overdraft_limit)}"
             )
-            messagebox.showinfo("Assistant", message=msg)
+        )
+        self._update_summary()
+        messagebox.showinfo("Assistant", summary)
+
+    # ---------- assistant command handlers ----------
+    def _say_balance(self, command):
+        msg = (
+            f"Current account {self.account.owner} "
+            f"({self.account.iban}) has a balance of "
+            f"{format_money(self.account.balance)}"
+        )
+        messagebox.showinfo("Assistant", message=msg)
 
-        # deposit X
-        elif q.startswith("deposit"):
-            parts = q.split()
-            if len(parts) < 2:
-                messagebox.showerror("Assistant", "Use: deposit <amount>")
-            else:
-                self.entry_amount.delete(0, tk.END)
-                self.entry_amount.insert(0, parts[1])
-                self.do_deposit()
-
-        # withdraw X
-        elif q.startswith("withdraw"):
-            parts = q.split()
-            if len(parts) < 2:
-                messagebox.showerror("Assistant", "Use: withdraw <amount>")
-            else:
-                self.entry_amount.delete(0, tk.END)
-                self.entry_amount.insert(0, parts[1])
-                self.do_withdraw()
-
-        # history
-        elif "history" in q or "история" in q:
-            self.show_history()
-
-        # owner
-        elif "owner" in q or "собственик" in q:
-            msg = f"Current account owner: {self.account.owner}"
-            messagebox.showinfo("Assistant", message=msg)
-
-        # IBAN
-        elif q.startswith("iban"):
-            msg = f"Current IBAN: {self.account.iban}"
-            messagebox.showinfo("Assistant", message=msg)
-
-        # reset UI
-        elif q.startswith("reset"):
-            self.reset_account()
-            messagebox.showinfo("Assistant", "Account UI has been reset.")
-
-            # set overdraft X
-        elif q.startswith("set overdraft"):
-            parts = q.split()
-            if len(parts) < 3:
-                messagebox.showerror("Assistant", "Use: set overdraft <amount>")
-            else:
-                try:
-                    amount = float(parts[2].replace(",", "."))
-                except ValueError:
-                    messagebox.showerror("Assistant", "Overdraft must be a number")
-                    return
-
-                if amount > 0:
-                    messagebox.showerror("Assistant", "Overdraft must be <= 0")
-                    return
-
-                self.account.overdraft_limit = amount
-
-                if self.account.db_id is not None:
-                    db.update_overdraft(self.account.db_id,amount)
-
-                self.label_status.config(
-                    text=(
-                        f"Selected {self.account.iban}. "
-                        f"Balance: {self.account.balance:.2f} "
-                        f"with an overdraft of {self.account.overdraft_limit:.2f}"
-                    )
-                )
-                messagebox.showinfo(
-                    "Assistant",
-                    f"Overdraft set to {self.account.overdraft_limit:.2f}",
-                )
-
-        # show overdraft
-        elif q == "overdraft" or q.startswith("overdraft ") \
-                or q == "овърдрафт" or q.startswith("овърдрафт "):
-            msg = f"Current overdraft limit is {self.account.overdraft_limit:.2f}"
-            messagebox.showinfo("Assistant", message=msg)
-
-        # GPT fallback
-        else:
-            prompt = (
-                "You are a banking assistant inside a small desktop demo app.\n"
-                "You can NOT actually move real money, but you can explain things.\n"
-                "Current account:\n"
-                f"- Owner: {self.account.owner}\n"
-                f"- IBAN: {self.account.iban}\n"
-                f"- Balance: {self.account.balance:.2f}\n"
-                f"- Overdraft limit: {self.account.overdraft_limit:.2f}\n\n"
-                f"User question: {text}\n\n"
-                "Answer briefly and clearly. If the user asks to deposit or withdraw, "
-                "explain what would happen, but do not say that you executed it yourself."
+    def _say_owner(self, command):
+        messagebox.showinfo("Assistant", message=f"Current account owner: {self.account.owner}")
+
+    def _say_iban(self, command):
+        messagebox.showinfo("Assistant", message=f"Current IBAN: {self.account.iban}")
+
+    def _say_overdraft(self, command):
+        msg = f"Current overdraft limit is {format_money(self.account.overdraft_limit)}"
+        messagebox.showinfo("Assistant", message=msg)
+
+    def _assistant_reset(self, command):
+        self.reset_account()
+        messagebox.showinfo("Assistant", "Account UI has been reset.")
+
+    def _assistant_set_overdraft(self, command):
+        self.account.overdraft_limit = command.amount
+
+        if self.account.db_id is not None:
+            db.update_overdraft(self.account.db_id, command.amount)
+
+        self.label_status.config(
+            text=(
+                f"Selected {self.account.iban}. "
+                f"Balance: {format_money(self.account.balance)} "
+                f"with an overdraft of {format_money(self.account.overdraft_limit)}"
             )
+        )
+        messagebox.showinfo(
+            "Assistant",
+            f"Overdraft set to {format_money(self.account.overdraft_limit)}",
+        )
 
-            answer = ask_gpt(prompt)
+    def _ask_gpt(self, command):
+        text = command.text
+        prompt, cache_key = build_prompt(text, self.account)
 
-            if answer.startswith("[OpenAI error]"):
-                messagebox.showerror("Assistant", answer)
-            else:
-                messagebox.showinfo("Assistant", answer)
+        # A previous answer still streaming is cut off visibly, not silently
+        self._cancel_assistant()
+        self.label_thinking.config(text="Assistant is thinking…")
+        self._append_transcript(f"You: {text}\nAssistant: ")
+        self.assistant.submit_stream(
+            prompt, self._on_gpt_chunk, self._on_gpt_done, cache_key=cache_key,
+        )
+
+    def _append_transcript(self, text: str):
+        self.text_transcript.config(state="normal")
+        self.text_transcript.insert(tk.END, text)
+        self.text_transcript.see(tk.END)
+        self.text_transcript.config(state="disabled")
+
+    def _on_gpt_chunk(self, chunk: str):
+        self.label_thinking.config(text="")
+        self._append_transcript(chunk)
+
+    def _on_gpt_done(self, error: str | None):
+        self.label_thinking.config(text="")
+        self._append_transcript(f"{error or ''}\n\n")
+
+    def on_close(self):
+        """Closing the window: drop any pending answer instead of waiting for it."""
+        self.assistant.shutdown()
+        self.root.destroy()
+
+    def _cancel_assistant(self):
+        """Drop a pending GPT answer (another account was selected or a new question asked)."""
+        if self.assistant.busy:
+            self.assistant.cancel()
+            self.label_thinking.config(text="")
+            self._append_transcript("(cancelled)\n\n")
@@ -0,0 +1,872 @@
+"""Benchmarks for the data layer, the account model and the assistant.
+
+Run with ``python bench.py`` (or ``python bench.py <name> ...`` for a subset).
+Each benchmark works on a throwaway database in a temp directory.
+
+``suite`` measures a fixed set of tracked metrics at several dataset
+sizes. ``--json results.json`` stores every tracked metric, and
+``--baseline results.json`` compares against an earlier run. Any metric
+more than ``--threshold`` (default 25%) slower than the baseline is a
+regression.
+
+The exit status is 1 if any check (e.g. ``concurrent``) failed or a
+tracked metric regressed. Correctness tests live in ``tests/`` (pytest).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import db
+from money import format_money
+
+
+# Dataset sizes (accounts and ledger rows) used by the tracked suite.
+SUITE_SIZES = (1_000, 10_000, 100_000)
+
+# Repeat each tracked measurement and keep the best, to damp noise.
+SUITE_REPEATS = 3
+
+# Tracked metrics of this run: name -> {"value": ..., "unit": ...}.
+# Every tracked metric is a rate, so higher is better.
+RESULTS: dict[str, dict] = {}
+
+
+def _record(name: str, value: float, unit: str = "ops/s"):
+    RESULTS[name] = {"value": round(value, 1), "unit": unit}
+    print(f"  {name:<44}{value:>14,.0f} {unit}")
+
+
+def _best_rate(n: int, run) -> float:
+    """Best of SUITE_REPEATS runs of run(), as n / seconds."""
+    best = 0.0
+    for _ in range(SUITE_REPEATS):
+        start = time.perf_counter()
+        run()
+        best = max(best, n / (time.perf_counter() - start))
+    return best
+
+
+def _fresh_db(tmp: Path, name: str) -> str:
+    path = str(tmp / f"{name}.db")
+    db.close_connection()
+    db.DB_FILE = path
+    db.init_db()
+    return path
+
+
+def _rate(n: int, seconds: float) -> str:
+    return f"{n / seconds:>12,.0f} ops/s  ({n} ops in {seconds:.3f}s)"
+
+
+def _seed_account() -> int:
+    user_id = db.create_user("bench", "x")
+    return db.create_account("Bench", "BG00BENCH0001", 0, 0, user_id)
+
+
+def bench_deposit(tmp: Path, n: int = 2000):
+    """Deposit write path: balance update + ledger insert."""
+    path = _fresh_db(tmp, "deposit_old")
+    account_id = _seed_account()
+
+    # Old path: a new connection, one statement and a commit per call.
+    start = time.perf_counter()
+    balance = 0
+    for _ in range(n):
+        balance += 1
+        for sql, params in (
+            ("UPDATE accounts SET balance = ? WHERE id = ?", (balance, account_id)),
+            (
+                "INSERT INTO transactions (account_id, t_type, amount, balance_after, details) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (account_id, "DEPOSIT", 1, balance, "cash deposit"),
+            ),
+        ):
+            conn = sqlite3.connect(path)
+            conn.execute(sql, params)
+            conn.commit()
+            conn.close()
+    print(f"  deposit (connect per call) {_rate(n, time.perf_counter() - start)}")
+
+    path = _fresh_db(tmp, "deposit_pooled")
+    account_id = _seed_account()
+    start = time.perf_counter()
+    balance = 0
+    for _ in range(n):
+        balance += 1
+        db.update_account_balance(account_id, balance)
+        db.add_transaction(account_id, "DEPOSIT", 1, balance, "cash deposit")
+    print(f"  deposit (pooled)           {_rate(n, time.perf_counter() - start)}")
+
+    path = _fresh_db(tmp, "deposit_atomic")
+    account_id = _seed_account()
+    start = time.perf_counter()
+    for _ in range(n):
+        db.apply_movement(account_id, "DEPOSIT", 1, "cash deposit")
+    print(f"  deposit (apply_movement)   {_rate(n, time.perf_counter() - start)}")
+
+
+def bench_concurrent_movements(tmp: Path, threads: int = 8, per_thread: int = 250):
+    """apply_movement from several threads; checks balance matches the ledger."""
+    _fresh_db(tmp, "concurrent")
+    account_id = _seed_account()
+
+    def worker():
+        for _ in range(per_thread):
+            while True:
+                try:
+                    db.apply_movement(account_id, "DEPOSIT", 1, "thread deposit")
+                    break
+                except sqlite3.OperationalError:
+                    # "database is locked" once the busy timeout runs out
+                    continue
+        db.close_connection()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    with db.connection() as conn:
+        balance = conn.execute(
+            "SELECT balance FROM accounts WHERE id = ?", (account_id,)
+        ).fetchone()["balance"]
+        ledger = conn.execute(
+            "SELECT COUNT(*) AS n, MAX(balance_after) AS last FROM transactions WHERE account_id = ?",
+            (account_id,),
+        ).fetchone()
+    total = threads * per_thread
+    ok = balance == total and ledger["n"] == total and ledger["last"] == total
+    print(f"  {threads} threads               {_rate(total, elapsed)}  consistent={ok}")
+    return ok
+
+
+def bench_lookup(tmp: Path, n: int = 20000):
+    """Read path: get_user_by_username."""
+    path = _fresh_db(tmp, "lookup")
+    _seed_account()
+
+    start = time.perf_counter()
+    for _ in range(n):
+        conn = sqlite3.connect(path)
+        conn.row_factory = sqlite3.Row
+        conn.execute(
+            "SELECT id, username, password_hash, is_admin FROM users WHERE username = ?",
+            ("bench",),
+        ).fetchone()
+        conn.close()
+    print(f"  lookup (connect per call)  {_rate(n, time.perf_counter() - start)}")
+
+    start = time.perf_counter()
+    for _ in range(n):
+        db.get_user_by_username("bench")
+    print(f"  lookup (pooled)            {_rate(n, time.perf_counter() - start)}")
+
+
+def bench_profiles(tmp: Path, writes: int = 2000, reads: int = 2000):
+    """Write and read throughput for every db.DB_PROFILES entry."""
+    original = db.DB_PROFILE
+    print(f"  {'profile':<12}{'writes/s':>12}{'reads/s':>12}")
+    try:
+        for name in db.DB_PROFILES:
+            db.DB_PROFILE = name
+            _fresh_db(tmp, f"profile_{name}")
+            account_id = _seed_account()
+
+            start = time.perf_counter()
+            for _ in range(writes):
+                db.apply_movement(account_id, "DEPOSIT", 1, "cash deposit")
+            write_rate = writes / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for _ in range(reads):
+                db.get_user_by_username("bench")
+                db.load_accounts_for_user(0, True)
+            read_rate = reads / (time.perf_counter() - start)
+
+            print(f"  {name:<12}{write_rate:>12,.0f}{read_rate:>12,.0f}")
+    finally:
+        db.DB_PROFILE = original
+
+
+def bench_history(tmp: Path, rows: int = 200_000):
+    """Full ledger load vs. the first keyset page of a large account."""
+    _fresh_db(tmp, "history")
+    account_id = _seed_account()
+    with db.connection() as conn:
+        conn.executemany(
+            "INSERT INTO transactions (account_id, t_type, amount, balance_after, details) "
+            "VALUES (?, 'DEPOSIT', 1, ?, 'seed')",
+            ((account_id, i) for i in range(rows)),
+        )
+
+    start = time.perf_counter()
+    db.load_transactions_for_account(account_id)
+    print(f"  full ledger ({rows:,} rows)   {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    start = time.perf_counter()
+    page = db.load_transactions_page(account_id, limit=200)
+    print(f"  first page (200 rows)       {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    start = time.perf_counter()
+    db.load_transactions_page(account_id, after_id=rows - 200, limit=200)
+    print(f"  last page (200 rows)        {(time.perf_counter() - start) * 1000:8.1f} ms")
+    return len(page) == 200
+
+
+def bench_money(tmp: Path, n: int = 1_000_000):
+    """Float round() arithmetic (the old BankAccount path) vs. integer cents."""
+    balance = 0.0
+    start = time.perf_counter()
+    for _ in range(n):
+        amount = 0.1
+        if not isinstance(amount, (int, float)) or amount <= 0:
+            raise ValueError
+        balance = round(balance + amount, 2)
+    float_seconds = time.perf_counter() - start
+    print(f"  float + round()            {_rate(n, float_seconds)}  total={balance:.2f}")
+
+    cents = 0
+    start = time.perf_counter()
+    for _ in range(n):
+        amount = 10
+        if type(amount) is not int or amount <= 0:
+            raise ValueError
+        cents += amount
+    int_seconds = time.perf_counter() - start
+    print(f"  int cents                  {_rate(n, int_seconds)}  total={format_money(cents)}")
+
+    # Summing many small float amounts drifts; cents do not.
+    drift = sum([0.1] * n) - n / 10
+    print(f"  sum() of {n:,} x 0.10: float drift {drift:.2e}, cents drift 0")
+    return cents == n * 10
+
+
+def bench_memory(tmp: Path, n: int = 1_000_000, budget_mb: int = 400):
+    """Memory of n BankAccount objects (as held by an admin session)."""
+    import gc
+    import tracemalloc
+
+    from BankAccount import BankAccount, Transaction
+
+    gc.collect()
+    tracemalloc.start()
+    accounts = {}
+    for i in range(n):
+        iban = f"BG{i:020d}"
+        accounts[iban] = BankAccount("Owner", i, iban, 0, db_id=i, user_name="user")
+    account_mb = tracemalloc.get_traced_memory()[0] / 2**20
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    ledger = [Transaction("DEPOSIT", 100, i, "cash deposit") for i in range(100_000)]
+    tx_bytes = tracemalloc.get_traced_memory()[0] / len(ledger)
+    tracemalloc.stop()
+
+    one = next(iter(accounts.values()))
+    print(f"  {n:,} accounts: {account_mb:,.0f} MB traced (budget {budget_mb} MB)")
+    print(f"  per BankAccount object: {sys.getsizeof(one)} bytes (+ its list, strings and dict slot)")
+    print(f"  per Transaction in a ledger: {tx_bytes:.0f} bytes")
+    del accounts, ledger
+    return account_mb <= budget_mb
+
+
+def bench_ledger(tmp: Path, n: int = 1_000_000):
+    """list[Transaction] vs. ColumnarLedger for one long account history."""
+    import gc
+    import tracemalloc
+
+    from BankAccount import Transaction
+    from ledger import ColumnarLedger
+
+    details = ["cash deposit", "cash withdraw", "salary"]
+    gc.collect()
+    tracemalloc.start()
+    types = ["DEPOSIT", "DEPOSIT", "DEPOSIT", "WITHDRAW"]
+    rows = [Transaction(types[i % 4], 100, i, details[i % 3]) for i in range(n)]
+    list_mb = tracemalloc.get_traced_memory()[0] / 2**20
+    tracemalloc.stop()
+    start = time.perf_counter()
+    list_total = sum(t.amount for t in rows if t.t_type == "DEPOSIT")
+    list_ms = (time.perf_counter() - start) * 1000
+    del rows
+
+    gc.collect()
+    tracemalloc.start()
+    columns = ColumnarLedger()
+    for i in range(n):
+        columns.add(types[i % 4], 100, i, details[i % 3], timestamp=float(i))
+    col_mb = tracemalloc.get_traced_memory()[0] / 2**20
+    tracemalloc.stop()
+    start = time.perf_counter()
+    col_total = columns.total("DEPOSIT")
+    col_ms = (time.perf_counter() - start) * 1000
+
+    print(f"  list[Transaction]  {list_mb:8.1f} MB  sum of deposits {list_ms:7.1f} ms")
+    print(f"  ColumnarLedger     {col_mb:8.1f} MB  sum of deposits {col_ms:7.1f} ms")
+    return list_total == col_total
+
+
+def bench_analytics(tmp: Path, rows: int = 1_000_000, accounts: int = 100):
+    """analytics.analyse_accounts over a 1M-row ledger."""
+    import analytics
+    if analytics.np is None:
+        print("  skipped: NumPy is not installed")
+        return None
+
+    _fresh_db(tmp, "analytics")
+    user_id = db.create_user("bench", "x")
+    ids = [db.create_account("Bench", f"BG{i:08d}", 0, 0, user_id) for i in range(accounts)]
+    per_account = rows // accounts
+    day = 86_400
+    db.add_transactions_bulk(
+        (
+            account_id,
+            "DEPOSIT" if i % 3 else "WITHDRAW",
+            1000,
+            (i // 3) * 1000,
+            "",
+            time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(1_600_000_000 + i * day // 10)),
+        )
+        for account_id in ids
+        for i in range(per_account)
+    )
+
+    start = time.perf_counter()
+    arrays = analytics.load_arrays()
+    load_s = time.perf_counter() - start
+    start = time.perf_counter()
+    results = analytics.analyse_accounts()
+    total_s = time.perf_counter() - start
+    print(f"  load {len(arrays['delta']):,} rows into arrays   {load_s * 1000:8.1f} ms")
+    print(f"  analyse {len(results)} accounts (incl. load)  {total_s * 1000:8.1f} ms")
+    return len(results) == accounts
+
+
+def _seed_suite_db(size: int, rng: random.Random) -> tuple[int, int]:
+    """size accounts spread over 10 users, and size ledger rows on one account.
+
+    Returns (a user id, the account holding the ledger).
+    """
+    user_ids = [db.create_user(f"user{i}", "x") for i in range(10)]
+    with db.connection() as conn:
+        conn.executemany(
+            "INSERT INTO accounts (owner, iban, balance, overdraft_limit, user_id, owner_fold, iban_fold) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                (f"Owner {i}", f"BG{i:020d}", rng.randrange(0, 1_000_000), -rng.randrange(0, 50_000),
+                 rng.choice(user_ids), f"owner {i}", f"bg{i:020d}")
+                for i in range(size)
+            ),
+        )
+    account_id = db.get_account_id_by_iban(f"BG{0:020d}")
+    db.add_transactions_bulk(
+        (account_id, "DEPOSIT", 100, 100 * (i + 1), "seed", None) for i in range(size)
+    )
+    return user_ids[0], account_id
+
+
+def _suite_assistant():
+    """Time the assistant's command parser (assistant_commands.parse)."""
+    import assistant_commands
+
+    questions = ASSISTANT_QUESTIONS
+    n = 50_000
+
+    def run():
+        parse = assistant_commands.parse
+        for i in range(n):
+            parse(questions[i % len(questions)])
+
+    _record("assistant_commands.parse", _best_rate(n, run), "questions/s")
+
+
+def bench_suite(tmp: Path, sizes=SUITE_SIZES):
+    """Tracked metrics for db.*, BankAccount and the assistant at several sizes."""
+    from BankAccount import BankAccount
+
+    rng = random.Random(42)
+    for size in sizes:
+        _fresh_db(tmp, f"suite_{size}")
+        user_id, account_id = _seed_suite_db(size, rng)
+        ibans = iter(range(size, size + 10_000_000))
+
+        n = 200
+        _record(f"db.create_account@{size}", _best_rate(n, lambda: [
+            db.create_account("New", f"BG{next(ibans):020d}", 0, 0, user_id) for _ in range(n)
+        ]))
+        n = 500
+        _record(f"db.add_transaction@{size}", _best_rate(n, lambda: [
+            db.add_transaction(account_id, "DEPOSIT", 100, 100, "bench") for _ in range(n)
+        ]))
+        rows = len(db.load_transactions_for_account(account_id))
+        _record(f"db.load_transactions_for_account@{size}", _best_rate(
+            rows, lambda: db.load_transactions_for_account(account_id)
+        ), "rows/s")
+        rows = len(db.load_accounts_for_user(user_id, True))
+        _record(f"db.load_accounts_for_user(admin)@{size}", _best_rate(
+            rows, lambda: db.load_accounts_for_user(user_id, True)
+        ), "rows/s")
+        rows = len(db.load_accounts_for_user(user_id, False))
+        _record(f"db.load_accounts_for_user(user)@{size}", _best_rate(
+            rows, lambda: db.load_accounts_for_user(user_id, False)
+        ), "rows/s")
+
+    n = 100_000
+    source = BankAccount("A", 0, "BG00A", -10_000)
+    target = BankAccount("B", 0, "BG00B", 0)
+
+    def deposits():
+        source.balance = 0
+        source.transactions.clear()
+        for _ in range(n):
+            source.deposit(100)
+
+    def withdrawals():
+        source.balance = 100 * n
+        source.transactions.clear()
+        for _ in range(n):
+            source.withdraw(100)
+
+    def transfers():
+        source.balance = n
+        source.transactions.clear()
+        target.transactions.clear()
+        for _ in range(n):
+            source.transfer_to(target, 1)
+
+    _record("BankAccount.deposit", _best_rate(n, deposits))
+    _record("BankAccount.withdraw", _best_rate(n, withdrawals))
+    # transfer_to reports on stdout; keep that out of the timing output.
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    try:
+        rate = _best_rate(n, transfers)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    _record("BankAccount.transfer_to", rate)
+
+    _suite_assistant()
+
+
+def compare_with_baseline(baseline: dict, threshold: float) -> list[str]:
+    """Names of tracked metrics that got slower than baseline by more than threshold."""
+    regressions = []
+    print(f"\n{'metric':<44}{'baseline':>14}{'now':>14}{'change':>9}")
+    for name, current in RESULTS.items():
+        before = baseline.get("metrics", {}).get(name)
+        if not before:
+            continue
+        change = current["value"] / before["value"] - 1
+        flag = ""
+        if change < -threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<44}{before['value']:>14,.0f}{current['value']:>14,.0f}{change:>+9.1%}{flag}")
+    return regressions
+
+
+def _event_loop():
+    """(root, after, run) for a hidden Tk window, or for an AfterLoop without a display."""
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        from after_loop import AfterLoop
+        loop = AfterLoop()
+        return None, loop.after, loop.run
+    root.withdraw()
+
+    def run(until):
+        while not until():
+            root.update()
+            time.sleep(0.001)
+    return root, root.after, run
+
+
+def bench_assistant_cache(tmp: Path, n: int = 5000):
+    """ai_cache hit latency."""
+    import ai_cache
+
+    _fresh_db(tmp, "assistant_cache")
+    ai_cache.reset_stats()
+    keys = [ai_cache.cache_key(f"question {i}", "- IBAN: A\n", 1) for i in range(50)]
+    for i, key in enumerate(keys):
+        ai_cache.put(key, f"answer {i}")
+
+    start = time.perf_counter()
+    for i in range(n):
+        ai_cache.get(keys[i % 50])
+    hit_us = (time.perf_counter() - start) / n * 1e6
+
+    stats = ai_cache.stats()
+    print(f"  cache hit: {hit_us:.0f} us; hits {stats['hits']}, misses {stats['misses']}, "
+          f"hit rate {stats['hit_rate']:.1%}, {stats['entries']} entries")
+
+
+def bench_assistant_stream(tmp: Path, token_delay: float = 0.05):
+    """Streamed answers from fake_openai.py: time to first token vs. full answer."""
+    try:
+        from openai import OpenAI
+    except ImportError:
+        print("  skipped (openai is not installed)")
+        return
+    import ai_client
+    import fake_openai
+    from ai_backends import LocalBackend, OpenAIBackend
+    from ai_worker import AssistantWorker
+
+    _fresh_db(tmp, "assistant_stream")
+    local = LocalBackend(latency=0.0, token_delay=token_delay)
+    server = fake_openai.serve(backend=local)
+    previous = ai_client.set_backend(OpenAIBackend(
+        client=OpenAI(api_key="test", base_url=fake_openai.base_url(server), max_retries=0)
+    ))
+    root, loop_after, run = _event_loop()
+    worker = AssistantWorker(loop_after, ai_client.ask_gpt, ai_client.stream_gpt)
+    prompt = "User question: how long does a transfer between two banks take?"
+    expected = local.answer(prompt)
+    problems = []
+
+    def ask(**kwargs):
+        chunks, done = [], []
+        start = time.perf_counter()
+        worker.submit_stream(prompt, lambda c: chunks.append((time.perf_counter() - start, c)),
+                             done.append, **kwargs)
+        run(lambda: done)
+        return chunks, done[0], time.perf_counter() - start
+
+    try:
+        chunks, error, total = ask(cache_key="stream-bench")
+        first = chunks[0][0] if chunks else total
+        print(f"  streamed: first token after {first * 1000:.0f} ms, "
+              f"{len(chunks)} chunks, complete after {total * 1000:.0f} ms")
+        if error or "".join(c for _, c in chunks) != expected:
+            problems.append(f"streamed answer wrong: {error or chunks}")
+        if first > total / 2:
+            problems.append("first token did not arrive early")
+
+        chunks, error, total = ask(cache_key="stream-bench")
+        print(f"  cached:   complete after {total * 1000:.0f} ms")
+        if [c for _, c in chunks] != [expected]:
+            problems.append("cached answer not replayed in one piece")
+
+        # Cancelling mid-stream stops the delivery.
+        seen = []
+        worker.submit_stream(prompt, seen.append, seen.append)
+        run(lambda: seen)
+        worker.cancel()
+        count = len(seen)
+        deadline = time.perf_counter() + token_delay * 20
+        run(lambda: time.perf_counter() > deadline)
+        if len(seen) != count:
+            problems.append("chunks delivered after cancel")
+    finally:
+        worker.shutdown()
+        ai_client.set_backend(previous)
+        server.shutdown()
+        if root is not None:
+            root.destroy()
+
+    for problem in problems:
+        print(f"  FAILED {problem}")
+    return not problems
+
+
+def bench_assistant_load(tmp: Path, questions: int = 400, threads: int = 16,
+                         latency: float = 0.05, error_rate: float = 0.05):
+    """The GPT fallback under load, against the offline LocalBackend."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    import ai_cache
+    import ai_client
+    from ai_backends import LocalBackend
+
+    _fresh_db(tmp, "assistant_load")
+    backend = LocalBackend(latency=latency, jitter=latency, error_rate=error_rate, seed=7)
+    previous = ai_client.set_backend(backend)
+    ai_cache.reset_stats()
+    # A few popular questions asked about 10 accounts, and many one-off ones.
+    popular = ["what is an overdraft?", "how does interest work?", "what is an iban?"]
+
+    def ask(i):
+        if i % 2:
+            question = popular[i % len(popular)]
+        else:
+            question = f"can I pay {i} for my rent?"
+        key = ai_cache.cache_key(question, f"- IBAN: BG{i % 10}\n", i % 10)
+        start = time.perf_counter()
+        answer = ai_client.ask_gpt(f"User question: {question}", cache_key=key)
+        return time.perf_counter() - start, answer.startswith("[OpenAI error]")
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            results = list(pool.map(ask, range(questions)))
+        seconds = time.perf_counter() - start
+    finally:
+        ai_client.set_backend(previous)
+
+    latencies = sorted(r[0] for r in results)
+    errors = sum(r[1] for r in results)
+    p50, p95 = latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)]
+    stats = ai_cache.stats()
+    print(f"  {questions} questions on {threads} threads in {seconds:.2f}s "
+          f"({questions / seconds:,.0f} questions/s)")
+    print(f"  latency p50 {p50 * 1000:.0f} ms, p95 {p95 * 1000:.0f} ms; "
+          f"{errors} errors ({backend.errors} simulated), cache hit rate {stats['hit_rate']:.0%}")
+    return errors == backend.errors
+
+
+# Questions for the parse throughput measurement: every rule, its aliases and GPT questions.
+ASSISTANT_QUESTIONS = [
+    "balance", "Balance please", "баланс", "баланс сега", "balances", "deposit 100", "Deposit 12,50",
+    "deposit", "deposit lots", "deposit 5 history", "withdraw 20.5", "withdraw", "withdraw x", "show history",
+    "история", "покажи историята", "analytics", "анализ за месеца", "анализ", "history of spending",
+    "who is the owner", "собственик", "iban", "IBAN please", "iban owner", "reset", "reset everything",
+    "set overdraft -300", "set overdraft", "set overdraft abc", "set overdraft 50", "overdraft",
+    "overdraft limit", "овърдрафт", "what is an overdraft?", "how does interest work?",
+]
+
+
+def bench_assistant_commands(tmp: Path, n: int = 200_000):
+    """Parse throughput of the assistant command parser."""
+    import assistant_commands
+
+    start = time.perf_counter()
+    for i in range(n):
+        assistant_commands.parse(ASSISTANT_QUESTIONS[i % len(ASSISTANT_QUESTIONS)])
+    print(f"  parse: {_rate(n, time.perf_counter() - start)}")
+
+
+def bench_assistant_script(tmp: Path, n: int = 500):
+    """One commit per command vs. one per assistant script (the safe profile fsyncs each commit)."""
+    import assistant_commands
+    import assistant_script
+    from BankAccount import BankAccount
+
+    _fresh_db(tmp, "script")
+    user_id = db.create_user("script", "x")
+    db_id = db.create_account("Script", "BG00SCRIPT0001", 10**9, 0, user_id)
+    acc = BankAccount("Script", 10**9, "BG00SCRIPT0001", 0, db_id=db_id)
+
+    start = time.perf_counter()
+    for _ in range(n):
+        db.apply_movement(acc.db_id, "DEPOSIT", 100)
+    single = time.perf_counter() - start
+    script = assistant_commands.parse_script("; ".join(["deposit 1"] * n))
+    start = time.perf_counter()
+    assistant_script.run_script(acc, script)
+    batched = time.perf_counter() - start
+    print(f"  {n} commands one by one: {single * 1000:.0f} ms, as one script: {batched * 1000:.0f} ms")
+
+
+_OWNER_NAMES = ("Ivan", "Maria", "Georgi", "Elena", "Petar", "Nikolay", "Yana", "Dimitar", "Teodora", "Stefan")
+
+
+def _seed_accounts(size: int, users: int = 10):
+    """size accounts spread round-robin over users; returns the user ids."""
+    user_ids = [db.create_user(f"user{i}", "x") for i in range(users)]
+    with db.connection() as conn:
+        conn.executemany(
+            "INSERT INTO accounts (owner, iban, balance, overdraft_limit, user_id, owner_fold, iban_fold) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                (owner, f"BG{i:020d}", i, 0, user_ids[i % users], owner.casefold(), f"bg{i:020d}")
+                for i in range(size)
+                for owner in (f"{_OWNER_NAMES[i * 7 % len(_OWNER_NAMES)]} {i}",)
+            ),
+        )
+    return user_ids
+
+
+def bench_account_list(tmp: Path, sizes=(10_000, 1_000_000), jumps: int = 50, steps: int = 2000,
+                       changes: int = 200):
+    """Admin account list: jump, scroll and create/delete cost must not grow with the account count."""
+    from account_list import AccountWindow
+
+    rng = random.Random(0)
+    height = 5
+    worst = {}
+    ok = True
+    for size in sizes:
+        _fresh_db(tmp, f"accounts_{size}")
+        user_ids = _seed_accounts(size)
+
+        # Jumps (dragging the scrollbar): a cold window each time, read by offset
+        jump_ms = []
+        for _ in range(jumps):
+            top = rng.randrange(size - height)
+            start = time.perf_counter()
+            rows = AccountWindow().rows(top, top + height)
+            jump_ms.append((time.perf_counter() - start) * 1000)
+            ok &= [row["iban"] for row in rows] == [f"BG{i:020d}" for i in range(top, top + height)]
+
+        # Scrolling one row at a time from a random place, pages read by keyset
+        window = AccountWindow()
+        top = rng.randrange(size // 2)
+        window.rows(top, top + height)
+        scroll_ms = []
+        for i in range(steps):
+            start = time.perf_counter()
+            rows = window.rows(top + i, top + i + height)
+            scroll_ms.append((time.perf_counter() - start) * 1000)
+        ok &= rows[-1]["iban"] == f"BG{top + steps + height - 2:020d}"
+
+        worst[size] = max(scroll_ms)
+        print(f"  {size:>9,} accounts  jump avg {sum(jump_ms) / jumps:6.2f} ms  max {max(jump_ms):6.2f} ms"
+              f"   scroll avg {sum(scroll_ms) / steps:6.3f} ms  max {max(scroll_ms):6.2f} ms")
+
+        # Deleting a visible account and creating one patch the cached pages
+        # (what BankApp does) instead of reloading the list
+        top += steps
+        update_s = 0.0
+        for i in range(changes):
+            victim = window.rows(top, top + 1)[0]["account_id"]
+            db.delete_account(victim)
+            start = time.perf_counter()
+            window.remove(victim)
+            update_s += time.perf_counter() - start
+            account_id = db.create_account("Bench", f"BGNEW{i:017d}", 0, 0, user_ids[0])
+            row = db.get_account(account_id)
+            start = time.perf_counter()
+            window.add(row)
+            update_s += time.perf_counter() - start
+        ok &= [row["account_id"] for row in window.rows(top - height, top + height)] == [
+            row["account_id"] for row in db.load_accounts_at(top - height, 2 * height)
+        ]
+        ok &= window.rows(size - 1, size)[0]["account_id"] == account_id
+        print(f"  {size:>9,} accounts  create/delete list update avg {update_s / (2 * changes) * 1000:6.3f} ms")
+
+    # Jumps skip the offset in the id b-tree, which does grow with the size;
+    # the worst scroll step is one keyset page fetch, which must not.
+    small, large = worst[sizes[0]], worst[sizes[-1]]
+    if large > max(5 * small, 5.0):
+        print(f"  REGRESSION scroll max grew from {small:.2f} ms to {large:.2f} ms")
+        ok = False
+    return ok
+
+
+def bench_account_search(tmp: Path, sizes=(10_000, 1_000_000), limit: int = 200, repeats: int = 20):
+    """Type-ahead search: right matches, and milliseconds at a million accounts."""
+    ok = True
+    for size in sizes:
+        _fresh_db(tmp, f"search_{size}")
+        user_ids = _seed_accounts(size)
+        middle = size // 2
+        queries = {
+            "iban": f"bg{middle:020d}"[:-2],
+            "owner": "maria 12",
+            "username": "USER3",
+            "one letter": "e",
+            "no match": "zzz",
+            "own accounts": "bg",
+        }
+        if size == sizes[0]:
+            # Check against a scan of every row
+            everything = db.load_accounts_for_user(0, True)
+            for name, text in queries.items():
+                user_id = user_ids[0] if name == "own accounts" else None
+                expected = {
+                    row["account_id"] for row in everything
+                    if (user_id is None or row["user_id"] == user_id)
+                    and any(row[field].lower().startswith(text.lower()) for field in ("iban", "owner", "user_name"))
+                }
+                found = db.search_accounts(text, limit, user_id)
+                ids = {row["account_id"] for row in found}
+                if not ids <= expected or len(ids) != min(limit, len(expected)):
+                    print(f"  WRONG {name!r}: {len(ids)} rows, expected {min(limit, len(expected))}")
+                    ok = False
+
+        for name, text in queries.items():
+            user_id = user_ids[0] if name == "own accounts" else None
+            best = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                found = db.search_accounts(text, limit, user_id)
+                best = min(best, time.perf_counter() - start)
+            print(f"  {size:>9,} accounts  {name:<14}{len(found):>5} rows  {best * 1000:7.2f} ms")
+            if best > 0.05:
+                print(f"  REGRESSION {name!r} took more than 50 ms")
+                ok = False
+    return ok
+
+
+BENCHMARKS = {
+    "deposit": bench_deposit,
+    "lookup": bench_lookup,
+    "concurrent": bench_concurrent_movements,
+    "profiles": bench_profiles,
+    "history": bench_history,
+    "money": bench_money,
+    "memory": bench_memory,
+    "ledger": bench_ledger,
+    "analytics": bench_analytics,
+    "accounts": bench_account_list,
+    "search": bench_account_search,
+    "commands": bench_assistant_commands,
+    "script": bench_assistant_script,
+    "cache": bench_assistant_cache,
+    "stream": bench_assistant_stream,
+    "load": bench_assistant_load,
+    "suite": bench_suite,
+}
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Run benchmarks.")
+    parser.add_argument("names", nargs="*", metavar="name",
+                        help=f"benchmarks to run (default: all): {', '.join(BENCHMARKS)}")
+    parser.add_argument("--json", type=Path, help="write tracked metrics to this file")
+    parser.add_argument("--baseline", type=Path, help="compare tracked metrics with this file")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown against the baseline (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    names = args.names or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmark(s): {', '.join(unknown)}")
+        print(f"Available: {', '.join(BENCHMARKS)}")
+        return 2
+
+    status = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in names:
+            print(f"{name}:")
+            # A benchmark returns False when one of its checks failed.
+            if BENCHMARKS[name](Path(tmp)) is False:
+                status = 1
+        db.close_all_connections()
+
+    if args.json:
+        args.json.write_text(json.dumps({
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "metrics": RESULTS,
+        }, indent=2))
+        print(f"\nWrote {len(RESULTS)} metrics to {args.json}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare_with_baseline(baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}")
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
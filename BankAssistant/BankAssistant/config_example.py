@@ -1 +1,9 @@
 OPENAI_API_KEY = "PUT_YOUR_API_KEY_HERE"
+
+# Optional: SQLite profile, one of "safe", "balanced", "throughput" (see db.py).
+# The BANK_DB_PROFILE environment variable takes precedence.
+DB_PROFILE = "safe"
+
+# Optional: assistant backend, "openai" or "local" (an offline stand-in, see
+# ai_backends.py). The BANK_ASSISTANT_BACKEND environment variable takes precedence.
+ASSISTANT_BACKEND = "openai"
\ No newline at end of file
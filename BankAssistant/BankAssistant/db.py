@@ -1,240 +1,1046 @@
+import atexit
+import os
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
+from money import is_cents
+
 DB_FILE = "bank.db"
 
+# Size of the per-connection prepared statement cache (sqlite3 default is 128).
+STATEMENT_CACHE_SIZE = 256
+
+# Durability/performance profiles. journal_mode is stored in the database
+# file and set by init_db(); the other pragmas are applied to every new
+# connection. cache_size is in KiB when negative, mmap_size in bytes.
+DB_PROFILES = {
+    # Every commit is fsynced; survives power loss.
+    "safe": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "busy_timeout": 5000,
+    },
+    # Survives application crashes; the last commits may be lost on power loss.
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "busy_timeout": 5000,
+    },
+    # No fsync at all. For imports, load tests and throwaway databases.
+    "throughput": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "busy_timeout": 10000,
+    },
+}
+DEFAULT_PROFILE = "safe"
+
+
+def _configured_profile() -> str:
+    """BANK_DB_PROFILE env var, then DB_PROFILE in config.py, then the default."""
+    name = os.environ.get("BANK_DB_PROFILE")
+    if name:
+        return name
+    try:
+        from config import DB_PROFILE
+    except ImportError:
+        return DEFAULT_PROFILE
+    return DB_PROFILE
+
+
+DB_PROFILE = _configured_profile()
+
+# One connection per thread, reused by every db.* call made on that thread.
+_local = threading.local()
+_pool_lock = threading.Lock()
+# Every pooled connection and the thread it belongs to.
+_pool: dict[sqlite3.Connection, threading.Thread] = {}
+
+# Statement trace installed on every pooled connection (see set_trace_callback).
+_trace_callback = None
 
-def get_connection():
-    conn = sqlite3.connect(DB_FILE)
+
+def get_profile(name: str | None = None) -> dict:
+    """Return the pragma settings of a profile (the active one by default)."""
+    name = name or DB_PROFILE
+    if name not in DB_PROFILES:
+        raise ValueError(
+            f"Unknown DB profile {name!r}. Choose one of: {', '.join(DB_PROFILES)}"
+        )
+    return DB_PROFILES[name]
+
+
+def _casefold(value):
+    return value.casefold() if isinstance(value, str) else value
+
+
+def _open_connection(path: str, profile_name: str) -> sqlite3.Connection:
+    profile = get_profile(profile_name)
+    # check_same_thread is off only so close_all_connections() can close
+    # other threads' connections at shutdown; each one is still used by
+    # the thread that opened it.
+    conn = sqlite3.connect(
+        path,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        check_same_thread=False,
+    )
     conn.row_factory = sqlite3.Row
+    for pragma in ("synchronous", "cache_size", "mmap_size", "busy_timeout"):
+        conn.execute(f"PRAGMA {pragma} = {profile[pragma]}")
+    with _pool_lock:
+        if _trace_callback is not None:
+            conn.set_trace_callback(_trace_callback)
+        # Threads that used the db and ended (e.g. one per assistant
+        # question) never close their connection themselves.
+        orphans = [c for c, thread in _pool.items() if not thread.is_alive()]
+        for orphan in orphans:
+            del _pool[orphan]
+        _pool[conn] = threading.current_thread()
+    for orphan in orphans:
+        orphan.close()
     return conn
 
 
-def init_db():
+def set_trace_callback(callback):
+    """Call callback(sql) for every statement run on any pooled connection.
+
+    Applies to open connections and to those opened later; None removes it.
+    """
+    global _trace_callback
+    with _pool_lock:
+        _trace_callback = callback
+        for conn in _pool:
+            conn.set_trace_callback(callback)
+
+
+def get_connection() -> sqlite3.Connection:
+    """Return this thread's pooled connection, opening it on first use.
+
+    The connection is reopened if DB_FILE or DB_PROFILE has changed since
+    it was opened.
+    """
+    key = (DB_FILE, DB_PROFILE)
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.key == key:
+        return conn
+    if conn is not None:
+        close_connection()
+    _local.conn = _open_connection(DB_FILE, DB_PROFILE)
+    _local.key = key
+    return _local.conn
+
+
+@contextmanager
+def connection():
+    """Yield the pooled connection; commit on success, roll back on error.
+
+    Blocks nest: an inner block runs in a SAVEPOINT and only undoes its
+    own work on error, and nothing is committed until the outermost block
+    ends. Several db.* calls wrapped in one block are one transaction.
+    """
     conn = get_connection()
-    cur = conn.cursor()
+    depth = getattr(_local, "depth", 0)
+    _local.depth = depth + 1
+    try:
+        if depth:
+            yield from _nested(conn, depth)
+            return
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+    finally:
+        _local.depth = depth
+
+
+def _nested(conn: sqlite3.Connection, depth: int):
+    # A SAVEPOINT outside a transaction would start (and RELEASE commit) one.
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    savepoint = f"nested_{depth}"
+    conn.execute(f"SAVEPOINT {savepoint}")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute(f"ROLLBACK TO {savepoint}")
+        conn.execute(f"RELEASE {savepoint}")
+        raise
+    else:
+        conn.execute(f"RELEASE {savepoint}")
 
-    cur.executescript(
-        """
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT NOT NULL UNIQUE,
-            password_hash TEXT NOT NULL,
-            is_admin INTEGER NOT NULL DEFAULT 0
-        );
 
-        CREATE TABLE IF NOT EXISTS accounts (
+def close_connection():
+    """Close the calling thread's pooled connection, if any."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        return
+    _local.conn = None
+    _local.key = None
+    with _pool_lock:
+        _pool.pop(conn, None)
+    conn.close()
+
+
+def close_all_connections():
+    """Close every pooled connection (called at interpreter exit)."""
+    with _pool_lock:
+        conns = list(_pool)
+        _pool.clear()
+    for conn in conns:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    _local.conn = None
+    _local.key = None
+
+
+atexit.register(close_all_connections)
+
+
+# Key of the balance_totals row that aggregates every account.
+ALL_USERS = 0
+
+
+def _totals_upsert(user_id: str, sign: str, row: str, cents: bool = False) -> str:
+    """SQL adding (sign=+) or removing (sign=-) one accounts row to a totals row."""
+    if cents:
+        total_balance = "total_balance + excluded.total_balance"
+        overdraft_exposure = "overdraft_exposure + excluded.overdraft_exposure"
+    else:
+        total_balance = "round(total_balance + excluded.total_balance, 2)"
+        overdraft_exposure = "round(overdraft_exposure + excluded.overdraft_exposure, 2)"
+    return f"""
+        INSERT INTO balance_totals (user_id, account_count, total_balance, overdraft_exposure)
+        VALUES ({user_id}, {sign}1, {sign}{row}.balance, {sign}(-{row}.overdraft_limit))
+        ON CONFLICT(user_id) DO UPDATE SET
+            account_count = account_count + excluded.account_count,
+            total_balance = {total_balance},
+            overdraft_exposure = {overdraft_exposure};
+    """
+
+
+def _totals_triggers(cents: bool = False) -> str:
+    """Triggers keeping balance_totals in step with the accounts table."""
+    return f"""
+    CREATE TRIGGER IF NOT EXISTS trg_accounts_totals_insert
+    AFTER INSERT ON accounts
+    BEGIN
+        {_totals_upsert("NEW.user_id", "+", "NEW", cents)}
+        {_totals_upsert(str(ALL_USERS), "+", "NEW", cents)}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_accounts_totals_delete
+    AFTER DELETE ON accounts
+    BEGIN
+        {_totals_upsert("OLD.user_id", "-", "OLD", cents)}
+        {_totals_upsert(str(ALL_USERS), "-", "OLD", cents)}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_accounts_totals_update
+    AFTER UPDATE OF balance, overdraft_limit, user_id ON accounts
+    BEGIN
+        {_totals_upsert("OLD.user_id", "-", "OLD", cents)}
+        {_totals_upsert(str(ALL_USERS), "-", "OLD", cents)}
+        {_totals_upsert("NEW.user_id", "+", "NEW", cents)}
+        {_totals_upsert(str(ALL_USERS), "+", "NEW", cents)}
+    END;
+    """
+
+
+def _rebuild_table(name: str, create_sql: str, columns: list[str], money_columns: list[str]) -> str:
+    """SQL recreating a table with create_sql, converting money_columns to cents.
+
+    The AUTOINCREMENT counter is carried over so ids of deleted rows are
+    never handed out again.
+    """
+    select = ", ".join(
+        f"CAST(round({col} * 100) AS INTEGER)" if col in money_columns else col
+        for col in columns
+    )
+    return f"""
+    {create_sql.format(name=f"{name}_new")}
+    INSERT INTO {name}_new ({", ".join(columns)}) SELECT {select} FROM {name};
+    DELETE FROM sqlite_sequence WHERE name = '{name}_new';
+    INSERT INTO sqlite_sequence (name, seq) SELECT '{name}_new', seq FROM sqlite_sequence WHERE name = '{name}';
+    DROP TABLE {name};
+    ALTER TABLE {name}_new RENAME TO {name};
+    """
+
+
+# Tables whose money columns migration 3 converts to integer cents:
+# (name, new definition, all columns, money columns).
+_CENTS_TABLES = [
+    (
+        "accounts",
+        """
+        CREATE TABLE {name} (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             owner TEXT NOT NULL,
             iban TEXT NOT NULL UNIQUE,
-            balance REAL NOT NULL,
-            overdraft_limit REAL NOT NULL,
+            balance INTEGER NOT NULL,
+            overdraft_limit INTEGER NOT NULL,
             user_id INTEGER NOT NULL,
             FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
         );
-
-        CREATE TABLE IF NOT EXISTS transactions (
+        """,
+        ["id", "owner", "iban", "balance", "overdraft_limit", "user_id"],
+        ["balance", "overdraft_limit"],
+    ),
+    (
+        "transactions",
+        """
+        CREATE TABLE {name} (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             account_id INTEGER NOT NULL,
             t_type TEXT NOT NULL,
-            amount REAL NOT NULL,
-            balance_after REAL NOT NULL,
+            amount INTEGER NOT NULL,
+            balance_after INTEGER NOT NULL,
             details TEXT,
             created_at TEXT DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (account_id) REFERENCES accounts(id) ON DELETE CASCADE
         );
-            
-        CREATE TABLE IF NOT EXISTS bills (
+        """,
+        ["id", "account_id", "t_type", "amount", "balance_after", "details", "created_at"],
+        ["amount", "balance_after"],
+    ),
+    (
+        "bills",
+        """
+        CREATE TABLE {name} (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             account_id INTEGER NOT NULL,
             title TEXT NOT NULL,
             due_date TEXT NOT NULL,
-            amount REAL NOT NULL,
+            amount INTEGER NOT NULL,
             is_paid INTEGER NOT NULL DEFAULT 0,
             FOREIGN KEY (account_id) REFERENCES accounts(id) ON DELETE CASCADE
-        );   
-        """
-    )
+        );
+        """,
+        ["id", "account_id", "title", "due_date", "amount", "is_paid"],
+        ["amount"],
+    ),
+]
 
-    conn.commit()
-    conn.close()
 
+# Schema changes applied after the base tables, in order. PRAGMA
+# user_version records how many of them a database has already run, so
+# only append to this list.
+MIGRATIONS = [
+    # 1: indexes for the per-account / per-user lookups
+    """
+    CREATE INDEX IF NOT EXISTS idx_accounts_user ON accounts(user_id);
+    CREATE INDEX IF NOT EXISTS idx_transactions_account ON transactions(account_id);
+    CREATE INDEX IF NOT EXISTS idx_bills_account_paid_due ON bills(account_id, is_paid, due_date);
+    """,
+    # 2: per-user and global (user_id = ALL_USERS) account totals kept up to
+    # date by triggers. overdraft_exposure is the sum of the granted limits.
+    f"""
+    CREATE TABLE IF NOT EXISTS balance_totals (
+        user_id INTEGER PRIMARY KEY,
+        account_count INTEGER NOT NULL DEFAULT 0,
+        total_balance REAL NOT NULL DEFAULT 0,
+        overdraft_exposure REAL NOT NULL DEFAULT 0
+    );
 
-def create_account(owner: str, iban: str, balance: float, overdraft_limit: float, user_id: int, ) -> int:
-    """Insert a new account and return its DB id."""
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO accounts (owner, iban, balance, overdraft_limit, user_id)
-        VALUES (?, ?, ?, ?, ?)
-        """,
-        (owner, iban, balance, overdraft_limit, user_id),
-    )
-    conn.commit()
-    account_id = cur.lastrowid
-    conn.close()
-    return account_id
+    DELETE FROM balance_totals;
+    INSERT INTO balance_totals (user_id, account_count, total_balance, overdraft_exposure)
+    SELECT user_id, COUNT(*), round(SUM(balance), 2), round(SUM(-overdraft_limit), 2)
+    FROM accounts GROUP BY user_id;
+    INSERT INTO balance_totals (user_id, account_count, total_balance, overdraft_exposure)
+    SELECT {ALL_USERS}, COUNT(*), round(COALESCE(SUM(balance), 0), 2),
+           round(COALESCE(SUM(-overdraft_limit), 0), 2)
+    FROM accounts;
 
+    {_totals_triggers()}
+    """,
+    # 3: money is stored as integer cents (see money.py) instead of REAL.
+    f"""
+    DROP TRIGGER IF EXISTS trg_accounts_totals_insert;
+    DROP TRIGGER IF EXISTS trg_accounts_totals_delete;
+    DROP TRIGGER IF EXISTS trg_accounts_totals_update;
 
-def load_accounts_for_user(user_id: int, is_admin: bool):
+    {"".join(_rebuild_table(*table) for table in _CENTS_TABLES)}
+
+    CREATE INDEX IF NOT EXISTS idx_accounts_user ON accounts(user_id);
+    CREATE INDEX IF NOT EXISTS idx_transactions_account ON transactions(account_id);
+    CREATE INDEX IF NOT EXISTS idx_bills_account_paid_due ON bills(account_id, is_paid, due_date);
+
+    DROP TABLE balance_totals;
+    CREATE TABLE balance_totals (
+        user_id INTEGER PRIMARY KEY,
+        account_count INTEGER NOT NULL DEFAULT 0,
+        total_balance INTEGER NOT NULL DEFAULT 0,
+        overdraft_exposure INTEGER NOT NULL DEFAULT 0
+    );
+    INSERT INTO balance_totals (user_id, account_count, total_balance, overdraft_exposure)
+    SELECT user_id, COUNT(*), SUM(balance), SUM(-overdraft_limit)
+    FROM accounts GROUP BY user_id;
+    INSERT INTO balance_totals (user_id, account_count, total_balance, overdraft_exposure)
+    SELECT {ALL_USERS}, COUNT(*), COALESCE(SUM(balance), 0), COALESCE(SUM(-overdraft_limit), 0)
+    FROM accounts;
+
+    {_totals_triggers(cents=True)}
+    """,
+    # 4: persistent cache of assistant answers (see ai_cache.py). Times are
+    # Unix timestamps; last_used drives LRU eviction.
+    """
+    CREATE TABLE IF NOT EXISTS assistant_cache (
+        key TEXT PRIMARY KEY,
+        answer TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        last_used REAL NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS idx_assistant_cache_last_used ON assistant_cache(last_used);
+    """,
+    # 5: case-insensitive prefix search over IBAN, owner and username (see
+    # search_accounts), for all accounts and within one user's accounts.
+    # The *_fold columns hold str.casefold() of the text, so "иван" finds
+    # "Иван" (NOCASE only folds ASCII). create_account / create_user write
+    # them; the backfill uses the casefold() function _migrate registers.
+    # Balance updates touch none of these.
+    """
+    ALTER TABLE accounts ADD COLUMN iban_fold TEXT;
+    ALTER TABLE accounts ADD COLUMN owner_fold TEXT;
+    ALTER TABLE users ADD COLUMN username_fold TEXT;
+    UPDATE accounts SET iban_fold = casefold(iban), owner_fold = casefold(owner);
+    UPDATE users SET username_fold = casefold(username);
+
+    CREATE INDEX IF NOT EXISTS idx_accounts_iban_fold ON accounts(iban_fold);
+    CREATE INDEX IF NOT EXISTS idx_accounts_owner_fold ON accounts(owner_fold);
+    CREATE INDEX IF NOT EXISTS idx_accounts_user_iban_fold ON accounts(user_id, iban_fold);
+    CREATE INDEX IF NOT EXISTS idx_accounts_user_owner_fold ON accounts(user_id, owner_fold);
+    CREATE INDEX IF NOT EXISTS idx_users_username_fold ON users(username_fold);
+    """,
+]
+
+
+def _migrate(conn: sqlite3.Connection):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    conn.create_function("casefold", 1, _casefold)
+    for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+        try:
+            conn.executescript(
+                f"BEGIN; {script} PRAGMA user_version = {number}; COMMIT;"
+            )
+        except sqlite3.Error:
+            # executescript leaves the failed migration's transaction open;
+            # the next commit would keep half of it under the old version.
+            conn.rollback()
+            raise
+
+
+def init_db():
     conn = get_connection()
-    cur = conn.cursor()
-    if is_admin:
-        cur.execute(
-            "SELECT a.id as account_id, a.owner, a.iban, a.balance, a.overdraft_limit, a.user_id, u.username AS user_name FROM accounts a JOIN users u ON a.user_id = u.id ORDER BY a.id"
+    conn.execute(f"PRAGMA journal_mode = {get_profile()['journal_mode']}")
+
+    # The original schema; everything since then is in MIGRATIONS.
+    with connection() as conn:
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL UNIQUE,
+                password_hash TEXT NOT NULL,
+                is_admin INTEGER NOT NULL DEFAULT 0
+            );
+
+            CREATE TABLE IF NOT EXISTS accounts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                owner TEXT NOT NULL,
+                iban TEXT NOT NULL UNIQUE,
+                balance REAL NOT NULL,
+                overdraft_limit REAL NOT NULL,
+                user_id INTEGER NOT NULL,
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            );
+
+            CREATE TABLE IF NOT EXISTS transactions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                account_id INTEGER NOT NULL,
+                t_type TEXT NOT NULL,
+                amount REAL NOT NULL,
+                balance_after REAL NOT NULL,
+                details TEXT,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (account_id) REFERENCES accounts(id) ON DELETE CASCADE
+            );
+
+            CREATE TABLE IF NOT EXISTS bills (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                account_id INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                due_date TEXT NOT NULL,
+                amount REAL NOT NULL,
+                is_paid INTEGER NOT NULL DEFAULT 0,
+                FOREIGN KEY (account_id) REFERENCES accounts(id) ON DELETE CASCADE
+            );
+            """
         )
-    else:
-        cur.execute(
-            "SELECT a.id as account_id, a.owner, a.iban, a.balance, a.overdraft_limit, a.user_id, u.username AS user_name FROM accounts a JOIN users u ON a.user_id = u.id WHERE a.user_id = ? ORDER BY a.id",
-            (user_id,),
-            )
+    _migrate(conn)
 
-    rows = cur.fetchall()
-    conn.close()
+
+def create_account(owner: str, iban: str, balance: int, overdraft_limit: int, user_id: int, ) -> int:
+    """Insert a new account and return its DB id. Money is in cents."""
+    with connection() as conn:
+        cur = conn.execute(
+            """
+            INSERT INTO accounts (owner, iban, balance, overdraft_limit, user_id, owner_fold, iban_fold)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (owner, iban, balance, overdraft_limit, user_id, owner.casefold(), iban.casefold()),
+        )
+        return cur.lastrowid
+
+
+ACCOUNTS_FOR_ADMIN_SQL = (
+    "SELECT a.id as account_id, a.owner, a.iban, a.balance, a.overdraft_limit, a.user_id, u.username AS user_name "
+    "FROM accounts a JOIN users u ON a.user_id = u.id ORDER BY a.id"
+)
+ACCOUNTS_FOR_USER_SQL = (
+    "SELECT a.id as account_id, a.owner, a.iban, a.balance, a.overdraft_limit, a.user_id, u.username AS user_name "
+    "FROM accounts a JOIN users u ON a.user_id = u.id WHERE a.user_id = ? ORDER BY a.id"
+)
+
+
+def load_accounts_for_user(user_id: int, is_admin: bool):
+    with connection() as conn:
+        if is_admin:
+            cur = conn.execute(ACCOUNTS_FOR_ADMIN_SQL)
+        else:
+            cur = conn.execute(ACCOUNTS_FOR_USER_SQL, (user_id,))
+        return cur.fetchall()
+
+
+# Accounts list paging. Rows come in id order; user_id None means all users.
+ACCOUNT_ROWS_SQL = (
+    "SELECT a.id as account_id, a.owner, a.iban, a.balance, a.overdraft_limit, a.user_id, u.username AS user_name "
+    "FROM accounts a JOIN users u ON a.user_id = u.id"
+)
+
+
+def _user_filter(user_id: int | None) -> tuple[str, tuple]:
+    if user_id is None:
+        return "", ()
+    return " AND a.user_id = ?", (user_id,)
+
+
+def load_accounts_after(after_id: int = 0, limit: int = 100, user_id: int | None = None):
+    """Up to limit accounts with id > after_id (keyset paging)."""
+    where, params = _user_filter(user_id)
+    with connection() as conn:
+        return conn.execute(
+            f"{ACCOUNT_ROWS_SQL} WHERE a.id > ?{where} ORDER BY a.id LIMIT ?",
+            (after_id, *params, limit),
+        ).fetchall()
+
+
+def load_accounts_before(before_id: int, limit: int = 100, user_id: int | None = None):
+    """Up to limit accounts with id < before_id, still in ascending id order."""
+    where, params = _user_filter(user_id)
+    with connection() as conn:
+        rows = conn.execute(
+            f"{ACCOUNT_ROWS_SQL} WHERE a.id < ?{where} ORDER BY a.id DESC LIMIT ?",
+            (before_id, *params, limit),
+        ).fetchall()
+    rows.reverse()
     return rows
 
 
-def update_account_balance(account_id: int, new_balance: float):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "UPDATE accounts SET balance = ? WHERE id = ?",
-        (new_balance, account_id),
-    )
-    conn.commit()
-    conn.close()
+def load_accounts_at(offset: int, limit: int = 100, user_id: int | None = None):
+    """Up to limit accounts starting at position offset (for jumps).
+
+    The offset is skipped in the id b-tree (or idx_accounts_user) in a
+    subquery, so the join only runs for the rows returned.
+    """
+    where, params = _user_filter(user_id)
+    inner = "SELECT id FROM accounts" + ("" if user_id is None else " WHERE user_id = ?")
+    with connection() as conn:
+        return conn.execute(
+            f"{ACCOUNT_ROWS_SQL} WHERE a.id >= ({inner} ORDER BY id LIMIT 1 OFFSET ?){where} "
+            f"ORDER BY a.id LIMIT ?",
+            (*params, offset, *params, limit),
+        ).fetchall()
+
+
+# Prefix search: one index range per field, each capped at the limit.
+SEARCH_IBAN_SQL = (
+    f"{ACCOUNT_ROWS_SQL} WHERE a.iban_fold >= ? AND a.iban_fold < ?{{where}} "
+    f"ORDER BY a.iban_fold LIMIT ?"
+)
+SEARCH_OWNER_SQL = (
+    f"{ACCOUNT_ROWS_SQL} WHERE a.owner_fold >= ? AND a.owner_fold < ?{{where}} "
+    f"ORDER BY a.owner_fold LIMIT ?"
+)
+SEARCH_USERNAME_SQL = (
+    f"{ACCOUNT_ROWS_SQL} WHERE a.user_id IN ("
+    f"SELECT id FROM users WHERE username_fold >= ? AND username_fold < ? "
+    f"ORDER BY username_fold LIMIT ?){{where}} LIMIT ?"
+)
+
+
+def _prefix_range(prefix: str) -> tuple[str, str]:
+    """(low, high) such that low <= s < high for exactly the casefolded s starting with prefix.
+
+    Both bounds are casefolded, like the *_fold columns; UTF-8 strings
+    compare in code point order, so high is low with its last character
+    bumped (past the surrogates, which never occur in stored text).
+    """
+    low = prefix.casefold()
+    high = low.rstrip("\U0010ffff")
+    if not high:
+        return low, low + "\U0010ffff"
+    last = ord(high[-1]) + 1
+    if 0xD800 <= last < 0xE000:
+        last = 0xE000
+    return low, high[:-1] + chr(last)
+
+
+def search_accounts(text: str, limit: int = 100, user_id: int | None = None):
+    """Accounts whose IBAN, owner or username starts with text (ignoring case).
+
+    IBAN matches come first, then owners, then usernames; at most limit
+    rows. Every part is a range scan of a *_fold column index (migration 5), so
+    the cost depends on limit, not on the number of accounts.
+    """
+    text = text.strip()
+    if not text:
+        return []
+    low, high = _prefix_range(text)
+    where, params = _user_filter(user_id)
+    found = {}
+    with connection() as conn:
+        for sql, args in (
+            (SEARCH_IBAN_SQL, (low, high, *params, limit)),
+            (SEARCH_OWNER_SQL, (low, high, *params, limit)),
+            (SEARCH_USERNAME_SQL, (low, high, limit, *params, limit)),
+        ):
+            for row in conn.execute(sql.format(where=where), args):
+                found.setdefault(row["account_id"], row)
+            if len(found) >= limit:
+                break
+    return list(found.values())[:limit]
+
+
+def get_account(account_id: int):
+    with connection() as conn:
+        return conn.execute(f"{ACCOUNT_ROWS_SQL} WHERE a.id = ?", (account_id,)).fetchone()
+
+
+def get_balance_summary(user_id: int = ALL_USERS):
+    """Account count, total balance and overdraft exposure for one user.
+
+    Reads the trigger-maintained balance_totals row; the default is the
+    total over all users. Amounts are in cents.
+    """
+    with connection() as conn:
+        row = conn.execute(
+            "SELECT account_count, total_balance, overdraft_exposure FROM balance_totals WHERE user_id = ?",
+            (user_id,),
+        ).fetchone()
+    if row is None:
+        return {"account_count": 0, "total_balance": 0, "overdraft_exposure": 0}
+    return dict(row)
+
+
+def update_account_balance(account_id: int, new_balance: int):
+    with connection() as conn:
+        conn.execute(
+            "UPDATE accounts SET balance = ? WHERE id = ?",
+            (new_balance, account_id),
+        )
 
 
 def add_transaction(
         account_id: int,
         t_type: str,
-        amount: float,
-        balance_after: float,
+        amount: int,
+        balance_after: int,
         details: str = "",
 ):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO transactions (account_id, t_type, amount, balance_after, details)
-        VALUES (?, ?, ?, ?, ?)
-        """,
-        (account_id, t_type, amount, balance_after, details),
-    )
-    conn.commit()
-    conn.close()
+    with connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO transactions (account_id, t_type, amount, balance_after, details)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (account_id, t_type, amount, balance_after, details),
+        )
 
 
-def load_transactions_for_account(account_id: int):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT t_type, amount, balance_after, details, created_at
-        FROM TRANSACTIONS
-        WHERE account_id = ?
-        ORDER BY id
-        """,
-        (account_id,),
-    )
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+def add_transactions_bulk(rows) -> int:
+    """Insert many ledger rows in one transaction and return how many.
 
-def add_bill(account_id: int, title:str, due_date: str, amount: float):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO bills (account_id, title, due_date, amount)
-        VALUES(?,?,?,?)
-        """,
-        (account_id,title,due_date,amount),
-    )
-    conn.commit()
-    conn.close()
+    rows yields (account_id, t_type, amount, balance_after, details,
+    created_at) tuples with amounts in cents; created_at may be None for
+    "now". Balances are not touched.
+    """
+    with connection() as conn:
+        cur = conn.executemany(
+            """
+            INSERT INTO transactions (account_id, t_type, amount, balance_after, details, created_at)
+            VALUES (?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+            """,
+            rows,
+        )
+        return cur.rowcount
 
-def load_bills_for_account(account_id: int, only_unpaid: bool = True):
-    conn = get_connection()
-    cur = conn.cursor()
-    if only_unpaid:
-        cur.execute(
+
+def load_account_ids() -> set[int]:
+    with connection() as conn:
+        return {row["id"] for row in conn.execute("SELECT id FROM accounts")}
+
+
+def get_account_id_by_iban(iban: str) -> int | None:
+    with connection() as conn:
+        row = conn.execute("SELECT id FROM accounts WHERE iban = ?", (iban,)).fetchone()
+    return row["id"] if row else None
+
+
+# Direction of each movement type when it is applied to the balance.
+MOVEMENT_SIGNS = {
+    "DEPOSIT": 1,
+    "TRANSFER_IN": 1,
+    "WITHDRAW": -1,
+    "TRANSFER_OUT": -1,
+}
+
+
+def apply_movement(account_id: int, t_type: str, amount: int, details: str = "") -> int:
+    """Update the balance and append the ledger row in one transaction.
+
+    The new balance is computed by SQLite, so concurrent callers cannot
+    overwrite each other's updates. Debits that would go below the
+    overdraft limit are rejected with ValueError. amount is in cents;
+    returns the new balance in cents.
+    """
+    t_type = t_type.strip().upper()
+    if t_type not in MOVEMENT_SIGNS:
+        raise ValueError(f"Unknown movement type: {t_type}")
+    if not is_cents(amount):
+        raise ValueError("Amount must be a number of cents.")
+    if amount <= 0:
+        raise ValueError("Amount must be greater than 0.")
+    delta = MOVEMENT_SIGNS[t_type] * amount
+
+    with connection() as conn:
+        row = conn.execute(
             """
-            SELECT id, title, due_date, amount, is_paid FROM bills WHERE account_id = ? and is_paid = 0 ORDER BY due_date
+            UPDATE accounts SET balance = balance + ?
+            WHERE id = ? AND (? >= 0 OR balance + ? >= overdraft_limit)
+            RETURNING balance
             """,
-            (account_id,),
+            (delta, account_id, delta, delta),
+        ).fetchone()
+        if row is None:
+            exists = conn.execute(
+                "SELECT 1 FROM accounts WHERE id = ?", (account_id,)
+            ).fetchone()
+            if exists is None:
+                raise ValueError(f"Account {account_id} does not exist.")
+            raise ValueError("Insufficient funds. Overdraft limit reached.")
+
+        balance_after = row["balance"]
+        conn.execute(
+            """
+            INSERT INTO transactions (account_id, t_type, amount, balance_after, details)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (account_id, t_type, amount, balance_after, details),
         )
-    else:
-        cur.execute(
+    return balance_after
+
+
+TRANSACTIONS_FOR_ACCOUNT_SQL = """
+    SELECT t_type, amount, balance_after, details, created_at
+    FROM TRANSACTIONS
+    WHERE account_id = ?
+    ORDER BY id
+"""
+
+
+def load_transactions_for_account(account_id: int):
+    with connection() as conn:
+        return conn.execute(TRANSACTIONS_FOR_ACCOUNT_SQL, (account_id,)).fetchall()
+
+def add_bill(account_id: int, title:str, due_date: str, amount: int):
+    with connection() as conn:
+        conn.execute(
             """
-            SELECT id, title, due_date, amount, is_paid FROM bills WHERE account_id = ? ORDER BY due_date
+            INSERT INTO bills (account_id, title, due_date, amount)
+            VALUES(?,?,?,?)
             """,
-            (account_id,),
+            (account_id,title,due_date,amount),
         )
-    rows = cur.fetchall()
-    conn.close()
-    return rows
 
-def mark_bill_paid(bill_id: int):
-    conn= get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "UPDATE bills SET is_paid = 1 WHERE id = ?",
-        (bill_id,),
+TRANSACTIONS_PAGE_SQL = """
+    SELECT id, t_type, amount, balance_after, details, created_at
+    FROM transactions
+    WHERE account_id = ? AND id > ?{date_filter}
+    ORDER BY id
+    LIMIT ?
+"""
+
+
+def load_transactions_page(
+        account_id: int,
+        after_id: int = 0,
+        limit: int = 100,
+        date_from: str | None = None,
+        date_to: str | None = None,
+):
+    """Return up to `limit` ledger rows with id > after_id, oldest first.
+
+    Pass the id of the last row as after_id to get the next page. The
+    optional date range is inclusive of date_from and exclusive of date_to
+    (both compared against created_at, e.g. "2024-01-01").
+    """
+    date_filter = ""
+    params = [account_id, after_id]
+    if date_from:
+        date_filter += " AND created_at >= ?"
+        params.append(date_from)
+    if date_to:
+        date_filter += " AND created_at < ?"
+        params.append(date_to)
+    params.append(limit)
+
+    with connection() as conn:
+        return conn.execute(
+            TRANSACTIONS_PAGE_SQL.format(date_filter=date_filter), params
+        ).fetchall()
+
+EXPORT_COLUMNS = ("id", "iban", "t_type", "amount", "balance_after", "details", "created_at")
+
+
+def iter_transactions(
+        account_id: int | None = None,
+        date_from: str | None = None,
+        date_to: str | None = None,
+        batch_size: int = 10_000,
+):
+    """Yield ledger rows (EXPORT_COLUMNS) in id order, batch_size at a time.
+
+    Rows are pulled from the cursor with fetchmany, so memory use does not
+    depend on the size of the ledger. Without account_id every account is
+    included. date_from is inclusive, date_to exclusive.
+    """
+    where = []
+    params = []
+    if account_id is not None:
+        where.append("t.account_id = ?")
+        params.append(account_id)
+    if date_from:
+        where.append("t.created_at >= ?")
+        params.append(date_from)
+    if date_to:
+        where.append("t.created_at < ?")
+        params.append(date_to)
+    sql = (
+        "SELECT t.id, a.iban, t.t_type, t.amount, t.balance_after, t.details, t.created_at "
+        "FROM transactions t JOIN accounts a ON a.id = t.account_id"
     )
-    conn.commit()
-    conn.close()
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY t.id"
+
+    # A separate read-only cursor: nothing to commit, and other db.* calls
+    # on this thread can run while the export is in progress.
+    cur = get_connection().cursor()
+    try:
+        cur.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        cur.close()
+
+def iter_ledger_batches(account_ids: list[int] | None = None, batch_size: int = 50_000):
+    """Yield lists of (account_id, delta, balance_after, epoch_seconds) rows.
+
+    delta is the amount signed by MOVEMENT_SIGNS (0 for other types such
+    as OPEN). Rows come ordered by account and then by id; every account
+    is included when account_ids is None. Meant for analytics that turn
+    the rows into arrays, so SQLite does the type and date conversions.
+    """
+    signs = " ".join(f"WHEN '{t}' THEN {sign}" for t, sign in MOVEMENT_SIGNS.items())
+    sql = (
+        f"SELECT account_id, amount * (CASE t_type {signs} ELSE 0 END), balance_after, "
+        "CAST(strftime('%s', created_at) AS INTEGER) FROM transactions"
+    )
+    params = []
+    if account_ids is not None:
+        sql += f" WHERE account_id IN ({', '.join('?' * len(account_ids))})"
+        params = list(account_ids)
+    sql += " ORDER BY account_id, id"
+
+    cur = get_connection().cursor()
+    # Plain tuples: building sqlite3.Row objects would double the cost.
+    cur.row_factory = None
+    try:
+        cur.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cur.close()
+
+UNPAID_BILLS_SQL = (
+    "SELECT id, title, due_date, amount, is_paid FROM bills "
+    "WHERE account_id = ? and is_paid = 0 ORDER BY due_date"
+)
+ALL_BILLS_SQL = (
+    "SELECT id, title, due_date, amount, is_paid FROM bills "
+    "WHERE account_id = ? ORDER BY due_date"
+)
+
+
+def load_bills_for_account(account_id: int, only_unpaid: bool = True):
+    with connection() as conn:
+        sql = UNPAID_BILLS_SQL if only_unpaid else ALL_BILLS_SQL
+        return conn.execute(sql, (account_id,)).fetchall()
+
+# Hot queries and the index each one must use. check_query_plans() fails
+# if a schema change makes any of them fall back to a table scan.
+QUERY_PLAN_EXPECTATIONS = {
+    "accounts_for_user": (ACCOUNTS_FOR_USER_SQL, (1,), "idx_accounts_user"),
+    "transactions_for_account": (TRANSACTIONS_FOR_ACCOUNT_SQL, (1,), "idx_transactions_account"),
+    "transactions_page": (
+        TRANSACTIONS_PAGE_SQL.format(date_filter=""), (1, 0, 100), "idx_transactions_account"
+    ),
+    "accounts_page": (
+        f"{ACCOUNT_ROWS_SQL} WHERE a.id > ? AND a.user_id = ? ORDER BY a.id LIMIT ?", (0, 1, 100),
+        "idx_accounts_user",
+    ),
+    "search_iban": (SEARCH_IBAN_SQL.format(where=""), ("bg", "bh", 100), "idx_accounts_iban_fold"),
+    "search_owner": (SEARCH_OWNER_SQL.format(where=""), ("iv", "iw", 100), "idx_accounts_owner_fold"),
+    "search_user_owner": (
+        SEARCH_OWNER_SQL.format(where=" AND a.user_id = ?"), ("iv", "iw", 1, 100),
+        "idx_accounts_user_owner_fold",
+    ),
+    "search_username": (
+        SEARCH_USERNAME_SQL.format(where=""), ("iv", "iw", 100, 100), "idx_users_username_fold"
+    ),
+    "unpaid_bills": (UNPAID_BILLS_SQL, (1,), "idx_bills_account_paid_due"),
+    "all_bills": (ALL_BILLS_SQL, (1,), "idx_bills_account_paid_due"),
+}
+
+
+def explain_query_plan(sql: str, params: tuple = ()) -> list[str]:
+    with connection() as conn:
+        rows = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    return [row["detail"] for row in rows]
+
+
+def check_query_plans() -> list[str]:
+    """Return a description of every hot query that does not use its index."""
+    problems = []
+    for name, (sql, params, index) in QUERY_PLAN_EXPECTATIONS.items():
+        plan = explain_query_plan(sql, params)
+        if not any(index in step for step in plan):
+            problems.append(f"{name}: expected {index}, got {' / '.join(plan)}")
+    return problems
+
+def mark_bill_paid(bill_id: int):
+    with connection() as conn:
+        conn.execute(
+            "UPDATE bills SET is_paid = 1 WHERE id = ?",
+            (bill_id,),
+        )
 
 def delete_account(account_id: int):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM accounts WHERE id = ?", (account_id,))
-    conn.commit()
-    conn.close()
+    with connection() as conn:
+        conn.execute("DELETE FROM accounts WHERE id = ?", (account_id,))
 
 
-def update_overdraft(account_id: int, new_limit: float):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("UPDATE accounts SET overdraft_limit = ? WHERE id = ?",
-                (new_limit, account_id), )
-    conn.commit()
-    conn.close()
+def update_overdraft(account_id: int, new_limit: int):
+    with connection() as conn:
+        conn.execute("UPDATE accounts SET overdraft_limit = ? WHERE id = ?",
+                     (new_limit, account_id), )
 
 
 def create_user(username: str, password_hash: str, is_admin: int = 0) -> int:
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO users (username, password_hash, is_admin)
-        VALUES (?, ?, ?)
-        """,
-        (username, password_hash, is_admin),
-    )
-    conn.commit()
-    user_id = cur.lastrowid
-    conn.close()
-    return user_id
+    with connection() as conn:
+        cur = conn.execute(
+            """
+            INSERT INTO users (username, password_hash, is_admin, username_fold)
+            VALUES (?, ?, ?, ?)
+            """,
+            (username, password_hash, is_admin, username.casefold()),
+        )
+        return cur.lastrowid
 
 
 def get_user_by_username(username: str):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT id, username, password_hash, is_admin FROM users WHERE username = ?",
-        (username,),
-    )
-    row = cur.fetchone()
-    conn.close()
-    return row
+    with connection() as conn:
+        cur = conn.execute(
+            "SELECT id, username, password_hash, is_admin FROM users WHERE username = ?",
+            (username,),
+        )
+        return cur.fetchone()
+
+
+def get_cached_answer(key: str, created_after: float, now: float) -> str | None:
+    """Cached assistant answer for key if it was stored after created_after."""
+    with connection() as conn:
+        row = conn.execute(
+            "UPDATE assistant_cache SET last_used = ?, hits = hits + 1 "
+            "WHERE key = ? AND created_at > ? RETURNING answer",
+            (now, key, created_after),
+        ).fetchone()
+    return row["answer"] if row else None
+
+
+def put_cached_answer(key: str, answer: str, now: float, max_entries: int):
+    """Store an answer, evicting the least recently used ones beyond max_entries."""
+    with connection() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO assistant_cache (key, answer, created_at, last_used) "
+            "VALUES (?, ?, ?, ?)",
+            (key, answer, now, now),
+        )
+        conn.execute(
+            "DELETE FROM assistant_cache WHERE key IN ("
+            "SELECT key FROM assistant_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (max_entries,),
+        )
+
+
+def purge_cached_answers(created_before: float) -> int:
+    """Delete expired assistant answers; return how many were removed."""
+    with connection() as conn:
+        cur = conn.execute("DELETE FROM assistant_cache WHERE created_at <= ?", (created_before,))
+    return cur.rowcount
+
+
+def get_cached_answers_count() -> int:
+    with connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM assistant_cache").fetchone()[0]
 
 
 def get_users_count() -> int:
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT COUNT (*) AS usr FROM users")
-    row = cur.fetchone()
-    conn.close()
-    return row["usr"] if row else 0
\ No newline at end of file
+    with connection() as conn:
+        row = conn.execute("SELECT COUNT (*) AS usr FROM users").fetchone()
+    return row["usr"] if row else 0
+
+
+# Opt-in call statistics (see db_stats.py), written to this file at exit.
+if os.environ.get("BANK_DB_STATS"):
+    import db_stats
+    db_stats.enable(dump_to=os.environ["BANK_DB_STATS"])
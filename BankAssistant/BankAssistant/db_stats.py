@@ -0,0 +1,298 @@
+"""Opt-in latency and row-count statistics for the db layer.
+
+enable() wraps every public function of db.py: each call records its
+latency in a histogram and the number of rows it returned. It also
+installs a SQLite trace callback that counts every statement executed,
+both per SQL text and per db function. dump() writes everything as JSON
+or, for a .prom/.txt path, in the Prometheus text format.
+
+Turn it on without code changes by setting BANK_DB_STATS to an output
+file; the statistics are then written there at exit:
+
+    BANK_DB_STATS=db_stats.prom python main.py
+
+Wrapping only works for callers that look functions up on the module
+(import db; db.apply_movement(...)), which is how the app uses db.
+"""
+import atexit
+import functools
+import inspect
+import json
+import re
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+import db
+
+# Histogram bucket upper bounds in seconds (Prometheus "le" values).
+BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Pool plumbing, not queries.
+SKIP = {
+    "get_profile", "get_connection", "connection", "close_connection",
+    "close_all_connections", "set_trace_callback",
+}
+
+_lock = threading.Lock()
+_originals: dict[str, object] = {}
+_calls: dict[str, "_FunctionStats"] = {}
+_statements: dict[str, int] = {}
+# Name of the db function running on this thread, for the statement trace.
+_current = threading.local()
+_dump_path: Path | None = None
+
+
+class _FunctionStats:
+    __slots__ = ("count", "errors", "rows", "statements", "total", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.rows = 0
+        self.statements = 0
+        self.total = 0.0
+        # buckets[i] counts calls with BUCKETS[i-1] < latency <= BUCKETS[i];
+        # the extra last slot is +Inf.
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def observe(self, seconds: float, rows: int, failed: bool):
+        self.count += 1
+        self.errors += failed
+        self.rows += rows
+        self.total += seconds
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate a latency quantile by interpolating inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            if n and seen + n >= rank:
+                low = BUCKETS[i - 1] if i else 0.0
+                high = BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1]
+                return low + (high - low) * (rank - seen) / n
+            seen += n
+        return BUCKETS[-1]
+
+
+def _rows(result) -> int:
+    """Rows in a db function's return value (lists, single rows, None)."""
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, (dict, tuple)) or hasattr(result, "keys"):
+        return 1
+    return 0
+
+
+def _observe(name: str, seconds: float, rows: int, failed: bool):
+    with _lock:
+        stats = _calls.get(name)
+        if stats is None:
+            stats = _calls[name] = _FunctionStats()
+        stats.observe(seconds, rows, failed)
+
+
+def _trace(sql: str):
+    # Statements run by triggers are part of the statement that fired them.
+    # SQLite reports them as "-- TRIGGER ..." comments, but Python's trace
+    # callback passes the firing statement's (expanded) text again, so they
+    # also show up as repeats; _current.last_sql is reset on every db call.
+    if sql.startswith("--") or sql == getattr(_current, "last_sql", None):
+        return
+    _current.last_sql = sql
+    key = " ".join(sql.split())
+    name = getattr(_current, "name", None)
+    with _lock:
+        _statements[key] = _statements.get(key, 0) + 1
+        if name is not None:
+            stats = _calls.get(name)
+            if stats is None:
+                stats = _calls[name] = _FunctionStats()
+            stats.statements += 1
+
+
+def _wrap(name: str, func):
+    if inspect.isgeneratorfunction(func):
+        # Generators are timed from the first call to exhaustion (or close)
+        # and count every row they yield; batches count as their length.
+        # Their statements run while they are resumed, so the function name
+        # is set around every step rather than around the call.
+        @functools.wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            rows = 0
+            failed = False
+            gen = func(*args, **kwargs)
+
+            def step(resume):
+                outer = getattr(_current, "name", None)
+                _current.name = outer or name
+                _current.last_sql = None
+                try:
+                    return resume()
+                finally:
+                    _current.name = outer
+
+            try:
+                while True:
+                    try:
+                        item = step(gen.__next__)
+                    except StopIteration:
+                        return
+                    rows += len(item) if isinstance(item, list) else 1
+                    yield item
+            except GeneratorExit:
+                raise
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                step(gen.close)
+                _observe(name, time.perf_counter() - start, rows, failed)
+        return generator_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        outer = getattr(_current, "name", None)
+        _current.name = outer or name
+        _current.last_sql = None
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            _observe(name, time.perf_counter() - start, 0, True)
+            raise
+        finally:
+            _current.name = outer
+        _observe(name, time.perf_counter() - start, _rows(result), False)
+        return result
+    return wrapper
+
+
+def enable(dump_to=None):
+    """Start collecting. With dump_to, write the statistics there at exit."""
+    global _dump_path
+    with _lock:
+        if not _originals:
+            for name, func in vars(db).items():
+                if (name.startswith("_") or name in SKIP or not inspect.isfunction(func)
+                        or func.__module__ != db.__name__):
+                    continue
+                _originals[name] = func
+                setattr(db, name, _wrap(name, func))
+    db.set_trace_callback(_trace)
+    if dump_to is not None:
+        if _dump_path is None:
+            atexit.register(_dump_at_exit)
+        _dump_path = Path(dump_to)
+
+
+def disable():
+    """Stop collecting and restore the original db functions."""
+    db.set_trace_callback(None)
+    with _lock:
+        for name, func in _originals.items():
+            setattr(db, name, func)
+        _originals.clear()
+
+
+def enabled() -> bool:
+    return bool(_originals)
+
+
+def reset():
+    """Forget everything collected so far."""
+    with _lock:
+        _calls.clear()
+        _statements.clear()
+
+
+def snapshot() -> dict:
+    """Current statistics as plain data (latencies in seconds)."""
+    with _lock:
+        functions = {
+            name: {
+                "count": s.count,
+                "errors": s.errors,
+                "rows": s.rows,
+                "statements": s.statements,
+                "total_seconds": s.total,
+                **{f"p{round(q * 100)}": s.quantile(q) for q in QUANTILES},
+                "buckets": dict(zip([*map(str, BUCKETS), "+Inf"], s.buckets)),
+            }
+            for name, s in sorted(_calls.items())
+        }
+        statements = dict(sorted(_statements.items(), key=lambda item: -item[1]))
+    return {"functions": functions, "statements": statements}
+
+
+def _label(value: str) -> str:
+    return re.sub(r'(["\\])', r"\\\1", value).replace("\n", " ")
+
+
+def to_prometheus(data: dict | None = None) -> str:
+    """Statistics in the Prometheus text exposition format."""
+    data = data or snapshot()
+    lines = [
+        "# HELP bank_db_call_seconds Latency of db.* calls.",
+        "# TYPE bank_db_call_seconds histogram",
+    ]
+    for name, s in data["functions"].items():
+        cumulative = 0
+        for le, n in s["buckets"].items():
+            cumulative += n
+            lines.append(f'bank_db_call_seconds_bucket{{function="{name}",le="{le}"}} {cumulative}')
+        lines.append(f'bank_db_call_seconds_sum{{function="{name}"}} {s["total_seconds"]:.6f}')
+        lines.append(f'bank_db_call_seconds_count{{function="{name}"}} {s["count"]}')
+
+    lines += [
+        "# HELP bank_db_call_latency_seconds Estimated latency quantiles of db.* calls.",
+        "# TYPE bank_db_call_latency_seconds gauge",
+    ]
+    for name, s in data["functions"].items():
+        for q in QUANTILES:
+            value = s[f"p{round(q * 100)}"]
+            lines.append(f'bank_db_call_latency_seconds{{function="{name}",quantile="{q}"}} {value:.6f}')
+
+    for metric, key, help_text in (
+            ("bank_db_call_errors_total", "errors", "db.* calls that raised."),
+            ("bank_db_rows_total", "rows", "Rows returned by db.* calls."),
+            ("bank_db_call_statements_total", "statements", "SQL statements run inside db.* calls."),
+    ):
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+        for name, s in data["functions"].items():
+            lines.append(f'{metric}{{function="{name}"}} {s[key]}')
+
+    lines += [
+        "# HELP bank_db_statements_total SQL statements executed, by statement text.",
+        "# TYPE bank_db_statements_total counter",
+    ]
+    for sql, n in data["statements"].items():
+        lines.append(f'bank_db_statements_total{{sql="{_label(sql)}"}} {n}')
+    return "\n".join(lines) + "\n"
+
+
+def dump(path) -> Path:
+    """Write the statistics to path: Prometheus text for .prom/.txt, else JSON."""
+    path = Path(path)
+    data = snapshot()
+    if path.suffix.lower() in (".prom", ".txt"):
+        path.write_text(to_prometheus(data), encoding="utf-8")
+    else:
+        path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    return path
+
+
+def _dump_at_exit():
+    if _dump_path is not None:
+        dump(_dump_path)
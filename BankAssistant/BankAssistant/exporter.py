@@ -0,0 +1,122 @@
+"""Export account ledgers to CSV or JSONL in constant memory.
+
+Usage:
+    python exporter.py ledger.csv
+    python exporter.py ledger.jsonl --iban BG80BNBG96611020345678 --from 2024-01-01 --to 2024-12-31
+
+The output uses the same columns and major-unit amounts importer.py reads,
+so an export can be imported into another database.
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import db
+from money import format_money, from_cents
+
+# Report progress every this many rows.
+PROGRESS_EVERY = 100_000
+
+
+def _write_csv(f, rows, on_row):
+    writer = csv.writer(f)
+    writer.writerow(db.EXPORT_COLUMNS)
+    for row_id, iban, t_type, amount, balance_after, details, created_at in rows:
+        writer.writerow((
+            row_id, iban, t_type,
+            format_money(amount), format_money(balance_after),
+            details, created_at,
+        ))
+        on_row()
+
+
+def _write_jsonl(f, rows, on_row):
+    for row in rows:
+        record = dict(zip(db.EXPORT_COLUMNS, row))
+        record["amount"] = from_cents(record["amount"])
+        record["balance_after"] = from_cents(record["balance_after"])
+        f.write(json.dumps(record, ensure_ascii=False))
+        f.write("\n")
+        on_row()
+
+
+WRITERS = {"csv": _write_csv, "jsonl": _write_jsonl}
+
+
+def export_ledger(
+        path,
+        fmt: str | None = None,
+        account_id: int | None = None,
+        date_from: str | None = None,
+        date_to: str | None = None,
+        progress=None,
+) -> int:
+    """Write the ledger (one account or all of them) to path; return the row count.
+
+    date_from is inclusive and date_to exclusive. progress, if given, is
+    called with the running row count every PROGRESS_EVERY rows.
+    """
+    path = Path(path)
+    fmt = fmt or ("jsonl" if path.suffix.lower() in (".jsonl", ".json") else "csv")
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown format: {fmt}")
+
+    count = 0
+
+    def on_row():
+        nonlocal count
+        count += 1
+        if progress and count % PROGRESS_EVERY == 0:
+            progress(count)
+
+    rows = db.iter_transactions(account_id, date_from, date_to)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        WRITERS[fmt](f, rows, on_row)
+    return count
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Export the transactions ledger.")
+    parser.add_argument("file", type=Path)
+    parser.add_argument("--format", choices=list(WRITERS), help="default: from the file extension")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--account-id", type=int, help="only this account")
+    target.add_argument("--iban", help="only the account with this IBAN")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="first day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="last day, inclusive")
+    parser.add_argument("--db", help=f"database file (default: {db.DB_FILE})")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        db.DB_FILE = args.db
+    db.init_db()
+
+    account_id = args.account_id
+    if args.iban:
+        account_id = db.get_account_id_by_iban(args.iban)
+        if account_id is None:
+            print(f"No account with IBAN {args.iban}", file=sys.stderr)
+            return 1
+
+    start = time.perf_counter()
+    count = export_ledger(
+        args.file,
+        fmt=args.format,
+        account_id=account_id,
+        date_from=args.date_from.isoformat() if args.date_from else None,
+        date_to=(args.date_to + timedelta(days=1)).isoformat() if args.date_to else None,
+        progress=lambda n: print(f"\r{n:,} rows exported", end="", file=sys.stderr, flush=True),
+    )
+    seconds = time.perf_counter() - start
+    print(file=sys.stderr)
+    rate = count / seconds if seconds else 0
+    print(f"Exported {count:,} rows in {seconds:.1f}s ({rate:,.0f} rows/s) to {args.file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
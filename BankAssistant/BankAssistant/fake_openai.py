@@ -0,0 +1,152 @@
+"""A local stand-in for the OpenAI Responses API, for tests and demos.
+
+Serves POST /v1/responses, both plain and streamed (server-sent events
+in the Responses API format), without network access or an API key.
+Answers come from ai_backends.LocalBackend: the "User question:" line of
+the prompt echoed back after --latency seconds, streamed one word every
+--token-delay seconds; --error-rate of the requests fail with HTTP 500.
+
+Usage:
+    python fake_openai.py --port 8765 --token-delay 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 python main.py
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from itertools import chain
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ai_backends import MODEL, BackendError, LocalBackend
+
+
+def _response(response_id: str, text: str, status: str) -> dict:
+    output = []
+    if status == "completed":
+        output.append({
+            "type": "message",
+            "id": f"msg_{response_id}",
+            "role": "assistant",
+            "status": "completed",
+            "content": [{"type": "output_text", "text": text, "annotations": []}],
+        })
+    return {
+        "id": response_id,
+        "object": "response",
+        "created_at": int(time.time()),
+        "model": MODEL,
+        "status": status,
+        "output": output,
+        "parallel_tool_calls": False,
+        "tool_choice": "auto",
+        "tools": [],
+    }
+
+
+class FakeResponsesHandler(BaseHTTPRequestHandler):
+    # Answers come from server.backend, a LocalBackend.
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/v1/responses":
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        prompt = body.get("input")
+        if not isinstance(prompt, str):
+            prompt = json.dumps(prompt)
+        response_id = f"resp_{uuid.uuid4().hex}"
+        backend = self.server.backend
+        try:
+            if body.get("stream"):
+                chunks = backend.stream(prompt)
+                first = next(chunks)    # latency and failures happen here
+            else:
+                text = backend.ask(prompt)
+        except BackendError as e:
+            self._send_json(500, {"error": {"message": str(e), "type": "server_error"}})
+            return
+        if body.get("stream"):
+            self._stream(response_id, first, chunks)
+        else:
+            self._send_json(200, _response(response_id, text, "completed"))
+
+    def _send_json(self, status: int, data: dict):
+        payload = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _stream(self, response_id: str, first: str, chunks):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        sequence = 0
+
+        def send(event: dict):
+            nonlocal sequence
+            event["sequence_number"] = sequence
+            sequence += 1
+            self.wfile.write(f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        parts = []
+        try:
+            send({"type": "response.created", "response": _response(response_id, "", "in_progress")})
+            for token in chain([first], chunks):
+                parts.append(token)
+                send({
+                    "type": "response.output_text.delta",
+                    "item_id": f"msg_{response_id}",
+                    "output_index": 0,
+                    "content_index": 0,
+                    "delta": token,
+                    "logprobs": [],
+                })
+            send({"type": "response.completed", "response": _response(response_id, "".join(parts), "completed")})
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client stopped reading (e.g. the question was cancelled)
+        self.close_connection = True
+
+
+def serve(port: int = 0, backend: LocalBackend | None = None) -> ThreadingHTTPServer:
+    """Start the server on a background thread; its base URL is base_url(server)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeResponsesHandler)
+    server.daemon_threads = True
+    server.backend = backend or LocalBackend(latency=0.0, token_delay=0.0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def base_url(server: ThreadingHTTPServer) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI Responses API server.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.05, help="seconds between streamed tokens")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests that fail (0-1)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), FakeResponsesHandler)
+    server.backend = LocalBackend(
+        latency=args.latency, token_delay=args.token_delay,
+        error_rate=args.error_rate, seed=args.seed,
+    )
+    print(f"Serving on {base_url(server)} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
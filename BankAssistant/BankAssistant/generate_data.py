@@ -0,0 +1,242 @@
+"""Fill a database with synthetic users, accounts, transactions and bills.
+
+Usage:
+    python generate_data.py --db load.db --users 5000 --accounts 200000 --transactions 10000000
+
+The same --seed always produces the same data. Users are called
+user000000, user000001, ... and all have the password "password";
+user000000 is an admin. Accounts get valid Bulgarian IBANs. Transaction
+counts per account are heavily skewed: a few accounts carry most of the
+volume. Every ledger is consistent with its account balance. Rows are
+written with executemany in large batches.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+import db
+from passwords import hash_password
+
+BATCH_SIZE = 100_000
+
+DEFAULT_PASSWORD = "password"
+
+BANK_CODES = ["BNBG", "UNCR", "STSA", "FINV", "BPBI", "RZBB", "CECB", "UBBS"]
+
+FIRST_NAMES = ["Ivan", "Maria", "Georgi", "Elena", "Dimitar", "Nikola", "Petya", "Stoyan",
+               "Anna", "Todor", "Desislava", "Kaloyan", "Yana", "Martin", "Viktoria", "Boris"]
+LAST_NAMES = ["Ivanov", "Petrova", "Georgiev", "Dimitrova", "Nikolov", "Stoyanova", "Todorov",
+              "Angelova", "Kolev", "Hristova", "Marinov", "Popova", "Iliev", "Vasileva"]
+
+BILL_TITLES = ["Electricity", "Water", "Internet", "Mobile phone", "Rent", "Heating",
+               "Insurance", "Gym", "Streaming", "Parking"]
+
+DEPOSIT_DETAILS = ["cash deposit", "salary", "refund", "transfer received"]
+WITHDRAW_DETAILS = ["cash withdraw", "card payment", "online purchase", "utility bill"]
+
+
+def iban_check_digits(country: str, bban: str) -> str:
+    """ISO 13616 check digits for country + BBAN."""
+    rearranged = bban + country + "00"
+    digits = "".join(str(int(ch, 36)) for ch in rearranged)
+    return f"{98 - int(digits) % 97:02d}"
+
+
+def make_iban(rng: random.Random, serial: int) -> str:
+    """A valid BG IBAN: bank code, branch, account type and an 8-digit serial."""
+    bban = f"{rng.choice(BANK_CODES)}{rng.randrange(10_000):04d}{rng.choice(('10', '15', '20'))}{serial:08d}"
+    return f"BG{iban_check_digits('BG', bban)}{bban}"
+
+
+def skewed_counts(rng: random.Random, accounts: int, total: int) -> list[int]:
+    """Split total transactions over accounts with a Pareto (80/20-like) skew."""
+    if accounts == 0:
+        return []
+    weights = [rng.paretovariate(1.16) for _ in range(accounts)]
+    scale = total / sum(weights)
+    counts = [int(w * scale) for w in weights]
+    # Hand the rounding remainder to random accounts so the sum is exact.
+    for i in rng.sample(range(accounts), k=min(accounts, total - sum(counts))):
+        counts[i] += 1
+    return counts
+
+
+def _timestamp(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class _Batches:
+    """Collect rows and flush them through writer every BATCH_SIZE rows."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.rows = []
+        self.written = 0
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.writer(self.rows)
+            self.written += len(self.rows)
+            self.rows = []
+
+
+def _insert_accounts(rows):
+    with db.connection() as conn:
+        conn.executemany(
+            "INSERT INTO accounts (id, owner, iban, balance, overdraft_limit, user_id, owner_fold, iban_fold) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+
+def _insert_bills(rows):
+    with db.connection() as conn:
+        conn.executemany(
+            "INSERT INTO bills (account_id, title, due_date, amount, is_paid) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+
+
+def generate(
+        seed: int = 1,
+        users: int = 1_000,
+        accounts: int = 10_000,
+        transactions: int = 1_000_000,
+        bills_per_account: float = 2.0,
+        start: datetime = datetime(2022, 1, 1, tzinfo=timezone.utc),
+        days: int = 730,
+        progress=None,
+) -> dict:
+    """Generate the dataset into the current db.DB_FILE; return row counts.
+
+    progress, if given, is called with a short status string now and then.
+    """
+    rng = random.Random(seed)
+    start_epoch = start.timestamp()
+    span = days * 86_400
+
+    with db.connection() as conn:
+        first_user = (conn.execute("SELECT COALESCE(MAX(id), 0) FROM users").fetchone()[0]) + 1
+        first_account = (conn.execute("SELECT COALESCE(MAX(id), 0) FROM accounts").fetchone()[0]) + 1
+        password_hash = hash_password(DEFAULT_PASSWORD)
+        conn.executemany(
+            "INSERT INTO users (id, username, password_hash, is_admin, username_fold) VALUES (?, ?, ?, ?, ?)",
+            (
+                (first_user + i, f"user{first_user + i - 1:06d}", password_hash, 1 if first_user + i == 1 else 0,
+                 f"user{first_user + i - 1:06d}")
+                for i in range(users)
+            ),
+        )
+
+    counts = skewed_counts(rng, accounts, transactions)
+    account_rows = _Batches(_insert_accounts)
+    ledger_rows = _Batches(db.add_transactions_bulk)
+    bill_rows = _Batches(_insert_bills)
+
+    for n in range(accounts):
+        account_id = first_account + n
+        balance = rng.randrange(0, 500_000)
+        overdraft_limit = -rng.choice((0, 0, 0, 50_000, 100_000, 200_000))
+        opened = start_epoch + rng.random() * span * 0.2
+
+        # The ledger is written before its account row: both are batched,
+        # and the account row needs the final balance.
+        ledger_rows.add((account_id, "OPEN", 0, balance, "account balance", _timestamp(opened)))
+        count = counts[n]
+        if count:
+            step = (start_epoch + span - opened) / count
+            when = opened
+            for _ in range(count):
+                when += rng.random() * 2 * step
+                amount = int(rng.lognormvariate(8.5, 1.2)) + 1
+                if rng.random() < 0.55 or balance - amount < overdraft_limit:
+                    balance += amount
+                    t_type, details = "DEPOSIT", rng.choice(DEPOSIT_DETAILS)
+                else:
+                    balance -= amount
+                    t_type, details = "WITHDRAW", rng.choice(WITHDRAW_DETAILS)
+                ledger_rows.add((account_id, t_type, amount, balance, details, _timestamp(when)))
+
+        owner = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        iban = make_iban(rng, account_id)
+        account_rows.add((
+            account_id, owner, iban, balance, overdraft_limit, first_user + rng.randrange(users),
+            owner.casefold(), iban.casefold(),
+        ))
+
+        for _ in range(int(bills_per_account) + (rng.random() < bills_per_account % 1)):
+            due = start_epoch + rng.random() * (span + 90 * 86_400)
+            bill_rows.add((
+                account_id, rng.choice(BILL_TITLES), _timestamp(due)[:10],
+                rng.randrange(1_000, 30_000), int(due < start_epoch + span and rng.random() < 0.8),
+            ))
+
+        if progress and (n + 1) % 10_000 == 0:
+            progress(f"{n + 1:,}/{accounts:,} accounts, {ledger_rows.written + len(ledger_rows.rows):,} transactions")
+
+    for batches in (account_rows, ledger_rows, bill_rows):
+        batches.flush()
+
+    return {
+        "users": users,
+        "accounts": account_rows.written,
+        "transactions": ledger_rows.written,
+        "bills": bill_rows.written,
+    }
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic bank database for load tests.")
+    parser.add_argument("--db", default=db.DB_FILE, help=f"database file (default: {db.DB_FILE})")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--transactions", type=int, default=1_000_000,
+                        help="total ledger rows besides the OPEN row of each account")
+    parser.add_argument("--bills-per-account", type=float, default=2.0)
+    parser.add_argument("--start", type=datetime.fromisoformat, default=datetime(2022, 1, 1),
+                        help="first day of the generated history (YYYY-MM-DD)")
+    parser.add_argument("--days", type=int, default=730, help="length of the history in days")
+    parser.add_argument("--profile", choices=list(db.DB_PROFILES), default="throughput",
+                        help="SQLite profile while generating (default: throughput)")
+    args = parser.parse_args(argv)
+
+    if args.users < 1 or args.accounts < 0 or args.transactions < 0:
+        parser.error("--users must be at least 1; --accounts and --transactions must not be negative")
+    if args.accounts == 0 and args.transactions > 0:
+        parser.error("--transactions needs at least one account (--accounts)")
+
+    db.DB_FILE = args.db
+    db.DB_PROFILE = args.profile
+    db.init_db()
+
+    begin = time.perf_counter()
+    counts = generate(
+        seed=args.seed,
+        users=args.users,
+        accounts=args.accounts,
+        transactions=args.transactions,
+        bills_per_account=args.bills_per_account,
+        start=args.start.replace(tzinfo=timezone.utc),
+        days=args.days,
+        progress=lambda text: print(f"\r{text}", end="", file=sys.stderr, flush=True),
+    )
+    seconds = time.perf_counter() - begin
+    print(file=sys.stderr)
+    print(
+        f"Generated {counts['users']:,} users, {counts['accounts']:,} accounts, "
+        f"{counts['transactions']:,} transactions and {counts['bills']:,} bills "
+        f"in {seconds:.1f}s into {args.db}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
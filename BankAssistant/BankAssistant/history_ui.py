@@ -0,0 +1,143 @@
+import tkinter as tk
+from datetime import date, datetime, timedelta
+from tkinter import messagebox
+
+import db
+from money import format_money
+
+# Rows fetched from the database per page.
+PAGE_SIZE = 200
+
+# Load the next page once the visible part of the list is this close to the end.
+PREFETCH_AT = 0.9
+
+
+def format_transaction(row) -> str:
+    created = row["created_at"]
+    t_type = row["t_type"].ljust(12)
+    details = row["details"] or ""
+    return (
+        f"{created} | {t_type} {format_money(row['amount']):>10} -> "
+        f"balance {format_money(row['balance_after']):>10} {details}"
+    )
+
+
+def _parse_date(text: str) -> date | None:
+    text = text.strip()
+    if not text:
+        return None
+    return datetime.strptime(text, "%Y-%m-%d").date()
+
+
+class HistoryWindow:
+    """Scrollable transaction history that fetches pages as you scroll."""
+
+    def __init__(self, root: tk.Tk, account, theme: dict):
+        self.account = account
+        self.theme = theme
+        self.date_from: str | None = None
+        self.date_to: str | None = None
+        self.exhausted = True
+
+        self.window = tk.Toplevel(root)
+        self.window.title(f"History – {account.iban}")
+
+        # ====== Date filter ======
+        self.frame_filter = tk.Frame(self.window)
+        self.frame_filter.pack(fill="x", padx=10, pady=(10, 0))
+
+        tk.Label(self.frame_filter, text="From (YYYY-MM-DD)").grid(row=0, column=0, sticky="e")
+        self.entry_from = tk.Entry(self.frame_filter, width=12)
+        self.entry_from.grid(row=0, column=1, padx=5)
+
+        tk.Label(self.frame_filter, text="To").grid(row=0, column=2, sticky="e")
+        self.entry_to = tk.Entry(self.frame_filter, width=12)
+        self.entry_to.grid(row=0, column=3, padx=5)
+
+        self.btn_filter = tk.Button(self.frame_filter, text="Filter", command=self.apply_filter)
+        self.btn_filter.grid(row=0, column=4, padx=5)
+
+        # ====== Transactions ======
+        self.frame_list = tk.Frame(self.window)
+        self.frame_list.pack(fill="both", expand=True, padx=10, pady=10)
+
+        self.scrollbar = tk.Scrollbar(self.frame_list, orient="vertical")
+        self.list_history = tk.Listbox(
+            self.frame_list, width=90, height=20, font=("Courier", 10),
+            yscrollcommand=self._on_scroll,
+        )
+        self.scrollbar.config(command=self.list_history.yview)
+        self.list_history.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.label_status = tk.Label(self.window, text="")
+        self.label_status.pack(fill="x", padx=10, pady=(0, 10))
+
+        self._apply_theme()
+        self._reset()
+
+    def _apply_theme(self):
+        t = self.theme
+        self.window.configure(bg=t["bg"])
+        for frame in (self.frame_filter, self.frame_list):
+            frame.configure(bg=t["frame_bg"])
+            for child in frame.winfo_children():
+                if isinstance(child, tk.Label):
+                    child.configure(bg=t["frame_bg"], fg=t["fg"])
+                elif isinstance(child, tk.Entry):
+                    child.configure(bg=t["entry_bg"], fg=t["entry_fg"], insertbackground=t["entry_fg"])
+                elif isinstance(child, tk.Button):
+                    child.configure(bg=t["button_bg"], fg=t["button_fg"], activebackground=t["accent"])
+        self.list_history.configure(bg=t["listbox_bg"], fg=t["listbox_fg"])
+        self.label_status.configure(bg=t["status_bg"], fg=t["status_fg"])
+
+    def _reset(self):
+        self.list_history.delete(0, tk.END)
+        self.last_id = 0
+        self.loaded = 0
+        self.exhausted = False
+        self.load_next_page()
+
+    def apply_filter(self):
+        try:
+            start = _parse_date(self.entry_from.get())
+            end = _parse_date(self.entry_to.get())
+        except ValueError:
+            messagebox.showerror("Error", "Dates must be in YYYY-MM-DD format", parent=self.window)
+            return
+
+        self.date_from = start.isoformat() if start else None
+        # "To" is inclusive in the UI; the query bound is exclusive.
+        self.date_to = (end + timedelta(days=1)).isoformat() if end else None
+        self._reset()
+
+    def load_next_page(self):
+        if self.exhausted:
+            return
+        rows = db.load_transactions_page(
+            self.account.db_id,
+            after_id=self.last_id,
+            limit=PAGE_SIZE,
+            date_from=self.date_from,
+            date_to=self.date_to,
+        )
+
+        if rows:
+            self.list_history.insert(tk.END, *(format_transaction(row) for row in rows))
+            self.last_id = rows[-1]["id"]
+            self.loaded += len(rows)
+        if len(rows) < PAGE_SIZE:
+            self.exhausted = True
+
+        if self.loaded == 0:
+            self.label_status.config(text="No transactions yet.")
+        elif self.exhausted:
+            self.label_status.config(text=f"{self.loaded} transactions (end of history)")
+        else:
+            self.label_status.config(text=f"{self.loaded} transactions loaded, scroll for more")
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if float(last) >= PREFETCH_AT and not self.exhausted:
+            # Not from inside the scroll callback: inserting rows triggers it again.
+            self.window.after_idle(self.load_next_page)
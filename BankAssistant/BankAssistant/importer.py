@@ -0,0 +1,257 @@
+"""Bulk import of account statements into the transactions ledger.
+
+Usage:
+    python importer.py statement.csv
+    python importer.py statement.jsonl --iban BG80BNBG96611020345678
+
+Each row needs t_type, amount and balance_after, plus either account_id or
+iban (unless --account-id/--iban is given for the whole file). details and
+created_at ("2024-01-31 12:00:00") are optional. Amounts are in major units
+("12.50"). Rows are checked with the Transaction rules, a known t_type and
+an existing account, and written in batches, one transaction per batch.
+Rejected rows can be written to a JSONL file with --rejects. Account
+balances are not changed.
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+import db
+from BankAccount import Transaction
+from money import to_cents
+
+BATCH_SIZE = 50_000
+
+# Keep at most this many error messages in the result.
+MAX_REPORTED_ERRORS = 20
+
+# Ledger row types: opening balances and the movements of db.apply_movement
+TRANSACTION_TYPES = {"OPEN", *db.MOVEMENT_SIGNS}
+
+# The format SQLite writes for CURRENT_TIMESTAMP, which date filters rely on
+CREATED_AT_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+@dataclass
+class ImportResult:
+    imported: int = 0
+    rejected: int = 0
+    seconds: float = 0.0
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def rows_per_minute(self) -> float:
+        return self.imported / self.seconds * 60 if self.seconds else 0.0
+
+
+def read_rows(path: Path, fmt: str | None = None):
+    """Yield (line_number, row) for every row of a CSV or JSONL file.
+
+    CSV rows are dicts. JSONL lines are yielded as text and decoded by
+    validate_rows, so a malformed line is rejected like any invalid row.
+    """
+    fmt = fmt or ("jsonl" if path.suffix.lower() in (".jsonl", ".json") else "csv")
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            # Line 1 is the header.
+            yield from enumerate(csv.DictReader(f), start=2)
+        elif fmt == "jsonl":
+            for line_no, line in enumerate(f, start=1):
+                if line.strip():
+                    yield line_no, line.strip()
+        else:
+            raise ValueError(f"Unknown format: {fmt}")
+
+
+class _AccountResolver:
+    """Map a row to an account id, caching IBAN lookups."""
+
+    def __init__(self, account_id: int | None = None, iban: str | None = None):
+        self.by_iban: dict[str, int | None] = {}
+        # Every account id, loaded on the first row that gives one
+        self.known_ids: set[int] | None = None
+        self.fixed = account_id
+        if account_id is not None:
+            self._check_id(account_id)
+        if iban is not None:
+            self.fixed = self._lookup(iban)
+            if self.fixed is None:
+                raise ValueError(f"No account with IBAN {iban}")
+
+    def _lookup(self, iban: str) -> int | None:
+        if iban not in self.by_iban:
+            self.by_iban[iban] = db.get_account_id_by_iban(iban)
+        return self.by_iban[iban]
+
+    def _check_id(self, account_id: int) -> int:
+        if self.known_ids is None:
+            self.known_ids = db.load_account_ids()
+        if account_id not in self.known_ids:
+            raise ValueError(f"No account with id {account_id}")
+        return account_id
+
+    def __call__(self, row: dict) -> int:
+        if self.fixed is not None:
+            return self.fixed
+        if row.get("account_id") not in (None, ""):
+            return self._check_id(int(row["account_id"]))
+        iban = (row.get("iban") or "").strip()
+        if not iban:
+            raise ValueError("Row has neither account_id nor iban.")
+        account_id = self._lookup(iban)
+        if account_id is None:
+            raise ValueError(f"No account with IBAN {iban}")
+        return account_id
+
+
+def _created_at(value) -> str | None:
+    if value in (None, ""):
+        return None
+    datetime.strptime(value, CREATED_AT_FORMAT)     # ValueError/TypeError if malformed
+    return value
+
+
+def validate_rows(rows, resolve_account, result: ImportResult, reject=None):
+    """Yield insert tuples for valid rows; count and record the rest.
+
+    reject, if given, is called with (line_no, row, error) for every
+    rejected row.
+    """
+    for line_no, row in rows:
+        try:
+            if isinstance(row, str):
+                row = json.loads(row)
+            if not isinstance(row, dict):
+                raise ValueError("Row is not a JSON object.")
+            account_id = resolve_account(row)
+            tx = Transaction(
+                row.get("t_type") or "",
+                to_cents(row.get("amount")),
+                to_cents(row.get("balance_after")),
+                row.get("details") or "",
+            )
+            if tx.t_type not in TRANSACTION_TYPES:
+                raise ValueError(f"Unknown transaction type: {tx.t_type}")
+            created_at = _created_at(row.get("created_at"))
+        except (ValueError, TypeError) as e:
+            result.rejected += 1
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                result.errors.append(f"line {line_no}: {e}")
+            if reject:
+                reject(line_no, row, e)
+            continue
+        yield (
+            account_id,
+            tx.t_type,
+            tx.amount,
+            tx.balance_after,
+            tx.details,
+            created_at,
+        )
+
+
+def import_file(
+        path,
+        fmt: str | None = None,
+        account_id: int | None = None,
+        iban: str | None = None,
+        batch_size: int = BATCH_SIZE,
+        progress=None,
+        rejects=None,
+) -> ImportResult:
+    """Stream a statement file into the ledger.
+
+    progress, if given, is called with the ImportResult after every batch.
+    rejects, if given, is a path that receives every rejected row as JSONL
+    ({"line": ..., "error": ..., "row": {...}}).
+    """
+    result = ImportResult()
+    start = time.perf_counter()
+    resolve_account = _AccountResolver(account_id, iban)
+
+    reject_file = open(rejects, "w", encoding="utf-8") if rejects else None
+
+    def reject(line_no, row, error):
+        reject_file.write(json.dumps({"line": line_no, "error": str(error), "row": row}, default=str) + "\n")
+
+    try:
+        valid = validate_rows(
+            read_rows(Path(path), fmt), resolve_account, result, reject if reject_file else None
+        )
+        while True:
+            batch = list(islice(valid, batch_size))
+            if not batch:
+                break
+            result.imported += db.add_transactions_bulk(batch)
+            result.seconds = time.perf_counter() - start
+            if progress:
+                progress(result)
+    finally:
+        if reject_file:
+            reject_file.close()
+
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def _print_progress(result: ImportResult):
+    print(
+        f"\r{result.imported:,} rows imported, {result.rejected:,} rejected "
+        f"({result.rows_per_minute:,.0f} rows/min)",
+        end="",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Import a statement into the transactions ledger.")
+    parser.add_argument("file", type=Path)
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="default: from the file extension")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--account-id", type=int, help="import every row into this account")
+    target.add_argument("--iban", help="import every row into the account with this IBAN")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--rejects", type=Path, help="write rejected rows to this JSONL file")
+    parser.add_argument("--db", help=f"database file (default: {db.DB_FILE})")
+    parser.add_argument("--profile", choices=list(db.DB_PROFILES), help="SQLite profile for the import")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        db.DB_FILE = args.db
+    if args.profile:
+        db.DB_PROFILE = args.profile
+    db.init_db()
+
+    try:
+        result = import_file(
+            args.file,
+            fmt=args.format,
+            account_id=args.account_id,
+            iban=args.iban,
+            batch_size=args.batch_size,
+            progress=_print_progress,
+            rejects=args.rejects,
+        )
+    except (OSError, ValueError) as e:
+        print(f"Import failed: {e}", file=sys.stderr)
+        return 1
+
+    print(file=sys.stderr)
+    print(
+        f"Imported {result.imported:,} rows in {result.seconds:.1f}s "
+        f"({result.rows_per_minute:,.0f} rows/min), rejected {result.rejected:,}."
+    )
+    for error in result.errors:
+        print(f"  {error}")
+    return 0 if result.rejected == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,135 @@
+"""Columnar in-memory ledger for accounts with very long histories.
+
+ColumnarLedger stores a transaction history as parallel typed arrays
+instead of a list of Transaction objects: roughly 30 bytes per movement
+instead of ~160. It supports the list operations BankAccount and the UI
+use (append, len, iteration, indexing), plus slicing and sums that work
+directly on the columns. Use it with BankAccount(..., columnar=True).
+"""
+import time
+from array import array
+from bisect import bisect_left
+from itertools import compress
+
+from BankAccount import Transaction
+
+
+class ColumnarLedger:
+    __slots__ = ("_types", "_type_codes", "type_code", "amount", "balance_after",
+                 "timestamp", "details_index", "_details", "_details_codes")
+
+    def __init__(self, transactions=()):
+        # Small lookup tables shared by all rows: type names and details strings.
+        self._types: list[str] = []
+        self._type_codes: dict[str, int] = {}
+        self._details: list[str] = []
+        self._details_codes: dict[str, int] = {}
+
+        self.type_code = array("B")         # index into _types
+        self.amount = array("q")            # cents
+        self.balance_after = array("q")     # cents
+        self.timestamp = array("d")         # seconds since the epoch
+        self.details_index = array("I")     # index into _details
+
+        for tx in transactions:
+            self.append(tx)
+
+    @staticmethod
+    def _intern(value: str, pool: list[str], codes: dict[str, int]) -> int:
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(pool)
+            pool.append(value)
+        return code
+
+    def append(self, tx: Transaction, timestamp: float | None = None):
+        self.add(tx.t_type, tx.amount, tx.balance_after, tx.details, timestamp)
+
+    def add(self, t_type: str, amount: int, balance_after: int, details: str = "",
+            timestamp: float | None = None):
+        """Append a movement without creating a Transaction object."""
+        self.type_code.append(self._intern(t_type, self._types, self._type_codes))
+        self.amount.append(amount)
+        self.balance_after.append(balance_after)
+        self.timestamp.append(time.time() if timestamp is None else timestamp)
+        self.details_index.append(self._intern(details, self._details, self._details_codes))
+
+    def __len__(self) -> int:
+        return len(self.amount)
+
+    def _row(self, i: int) -> Transaction:
+        return Transaction(
+            self._types[self.type_code[i]],
+            self.amount[i],
+            self.balance_after[i],
+            self._details[self.details_index[i]],
+        )
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            part = ColumnarLedger()
+            part._types, part._type_codes = self._types, self._type_codes
+            part._details, part._details_codes = self._details, self._details_codes
+            part.type_code = self.type_code[index]
+            part.amount = self.amount[index]
+            part.balance_after = self.balance_after[index]
+            part.timestamp = self.timestamp[index]
+            part.details_index = self.details_index[index]
+            return part
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ledger index out of range")
+        return self._row(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._row(i)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def types(self) -> list[str]:
+        """Movement types in the order of their type codes."""
+        return list(self._types)
+
+    def total(self, t_type: str | None = None) -> int:
+        """Sum of amounts in cents, optionally only for one movement type."""
+        if t_type is None:
+            return sum(self.amount)
+        code = self._type_codes.get(t_type.strip().upper())
+        if code is None:
+            return 0
+        if len(self._types) == 1:
+            return sum(self.amount)
+        # A 0/1 byte per row (translate runs in C) picks the amounts to add.
+        table = bytearray(256)
+        table[code] = 1
+        return sum(compress(self.amount, self.type_code.tobytes().translate(table)))
+
+    def between(self, start: float, end: float) -> "ColumnarLedger":
+        """Movements with start <= timestamp < end (timestamps must be ascending)."""
+        return self[bisect_left(self.timestamp, start):bisect_left(self.timestamp, end)]
+
+    def nbytes(self) -> int:
+        """Bytes used by the column buffers (not counting the lookup tables)."""
+        return sum(
+            col.itemsize * len(col)
+            for col in (self.type_code, self.amount, self.balance_after,
+                        self.timestamp, self.details_index)
+        )
+
+    def to_numpy(self) -> dict:
+        """Zero-copy NumPy views of the columns (requires numpy).
+
+        The ledger cannot grow while the views are alive (the arrays refuse
+        to resize an exported buffer), so drop them before appending.
+        """
+        import numpy as np
+        return {
+            "type_code": np.frombuffer(self.type_code, dtype=np.uint8),
+            "amount": np.frombuffer(self.amount, dtype=np.int64),
+            "balance_after": np.frombuffer(self.balance_after, dtype=np.int64),
+            "timestamp": np.frombuffer(self.timestamp, dtype=np.float64),
+            "details_index": np.frombuffer(self.details_index, dtype=np.uint32),
+        }
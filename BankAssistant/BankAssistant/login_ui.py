@@ -1,11 +1,8 @@
 import tkinter as tk
 from tkinter import messagebox
 
-import hashlib
 import db
-
-def hash_password(password:str) -> str:
-    return hashlib.sha512(password.encode("utf-8")).hexdigest()
+from passwords import hash_password
 
 class LoginWindow:
     def __init__(self,root: tk.Tk, on_login_success):
@@ -14,4 +14,5 @@ if __name__ == '__main__':
     db.init_db()
     login_root = tk.Tk()
     LoginWindow(login_root,on_login_success=start_app)
-    login_root.mainloop()
\ No newline at end of file
+    login_root.mainloop()
+    db.close_all_connections()
\ No newline at end of file
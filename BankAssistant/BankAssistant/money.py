@@ -0,0 +1,53 @@
+"""Money as integer minor units (cents).
+
+Balances, amounts and limits are plain ints counting cents everywhere:
+in BankAccount/Transaction, in the database and in db.* arguments. Only
+user input and display go through the helpers below.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+CENTS_PER_UNIT = 100
+
+# Largest amount SQLite can store in an INTEGER column (int64), in cents
+MAX_CENTS = 2 ** 63 - 1
+
+
+def to_cents(value) -> int:
+    """Convert an amount in major units ("12,50", "12.5", 12.5, 12) to cents.
+
+    Extra decimal places are rounded half-up. Raises ValueError for
+    anything that is not a finite number or is beyond +-MAX_CENTS.
+    """
+    if isinstance(value, bool):
+        raise ValueError("Amount must be a number.")
+    if isinstance(value, int):
+        cents = value * CENTS_PER_UNIT
+    else:
+        try:
+            amount = Decimal(str(value).strip().replace(",", "."))
+            if not amount.is_finite():
+                raise ValueError("Amount must be a number.")
+            # quantize raises InvalidOperation for very large exponents ("1e30")
+            cents = int((amount * CENTS_PER_UNIT).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+        except InvalidOperation:
+            raise ValueError("Amount must be a number.") from None
+    if abs(cents) > MAX_CENTS:
+        raise ValueError("Amount is too large.")
+    return cents
+
+
+def is_cents(value) -> bool:
+    """True for an int amount in cents (bool is rejected)."""
+    return type(value) is int
+
+
+def from_cents(cents: int) -> float:
+    """Major units as a float, for JSON and other external formats."""
+    return cents / CENTS_PER_UNIT
+
+
+def format_money(cents: int) -> str:
+    """Format cents as "1234.56" / "-0.50" without going through float."""
+    sign = "-" if cents < 0 else ""
+    units, rest = divmod(abs(cents), CENTS_PER_UNIT)
+    return f"{sign}{units}.{rest:02d}"
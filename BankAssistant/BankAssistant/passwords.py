@@ -0,0 +1,6 @@
+"""Password hashing shared by the login window and the data generator."""
+import hashlib
+
+
+def hash_password(password: str) -> str:
+    return hashlib.sha512(password.encode("utf-8")).hexdigest()
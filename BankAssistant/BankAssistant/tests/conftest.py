@@ -0,0 +1,26 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The app modules are flat scripts next to this folder.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import db
+from after_loop import AfterLoop
+
+
+@pytest.fixture
+def fresh_db(tmp_path, monkeypatch):
+    """An empty, fully migrated database in a temp directory."""
+    db.close_connection()
+    monkeypatch.setattr(db, "DB_FILE", str(tmp_path / "bank.db"))
+    db.init_db()
+    yield db
+    db.close_all_connections()
+
+
+@pytest.fixture
+def after_loop():
+    """A display-free event loop whose run() gives up after 10 seconds."""
+    return AfterLoop(timeout=10.0)
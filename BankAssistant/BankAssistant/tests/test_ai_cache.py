@@ -0,0 +1,96 @@
+import pytest
+
+import ai_cache
+import ai_client
+import db
+from ai_backends import LocalBackend
+from BankAccount import BankAccount
+
+CONTEXT_A = "- Owner: Ivan Petrov\n- IBAN: BG01\n- Balance: 100.00\n"
+CONTEXT_B = "- Owner: Maria Ivanova\n- IBAN: BG02\n- Balance: 5.00\n"
+
+
+@pytest.fixture
+def small_cache(fresh_db, monkeypatch):
+    monkeypatch.setattr(ai_cache, "CACHE_MAX_ENTRIES", 100)
+    ai_cache.reset_stats()
+    return ai_cache
+
+
+def test_question_is_normalized():
+    assert ai_cache.cache_key("What is an overdraft?", CONTEXT_A, 1) == \
+        ai_cache.cache_key("  what is an OVERDRAFT ", CONTEXT_A, 1)
+
+
+@pytest.mark.parametrize("question", [
+    "what is an overdraft?",
+    "how much money is there?",
+    "can this be overdrawn?",
+    "what's the current balance of the account",
+    "колко пари има в сметката?",
+])
+def test_answers_are_never_shared_between_accounts(question):
+    assert ai_cache.cache_key(question, CONTEXT_A, 1) != ai_cache.cache_key(question, CONTEXT_B, 2)
+
+
+def test_balance_change_is_a_new_key():
+    later = CONTEXT_A.replace("100.00", "90.00")
+    assert ai_cache.cache_key("how much money is there?", CONTEXT_A, 1) != \
+        ai_cache.cache_key("how much money is there?", later, 1)
+
+
+def test_least_recently_used_entries_are_evicted(small_cache):
+    keys = [ai_cache.cache_key(f"question {i}") for i in range(150)]
+    for i, key in enumerate(keys):
+        ai_cache.put(key, f"answer {i}")
+        if i == 60:
+            ai_cache.get(keys[0])   # keep the first one in use
+    db.close_all_connections()  # answers survive a reconnect
+
+    assert ai_cache.get(keys[0]) == "answer 0"
+    assert ai_cache.get(keys[1]) is None
+    assert db.get_cached_answers_count() == 100
+    assert ai_cache.stats()["hits"] == 2
+
+
+def test_expired_entries_are_not_used(small_cache, monkeypatch):
+    key = ai_cache.cache_key("question")
+    ai_cache.put(key, "answer")
+    assert ai_cache.get(key) == "answer"
+    monkeypatch.setattr(ai_cache, "CACHE_TTL", -1)
+    assert ai_cache.get(key) is None
+
+
+def _account(db_id, owner, iban, balance):
+    return BankAccount(owner, balance, iban, 0, db_id=db_id)
+
+
+@pytest.fixture
+def local_backend(small_cache):
+    backend = LocalBackend(latency=0, token_delay=0)
+    previous = ai_client.set_backend(backend)
+    yield backend
+    ai_client.set_backend(previous)
+
+
+def test_general_question_is_answered_once_for_every_account(local_backend):
+    ivan = _account(1, "Ivan Petrov", "BG01", 10_000)
+    maria = _account(2, "Maria Ivanova", "BG02", 500)
+    answers = []
+    for account in (ivan, maria, ivan):
+        prompt, key = ai_client.build_prompt("What is an overdraft?", account)
+        assert account.iban not in prompt and account.owner not in prompt
+        answers.append("".join(ai_client.stream_gpt(prompt, cache_key=key)))
+        ivan.balance += 100     # movements do not matter either
+    assert local_backend.calls == 1
+    assert len(set(answers)) == 1
+
+
+def test_account_question_is_not_shared(local_backend):
+    ivan = _account(1, "Ivan Petrov", "BG01", 10_000)
+    maria = _account(2, "Maria Ivanova", "BG02", 500)
+    for account in (ivan, maria):
+        prompt, key = ai_client.build_prompt("Can I afford a new phone?", account)
+        assert account.iban in prompt
+        "".join(ai_client.stream_gpt(prompt, cache_key=key))
+    assert local_backend.calls == 2
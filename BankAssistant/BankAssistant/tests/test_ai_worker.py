@@ -0,0 +1,93 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import db
+from ai_worker import AssistantWorker
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+
+def _slow_ask(delay):
+    def ask(prompt):
+        time.sleep(delay)
+        return f"answer to {prompt}"
+    return ask
+
+
+def test_event_loop_keeps_running_while_the_assistant_answers(after_loop):
+    ticks = []
+    answers = []
+
+    def heartbeat():
+        ticks.append(time.perf_counter())
+        after_loop.after(10, heartbeat)
+
+    worker = AssistantWorker(after_loop.after, _slow_ask(0.3))
+    heartbeat()
+    start = time.perf_counter()
+    worker.submit("fresh", answers.append)
+    after_loop.run(lambda: answers)
+    worker.shutdown()
+
+    assert answers == ["answer to fresh"]
+    assert sum(1 for t in ticks if t >= start) > 10
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.15
+
+
+def test_cancelled_question_never_answers(after_loop):
+    answers = []
+    worker = AssistantWorker(after_loop.after, _slow_ask(0.1))
+    worker.submit("stale", answers.append)
+    worker.cancel()
+    worker.submit("fresh", answers.append)
+    start = time.perf_counter()
+    after_loop.run(lambda: time.perf_counter() - start > 0.4)
+    worker.shutdown()
+    assert answers == ["answer to fresh"]
+
+
+def test_stream_chunks_arrive_in_order(after_loop):
+    chunks = []
+    done = []
+    def stream(prompt):
+        yield from ["a", "b", "c"]
+
+    worker = AssistantWorker(after_loop.after, None, stream)
+    worker.submit_stream("q", chunks.append, done.append)
+    after_loop.run(lambda: done)
+    assert chunks == ["a", "b", "c"] and done == [None]
+
+
+def test_pending_request_does_not_keep_the_process_alive():
+    script = (
+        "import time\n"
+        "from ai_worker import AssistantWorker\n"
+        "worker = AssistantWorker(lambda *a: None, lambda p: time.sleep(5))\n"
+        "worker.submit('slow', print)\n"
+        "time.sleep(0.1)\n"
+        "worker.shutdown()\n"
+    )
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", script], cwd=APP_DIR, check=True, timeout=10)
+    assert time.perf_counter() - start < 2
+
+
+def test_finished_questions_do_not_leak_connections(fresh_db, after_loop):
+    import ai_cache
+
+    def stream(prompt):
+        ai_cache.get(ai_cache.cache_key(prompt))
+        yield "answer"
+
+    done = []
+    worker = AssistantWorker(after_loop.after, None, stream)
+    for i in range(20):
+        worker.submit_stream(f"question {i}", lambda chunk: None, done.append)
+        after_loop.run(lambda: len(done) > i)
+    ai_cache.get(ai_cache.cache_key("from the Tk thread"))
+    worker.shutdown()
+    # This thread's connection, plus those of the last question or two
+    # (a thread may still be exiting when the next one opens its own).
+    assert len(db._pool) <= 3
@@ -0,0 +1,92 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import assistant_commands
+from assistant_commands import parse
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+# (question, expected (command, amount, error)) for every assistant rule,
+# its aliases and the cases where rule order decides.
+CASES = [
+    ("balance", ("balance", None, None)),
+    ("Balance please", ("balance", None, None)),
+    ("баланс", ("balance", None, None)),
+    ("баланс сега", ("balance", None, None)),
+    ("balances", ("ask", None, None)),
+    ("deposit 100", ("deposit", 10000, None)),
+    ("Deposit 12,50", ("deposit", 1250, None)),
+    ("deposit", ("deposit", None, "Use: deposit <amount>")),
+    ("deposit lots", ("deposit", None, "Invalid amount")),
+    ("deposit 5 history", ("deposit", 500, None)),
+    ("withdraw 20.5", ("withdraw", 2050, None)),
+    ("withdraw", ("withdraw", None, "Use: withdraw <amount>")),
+    ("withdraw x", ("withdraw", None, "Invalid amount")),
+    ("show history", ("history", None, None)),
+    ("история", ("history", None, None)),
+    ("покажи историята", ("history", None, None)),
+    ("analytics", ("analytics", None, None)),
+    ("Analytics please", ("analytics", None, None)),
+    ("анализ", ("analytics", None, None)),
+    ("анализ за месеца", ("analytics", None, None)),
+    ("history of spending", ("history", None, None)),
+    ("how can I reduce my spending?", ("ask", None, None)),
+    ("what do my analytics say?", ("ask", None, None)),
+    ("set overdraft -100 spending", ("set_overdraft", -10000, None)),
+    ("reset spending limits", ("reset", None, None)),
+    ("who is the owner", ("owner", None, None)),
+    ("собственик", ("owner", None, None)),
+    ("iban", ("iban", None, None)),
+    ("IBAN please", ("iban", None, None)),
+    ("iban owner", ("owner", None, None)),
+    ("reset", ("reset", None, None)),
+    ("reset everything", ("reset", None, None)),
+    ("set overdraft -300", ("set_overdraft", -30000, None)),
+    ("set overdraft", ("set_overdraft", None, "Use: set overdraft <amount>")),
+    ("set overdraft abc", ("set_overdraft", None, "Overdraft must be a number")),
+    ("set overdraft 50", ("set_overdraft", None, "Overdraft must be <= 0")),
+    ("overdraft", ("overdraft", None, None)),
+    ("overdraft limit", ("overdraft", None, None)),
+    ("овърдрафт", ("overdraft", None, None)),
+    ("what is an overdraft?", ("ask", None, None)),
+    ("how does interest work?", ("ask", None, None)),
+]
+
+
+@pytest.mark.parametrize("question, expected", CASES)
+def test_parse(question, expected):
+    command = parse(question)
+    assert (command.name, command.amount, command.error) == expected
+
+
+def test_every_rule_has_a_case():
+    covered = {expected[0] for _, expected in CASES}
+    assert {name for name, _, _ in assistant_commands.RULES} <= covered
+
+
+def test_bank_ui_does_not_load_numpy():
+    code = "import sys, bank_ui; print({'analytics', 'numpy'} & set(sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=APP_DIR, capture_output=True, text=True)
+    if "No module named 'tkinter'" in result.stderr:
+        pytest.skip("tkinter is not installed")
+    assert result.stdout.strip() == "set()", result.stderr
+
+
+@pytest.mark.parametrize("question, general", [
+    ("what is an overdraft?", True),
+    ("how does interest work?", True),
+    ("какво е овърдрафт?", True),
+    ("can I go into overdraft?", False),
+    ("how much money is there?", False),
+    ("is this account overdrawn?", False),
+    ("колко пари има в сметката?", False),
+])
+def test_general_questions(question, general):
+    assert assistant_commands.is_general(question) is general
+
+
+def test_question_text_is_kept():
+    assert parse("  What is an overdraft?  ").text == "What is an overdraft?"
@@ -0,0 +1,78 @@
+import sqlite3
+
+import pytest
+
+import db
+from assistant_commands import is_script, parse_script
+from assistant_script import run_script
+from BankAccount import BankAccount
+
+
+@pytest.fixture
+def account(fresh_db):
+    user_id = db.create_user("script", "x")
+    db_id = db.create_account("Script", "BG00SCRIPT0001", 10_000, 0, user_id)
+    return BankAccount("Script", 10_000, "BG00SCRIPT0001", 0, db_id=db_id)
+
+
+def _stored(acc):
+    with db.connection() as conn:
+        row = conn.execute(
+            "SELECT balance, overdraft_limit FROM accounts WHERE id = ?", (acc.db_id,)
+        ).fetchone()
+    return row["balance"], row["overdraft_limit"], len(db.load_transactions_for_account(acc.db_id))
+
+
+def test_script_runs_every_command(account):
+    run_script(account, parse_script("deposit 100; withdraw 20; set overdraft -300; withdraw 250"))
+    assert account.balance == 10_000 + 10_000 - 2_000 - 25_000
+    assert account.overdraft_limit == -30_000
+    assert _stored(account) == (account.balance, -30_000, 3)
+
+
+def test_invalid_step_changes_nothing(account):
+    before = _stored(account)
+    with pytest.raises(ValueError, match="2. withdraw 1000"):
+        run_script(account, parse_script("deposit 50; withdraw 1000; deposit 1"))
+    assert _stored(account) == before
+    assert account.balance == 10_000 and not account.transactions
+
+
+def test_database_refusal_rolls_back_every_step(account):
+    # Another session spends the money after the account was loaded.
+    db.apply_movement(account.db_id, "WITHDRAW", 9_000)
+    before = _stored(account)
+    with pytest.raises(ValueError):
+        run_script(account, parse_script("deposit 1; withdraw 50"))
+    assert _stored(account) == before
+    assert not account.transactions
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("deposit 100; withdraw 20", True),
+    ("deposit 100\nset overdraft -50", True),
+    ("deposit abc; withdraw 20", True),
+    ("deposit 100", False),
+    ("what is an overdraft; and how much does it cost?", False),
+    ("deposit 100; what is an overdraft?", False),
+])
+def test_is_script_needs_every_part_to_be_a_command(text, expected):
+    assert is_script(text) is expected
+
+
+def test_locked_database_changes_nothing(account, monkeypatch):
+    before = _stored(account)
+    apply_movement = db.apply_movement
+    calls = []
+
+    def locked_on_second_call(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 2:
+            raise sqlite3.OperationalError("database is locked")
+        return apply_movement(*args, **kwargs)
+
+    monkeypatch.setattr(db, "apply_movement", locked_on_second_call)
+    with pytest.raises(sqlite3.Error):
+        run_script(account, parse_script("deposit 1; withdraw 50"))
+    assert _stored(account) == before
+    assert account.balance == 10_000 and not account.transactions
@@ -0,0 +1,69 @@
+import gc
+import tracemalloc
+
+import pytest
+
+from BankAccount import BankAccount, Transaction
+
+# Measured objects only (IBAN strings are made beforehand): a slotted
+# account with its empty history and id is 172 B on CPython 3.11, the
+# same account with a __dict__ 220 B.
+BYTES_PER_ACCOUNT = 190
+
+
+def test_objects_have_no_instance_dict():
+    account = BankAccount("Owner", 0, "BG00TEST0001")
+    assert not hasattr(account, "__dict__")
+    assert not hasattr(Transaction("DEPOSIT", 1, 1), "__dict__")
+
+
+class _DictAccount:
+    """BankAccount's attributes on an ordinary (dict-backed) object."""
+
+    def __init__(self, owner, balance, iban, overdraft_limit=0, db_id=None, user_name=None):
+        self.owner = owner
+        self.balance = balance
+        self.iban = iban
+        self.transactions = []
+        self.overdraft_limit = overdraft_limit
+        self.db_id = db_id
+        self.user_name = user_name
+
+
+def _bytes_per_account(cls, n: int = 100_000) -> float:
+    ibans = [f"BG{i:020d}" for i in range(n)]
+    accounts = [None] * n
+    gc.collect()
+    tracemalloc.start()
+    try:
+        for i, iban in enumerate(ibans):
+            accounts[i] = cls("Owner", i, iban, 0, db_id=i, user_name="user")
+        return tracemalloc.get_traced_memory()[0] / n
+    finally:
+        tracemalloc.stop()
+
+
+def test_accounts_fit_the_memory_budget():
+    slotted = _bytes_per_account(BankAccount)
+    assert slotted <= BYTES_PER_ACCOUNT
+    # At least four pointers smaller than the dict-backed twin.
+    assert slotted <= _bytes_per_account(_DictAccount) - 32
+
+
+def test_deposit_and_withdraw_respect_the_overdraft():
+    account = BankAccount("Owner", 1000, "BG00TEST0001", -500)
+    account.deposit(250)
+    account.withdraw(1700)
+    assert account.balance == -450
+    with pytest.raises(ValueError):
+        account.withdraw(100)
+    assert [(t.t_type, t.amount, t.balance_after) for t in account.transactions] == [
+        ("DEPOSIT", 250, 1250), ("WITHDRAW", 1700, -450),
+    ]
+
+
+@pytest.mark.parametrize("amount", [0, -1, 1.5, "10", True])
+def test_invalid_amounts_are_rejected(amount):
+    account = BankAccount("Owner", 1000, "BG00TEST0001")
+    with pytest.raises(ValueError):
+        account.deposit(amount)
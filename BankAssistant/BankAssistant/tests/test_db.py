@@ -0,0 +1,97 @@
+import sqlite3
+
+import pytest
+
+import db
+
+
+def test_hot_queries_use_their_indexes(fresh_db):
+    assert db.check_query_plans() == []
+
+
+def test_new_database_runs_every_migration(fresh_db):
+    with db.connection() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(db.MIGRATIONS)
+
+
+def test_failed_migration_is_rolled_back(fresh_db, monkeypatch):
+    version = len(db.MIGRATIONS)
+    monkeypatch.setattr(db, "MIGRATIONS", db.MIGRATIONS + ["CREATE TABLE zz (x); CREATE TABLE zz (x);"])
+
+    with pytest.raises(sqlite3.OperationalError):
+        db.init_db()
+
+    # The next db.* call must not commit the half-applied migration.
+    db.create_user("after", "x")
+    with db.connection() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == version
+        assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'zz'").fetchone() is None
+
+
+def _recomputed(user_id=db.ALL_USERS):
+    where = "" if user_id == db.ALL_USERS else " WHERE user_id = ?"
+    with db.connection() as conn:
+        row = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(balance), 0), COALESCE(SUM(-overdraft_limit), 0) FROM accounts"
+            + where,
+            () if user_id == db.ALL_USERS else (user_id,),
+        ).fetchone()
+    return {"account_count": row[0], "total_balance": row[1], "overdraft_exposure": row[2]}
+
+
+def _assert_totals_match(user_ids):
+    for user_id in (db.ALL_USERS, *user_ids):
+        assert db.get_balance_summary(user_id) == _recomputed(user_id)
+
+
+def test_balance_totals_follow_every_change(fresh_db):
+    alice, bob = db.create_user("alice", "x"), db.create_user("bob", "x")
+    a1 = db.create_account("Alice", "BG00TOT0001", 10_000, -5_000, alice)
+    a2 = db.create_account("Alice", "BG00TOT0002", 250, 0, alice)
+    b1 = db.create_account("Bob", "BG00TOT0003", 99_999, -20_000, bob)
+    _assert_totals_match([alice, bob])
+    assert db.get_balance_summary() == {
+        "account_count": 3, "total_balance": 110_249, "overdraft_exposure": 25_000,
+    }
+
+    db.apply_movement(a1, "WITHDRAW", 14_000)
+    db.apply_movement(b1, "DEPOSIT", 1)
+    _assert_totals_match([alice, bob])
+
+    db.update_overdraft(a2, -1_000)
+    _assert_totals_match([alice, bob])
+
+    db.delete_account(a1)
+    _assert_totals_match([alice, bob])
+    assert db.get_balance_summary(alice) == {
+        "account_count": 1, "total_balance": 250, "overdraft_exposure": 1_000,
+    }
+
+
+def test_balance_totals_are_backfilled_from_the_original_schema(tmp_path, monkeypatch):
+    db.close_connection()
+    monkeypatch.setattr(db, "DB_FILE", str(tmp_path / "old.db"))
+    with monkeypatch.context() as m:
+        m.setattr(db, "MIGRATIONS", [])
+        db.init_db()    # the original schema: REAL money columns, no totals
+        with db.connection() as conn:
+            conn.executemany(
+                "INSERT INTO users (id, username, password_hash) VALUES (?, ?, 'x')", [(1, "a"), (2, "b")]
+            )
+            conn.executemany(
+                "INSERT INTO accounts (owner, iban, balance, overdraft_limit, user_id) VALUES (?, ?, ?, ?, ?)",
+                [("A", "BG01", 0.1, -50.0, 1), ("A", "BG02", 0.2, 0.0, 1), ("B", "BG03", 1234.56, -0.7, 2)],
+            )
+    try:
+        db.init_db()
+        assert db.get_balance_summary() == {
+            "account_count": 3, "total_balance": 123_486, "overdraft_exposure": 5_070,
+        }
+        _assert_totals_match([1, 2])
+
+        b1 = db.get_account_id_by_iban("BG03")
+        db.apply_movement(b1, "WITHDRAW", 1_000)
+        db.create_account("C", "BG04", 5, 0, 1)
+        _assert_totals_match([1, 2])
+    finally:
+        db.close_all_connections()
@@ -0,0 +1,76 @@
+import pytest
+
+import db
+import db_stats
+
+
+@pytest.fixture
+def stats(fresh_db):
+    db_stats.reset()
+    db_stats.enable()
+    yield db_stats
+    db_stats.disable()
+    db_stats.reset()
+
+
+@pytest.fixture
+def account_id(stats):
+    user_id = db.create_user("stats", "x")
+    account_id = db.create_account("Stats", "BG00STATS001", 0, 0, user_id)
+    stats.reset()
+    return account_id
+
+
+def test_calls_rows_and_statements_are_counted(account_id):
+    for _ in range(3):
+        db.apply_movement(account_id, "DEPOSIT", 100)
+    db.load_transactions_for_account(account_id)
+
+    functions = db_stats.snapshot()["functions"]
+    movement = functions["apply_movement"]
+    assert movement["count"] == 3 and movement["errors"] == 0
+    # BEGIN, the UPDATE, the ledger INSERT and COMMIT; the totals
+    # trigger's statements are part of the UPDATE.
+    assert movement["statements"] == 3 * 4
+    assert functions["load_transactions_for_account"]["rows"] == 3
+    assert not any(sql.startswith("--") for sql in db_stats.snapshot()["statements"])
+
+
+def test_generator_statements_are_attributed(account_id):
+    db.apply_movement(account_id, "DEPOSIT", 100)
+    db_stats.reset()
+
+    assert len(list(db.iter_transactions(account_id))) == 1
+    batches = db.iter_ledger_batches([account_id])
+    next(batches)
+    batches.close()
+
+    functions = db_stats.snapshot()["functions"]
+    assert functions["iter_transactions"]["statements"] >= 1
+    assert functions["iter_transactions"]["rows"] == 1
+    assert functions["iter_ledger_batches"]["statements"] >= 1
+    assert functions["iter_ledger_batches"]["errors"] == 0
+
+
+def test_failed_calls_are_errors(account_id):
+    with pytest.raises(ValueError):
+        db.apply_movement(account_id, "WITHDRAW", 100)
+    assert db_stats.snapshot()["functions"]["apply_movement"]["errors"] == 1
+
+
+def test_prometheus_and_json_dumps(account_id, tmp_path):
+    db.apply_movement(account_id, "DEPOSIT", 100)
+    text = db_stats.to_prometheus()
+    assert 'bank_db_call_seconds_count{function="apply_movement"} 1' in text
+    assert 'bank_db_call_seconds_bucket{function="apply_movement",le="+Inf"} 1' in text
+    assert 'bank_db_call_statements_total{function="apply_movement"} 4' in text
+
+    assert db_stats.dump(tmp_path / "stats.prom").read_text() == text
+    assert '"apply_movement"' in db_stats.dump(tmp_path / "stats.json").read_text()
+
+
+def test_disable_restores_the_db_functions(stats):
+    assert db_stats.enabled()
+    stats.disable()
+    assert not db_stats.enabled()
+    assert not hasattr(db.apply_movement, "__wrapped__")
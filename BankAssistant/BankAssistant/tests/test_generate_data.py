@@ -0,0 +1,37 @@
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import generate_data
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_skewed_counts_sum_to_total():
+    counts = generate_data.skewed_counts(random.Random(1), 100, 10_000)
+    assert len(counts) == 100 and sum(counts) == 10_000
+
+
+def test_skewed_counts_without_accounts():
+    assert generate_data.skewed_counts(random.Random(1), 0, 0) == []
+    assert generate_data.skewed_counts(random.Random(1), 0, 500) == []
+
+
+def test_transactions_without_accounts_is_an_argument_error(tmp_path):
+    with pytest.raises(SystemExit) as exit_info:
+        generate_data.main(["--db", str(tmp_path / "x.db"), "--accounts", "0", "--transactions", "10"])
+    assert exit_info.value.code == 2
+
+
+def test_runs_without_tkinter(tmp_path):
+    # Block tkinter as if it were not installed (a headless server).
+    code = (
+        "import sys; sys.modules['tkinter'] = None; import generate_data; "
+        f"sys.exit(generate_data.main(['--db', {str(tmp_path / 'x.db')!r}, "
+        "'--users', '2', '--accounts', '3', '--transactions', '10']))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=APP_DIR, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
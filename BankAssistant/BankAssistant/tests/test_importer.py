@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+import db
+import importer
+
+
+def _statement(tmp_path, lines):
+    path = tmp_path / "statement.csv"
+    path.write_text("account_id,t_type,amount,balance_after,created_at\n" + "\n".join(lines) + "\n")
+    return path
+
+
+def test_invalid_rows_are_rejected(fresh_db, tmp_path):
+    user_id = db.create_user("u", "x")
+    account_id = db.create_account("Owner", "BG00TEST0001", 0, 0, user_id)
+    path = _statement(tmp_path, [
+        f"{account_id},DEPOSIT,10.00,10.00,2024-01-31 12:00:00",
+        f"{account_id},DEPOSIT,10.00,20.00,",
+        f"{account_id},DEPOSIT,10.00,30.00,01/02/2024",
+        f"{account_id},BOGUS,10.00,40.00,2024-01-31 12:00:00",
+        "999,DEPOSIT,10.00,50.00,2024-01-31 12:00:00",
+    ])
+    rejects = tmp_path / "rejects.jsonl"
+
+    result = importer.import_file(path, rejects=rejects)
+
+    assert (result.imported, result.rejected) == (2, 3)
+    assert [json.loads(line)["line"] for line in rejects.read_text().splitlines()] == [4, 5, 6]
+    rows = db.load_transactions_for_account(account_id)
+    assert [row["balance_after"] for row in rows] == [1000, 2000]
+    with db.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM transactions WHERE account_id = 999").fetchone()[0] == 0
+
+
+def test_malformed_jsonl_lines_are_rejected(fresh_db, tmp_path):
+    user_id = db.create_user("u", "x")
+    account_id = db.create_account("Owner", "BG00TEST0001", 0, 0, user_id)
+    row = {"account_id": account_id, "t_type": "DEPOSIT", "amount": "1.00", "balance_after": "1.00"}
+    path = tmp_path / "statement.jsonl"
+    path.write_text("\n".join([json.dumps(row), "{not json", "[1, 2]", '"text"', json.dumps(row)]) + "\n")
+    rejects = tmp_path / "rejects.jsonl"
+
+    result = importer.import_file(path, rejects=rejects, batch_size=1)
+
+    assert (result.imported, result.rejected) == (2, 3)
+    entries = [json.loads(line) for line in rejects.read_text().splitlines()]
+    assert [(e["line"], e["row"]) for e in entries] == [(2, "{not json"), (3, [1, 2]), (4, "text")]
+    assert len(db.load_transactions_for_account(account_id)) == 2
+
+
+def test_cli_reports_malformed_jsonl(fresh_db, tmp_path, capsys):
+    path = tmp_path / "statement.jsonl"
+    path.write_text("[1, 2]\n")
+    assert importer.main([str(path), "--db", db.DB_FILE]) == 2
+    assert "line 1: Row is not a JSON object." in capsys.readouterr().out
+
+
+def test_unknown_account_for_the_whole_file(fresh_db, tmp_path):
+    path = _statement(tmp_path, ["1,DEPOSIT,1.00,1.00,"])
+    with pytest.raises(ValueError, match="999"):
+        importer.import_file(path, account_id=999)
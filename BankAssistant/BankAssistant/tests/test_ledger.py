@@ -0,0 +1,67 @@
+import pytest
+
+from BankAccount import BankAccount, Transaction
+from ledger import ColumnarLedger
+
+
+@pytest.fixture
+def ledger():
+    ledger = ColumnarLedger()
+    for i in range(10):
+        t_type = "WITHDRAW" if i % 3 == 0 else "DEPOSIT"
+        ledger.add(t_type, 100 + i, 1000 + i, f"details {i % 2}", timestamp=float(i * 10))
+    return ledger
+
+
+def test_rows_round_trip(ledger):
+    tx = ledger[4]
+    assert (tx.t_type, tx.amount, tx.balance_after, tx.details) == ("DEPOSIT", 104, 1004, "details 0")
+    assert len(ledger) == 10 and len(list(ledger)) == 10
+
+
+def test_negative_indexes(ledger):
+    assert ledger[-1].amount == 109
+    assert ledger[-10].amount == 100
+    with pytest.raises(IndexError):
+        ledger[-11]
+    with pytest.raises(IndexError):
+        ledger[10]
+
+
+def test_slices_share_the_intern_pools(ledger):
+    part = ledger[2:5]
+    assert [tx.amount for tx in part] == [102, 103, 104]
+    assert part._types is ledger._types and part._details is ledger._details
+    # Appending to the slice does not touch the original's columns.
+    part.add("DEPOSIT", 1, 1, "details 1")
+    assert len(part) == 4 and len(ledger) == 10
+    assert ledger[::3].types() == ["WITHDRAW", "DEPOSIT"]
+
+
+def test_between(ledger):
+    assert [tx.amount for tx in ledger.between(20, 50)] == [102, 103, 104]
+    assert len(ledger.between(95, 1000)) == 0
+    assert len(ledger.between(0, 1000)) == 10
+
+
+def test_total(ledger):
+    assert ledger.total() == sum(range(100, 110))
+    assert ledger.total("WITHDRAW") == 100 + 103 + 106 + 109
+    assert ledger.total(" deposit ") == ledger.total() - ledger.total("WITHDRAW")
+    assert ledger.total("FEE") == 0
+    assert ledger[1:3].total("DEPOSIT") == 101 + 102
+    assert ledger[1:3].total("WITHDRAW") == 0
+
+
+def test_columnar_account_round_trip():
+    account = BankAccount("Owner", 1000, "BG00LEDGER01", -500, columnar=True)
+    assert isinstance(account.transactions, ColumnarLedger)
+    account.deposit(200)
+    account.withdraw(1500)
+    assert [(tx.t_type, tx.amount, tx.balance_after, tx.details) for tx in account.transactions] == [
+        ("DEPOSIT", 200, 1200, "cash deposit"), ("WITHDRAW", 1500, -300, "cash withdraw"),
+    ]
+    assert account.transactions.total("DEPOSIT") == 200
+    copied = ColumnarLedger(account.transactions)
+    assert [tx.balance_after for tx in copied] == [1200, -300]
+    assert isinstance(copied[0], Transaction)
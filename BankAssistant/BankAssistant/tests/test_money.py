@@ -0,0 +1,34 @@
+import pytest
+
+from assistant_commands import DEPOSIT, parse
+from money import MAX_CENTS, format_money, to_cents
+
+
+@pytest.mark.parametrize("value, cents", [
+    ("12.50", 1250), ("12,5", 1250), ("0.005", 1), (12, 1200), (12.5, 1250), ("-3", -300),
+])
+def test_to_cents(value, cents):
+    assert to_cents(value) == cents
+
+
+@pytest.mark.parametrize("value", [
+    "", "abc", "nan", "inf", True, None, "1e30", "99999999999999999999999999", 10 ** 20,
+])
+def test_to_cents_rejects(value):
+    with pytest.raises(ValueError):
+        to_cents(value)
+
+
+def test_to_cents_limits():
+    assert to_cents(f"{MAX_CENTS // 100}.{MAX_CENTS % 100:02d}") == MAX_CENTS
+    with pytest.raises(ValueError):
+        to_cents(f"{MAX_CENTS // 100}.{MAX_CENTS % 100 + 1:02d}")
+
+
+def test_huge_amount_is_a_parse_error():
+    command = parse("deposit 1e30")
+    assert command.name == DEPOSIT and command.amount is None and command.error
+
+
+def test_format_money():
+    assert [format_money(c) for c in (0, 5, -50, 123456)] == ["0.00", "0.05", "-0.50", "1234.56"]
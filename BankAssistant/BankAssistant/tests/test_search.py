@@ -0,0 +1,79 @@
+import pytest
+
+import db
+from account_list import SearchResults
+
+
+@pytest.fixture
+def accounts(fresh_db):
+    ivan = db.create_user("иван", "x")
+    under = db.create_user("_under", "x")
+    ids = {
+        "ivan": db.create_account("Иван Петров", "BG00SRCH0001", 0, 0, ivan),
+        "maria": db.create_account("Maria Ivanova", "BG00SRCH0002", 0, 0, ivan),
+        "strasse": db.create_account("Jörg Straße", "DE00SRCH0003", 0, 0, under),
+        "under": db.create_account("Under Score", "BG00SRCH0004", 0, 0, under),
+    }
+    return {"users": {"ivan": ivan, "under": under}, **ids}
+
+
+def _found(text, user_id=None):
+    return {row["account_id"] for row in db.search_accounts(text, user_id=user_id)}
+
+
+@pytest.mark.parametrize("text", ["Иван", "иван", "ИВАН", "И", "и", " иван п "])
+def test_non_ascii_owner_ignores_case(accounts, text):
+    assert accounts["ivan"] in _found(text)
+
+
+def test_username_matches_list_its_accounts(accounts):
+    assert _found("ИВ") == {accounts["ivan"], accounts["maria"]}
+
+
+def test_casefold_expands_sharp_s(accounts):
+    assert _found("jörg strass") == {accounts["strasse"]}
+
+
+def test_upper_bound_stays_in_the_folded_range(accounts):
+    # "@" + 1 is "A"; an unfolded bound would let "_under" (after "A") through.
+    assert _found("@") == set()
+    assert _found("_") == {accounts["strasse"], accounts["under"]}
+
+
+def test_search_within_one_user(accounts):
+    assert _found("ma", accounts["users"]["ivan"]) == {accounts["maria"]}
+    assert _found("ma", accounts["users"]["under"]) == set()
+
+
+def test_prefix_range_covers_exactly_the_prefix():
+    low, high = db._prefix_range("Иван")
+    assert (low, high) == ("иван", "ивао")
+    assert low <= "иван петров" < high
+    assert not low <= "ивао" < high
+
+
+def test_search_results_match_new_rows_the_same_way(accounts):
+    results = SearchResults("иван")
+    row = db.get_account(accounts["ivan"])
+    assert results.matches(row)
+    assert not SearchResults("@").matches(db.get_account(accounts["under"]))
+
+
+def test_migration_backfills_the_fold_columns(tmp_path, monkeypatch):
+    db.close_connection()
+    monkeypatch.setattr(db, "DB_FILE", str(tmp_path / "old.db"))
+    with monkeypatch.context() as m:
+        m.setattr(db, "MIGRATIONS", db.MIGRATIONS[:4])
+        db.init_db()
+        with db.connection() as conn:
+            conn.execute("INSERT INTO users (id, username, password_hash) VALUES (1, 'Ёлка', 'x')")
+            conn.execute(
+                "INSERT INTO accounts (owner, iban, balance, overdraft_limit, user_id) "
+                "VALUES ('Иван Петров', 'BG00OLD0001', 0, 0, 1)"
+            )
+    try:
+        db.init_db()
+        assert [row["owner"] for row in db.search_accounts("иван")] == ["Иван Петров"]
+        assert [row["owner"] for row in db.search_accounts("ёл")] == ["Иван Петров"]
+    finally:
+        db.close_all_connections()